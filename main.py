@@ -4,9 +4,10 @@ from pathlib import Path
 project_root = Path(__file__).parent.absolute()
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
+from resona_desktop_pet.startup_trace import startup_trace
 import asyncio
+import atexit
 import threading
-import traceback
 import ctypes
 import json
 import time
@@ -14,16 +15,19 @@ import random
 from pathlib import Path
 from datetime import datetime
 from typing import Any, Optional
-from PySide6.QtCore import QObject, Signal, QTimer, Qt
-from PySide6.QtWidgets import QApplication, QMessageBox
-from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+from PySide6.QtCore import QObject, QEvent, Signal, QTimer, Qt
+from PySide6.QtWidgets import QApplication, QSystemTrayIcon
 from resona_desktop_pet.config import ConfigManager
-from resona_desktop_pet.backend import LLMBackend, TTSBackend, STTBackend
-from resona_desktop_pet.backend.sovits_manager import SoVITSManager
+from resona_desktop_pet.backend.sovits_manager import SoVITSManager, SoVITSState
 from resona_desktop_pet.ui.luna.main_window import MainWindow
 from resona_desktop_pet.ui.tray_icon import TrayIcon
+from resona_desktop_pet.ui.clipboard_watcher import ClipboardWatcher
 from resona_desktop_pet.cleanup_manager import cleanup_manager
+from resona_desktop_pet.state_store import StateStore
+from resona_desktop_pet.hardware_probe import HardwareProbe, HardwareCapabilities
 from resona_desktop_pet.behavior_monitor import BehaviorMonitor
+from resona_desktop_pet.triggers import PendingTriggerQueue, TriggerFire
+startup_trace.mark("imports")
 log_dir = Path("logs")
 log_dir.mkdir(exist_ok=True)
 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -31,40 +35,27 @@ log_file = log_dir / f"app_{timestamp}.log"
 sovits_log_file = log_dir / f"sovits_{timestamp}.log"
 llm_log_file = log_dir / f"llm_{timestamp}.log"
 import logging
-def setup_dedicated_logger(name, file_path, level=logging.INFO):
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
-    handler = logging.FileHandler(file_path, encoding="utf-8")
-    handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
-    logger.addHandler(handler)
-    logger.propagate = False
-    return logger
+from resona_desktop_pet.log_pipeline import setup_logging
 def exception_hook(exctype, value, tb):
-    traceback.print_exception(exctype, value, tb)
     logging.error("Uncaught exception:", exc_info=(exctype, value, tb))
 
+# 所有日志与 print 经队列由单个写线程落盘，GUI 线程与 asyncio 循环不会被文件 IO 阻塞
+log_pipeline = setup_logging(log_dir, log_file, {"SoVITS": sovits_log_file, "LLM": llm_log_file})
+atexit.register(log_pipeline.stop)
 sys.excepthook = exception_hook
-sovits_logger = setup_dedicated_logger("SoVITS", sovits_log_file)
-llm_logger = setup_dedicated_logger("LLM", llm_log_file)
-class TeeLogger:
-    def __init__(self, filename, terminal):
-        self.terminal = terminal
-        self.log_file = open(filename, "a", encoding="utf-8", buffering=1)
-    def write(self, message):
-        self.terminal.write(message)
-        self.log_file.write(message)
-    def flush(self):
-        self.terminal.flush()
-        self.log_file.flush()
-sys.stdout = TeeLogger(log_file, sys.stdout)
-sys.stderr = sys.stdout
-logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s', handlers=[logging.StreamHandler(sys.stdout)], force=True)
 def log(message):
     logging.info(message)
 class AudioPlayer(QObject):
     playback_finished = Signal()
     def __init__(self, parent=None):
         super().__init__(parent)
+        # QtMultimedia 加载与音频设备初始化较慢，推迟到首帧之后的 warm_up 或第一次播放
+        self._player = None
+        self._audio_output = None
+    def warm_up(self):
+        if self._player is not None: return
+        from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+        self._end_status = QMediaPlayer.MediaStatus.EndOfMedia
         self._player = QMediaPlayer()
         self._audio_output = QAudioOutput()
         self._audio_output.setVolume(1.0)
@@ -72,23 +63,41 @@ class AudioPlayer(QObject):
         self._player.mediaStatusChanged.connect(self._on_status_changed)
     def play(self, file_path: str):
         from PySide6.QtCore import QUrl
+        self.warm_up()
         self._player.setSource(QUrl.fromLocalFile(file_path))
         self._player.play()
     def stop(self):
-        self._player.stop()
+        if self._player is not None: self._player.stop()
     def _on_status_changed(self, status):
-        if status == QMediaPlayer.MediaStatus.EndOfMedia:
+        if status == self._end_status:
             self.playback_finished.emit()
+class FirstPaintWatcher(QObject):
+    """监听控件的第一次 Paint 事件，触发后自行卸载。"""
+    painted = Signal()
+    def __init__(self, widget):
+        super().__init__(widget)
+        self._widget = widget
+        widget.installEventFilter(self)
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            self._widget.removeEventFilter(self)
+            # 等本次绘制完成后再发出
+            QTimer.singleShot(0, self.painted.emit)
+        return False
 class ApplicationController(QObject):
     llm_response_ready = Signal(object)
     tts_ready = Signal(object)
     stt_result_ready = Signal(object)
     request_stt_start = Signal()
     request_global_show = Signal()
-    def __init__(self, sovits_log_path: Optional[Path] = None):
+    sovits_state_changed = Signal(str, str)
+    pack_prepared = Signal(object)
+    def __init__(self, config: Optional[ConfigManager] = None, sovits_log_path: Optional[Path] = None):
         super().__init__()
-        self.config = ConfigManager()
+        # 由 main() 注入，整个进程只解析一次 config.cfg 与资源包
+        self.config = config or ConfigManager()
         self.config.print_all_configs()
+        startup_trace.mark("config")
         pm = self.config.pack_manager
         log(f"[Debug] PackManager Active ID: {pm.active_pack_id}")
         log(f"[Debug] PackManager Data Loaded: {bool(pm.pack_data)}")
@@ -102,50 +111,47 @@ class ApplicationController(QObject):
         self.project_root = Path(self.config.config_path).parent
         self._cleanup_temp_dir()
 
-        self.gpu_vendor = "Unknown"
-        self.can_monitor_gpu = True
-        try:
-            import subprocess
-            raw_out = subprocess.check_output("wmic path win32_VideoController get name", shell=True, stderr=subprocess.STDOUT)
-            try:
-                output = raw_out.decode("utf-8")
-            except UnicodeDecodeError:
-                output = raw_out.decode("gbk", errors="ignore")
-
-            output_up = output.upper()
-            if "AMD" in output_up or "RADEON" in output_up:
-                self.gpu_vendor = "AMD"
-                self.can_monitor_gpu = False
-                log("[Main] AMD GPU detected. Disabling GPU monitoring features to prevent crashes.")
-            elif "NVIDIA" in output_up:
-                self.gpu_vendor = "NVIDIA"
-                log("[Main] NVIDIA GPU detected. GPU monitoring enabled.")
-        except Exception as e:
-            log(f"[Main] GPU detection skipped or failed: {e}")
+        # 硬件能力优先读缓存；缓存缺失、过期或机器指纹变化时在后台线程重新探测
+        # 探测完成前不读取 GPU 传感器（AMD 下会崩溃），由 _on_hardware_probed 确认后再开启
+        self.hardware_probe = HardwareProbe(self.project_root / "cache" / "hardware.json")
+        cached = self.hardware_probe.load_cached()
+        self.hardware = cached or HardwareCapabilities(can_monitor_gpu=False, has_gpu_sensor=False,
+                                                       cpu_cores=os.cpu_count() or 1, physical_cores=os.cpu_count() or 1)
+        if cached: log(f"[Main] Hardware (cached): GPU={cached.gpu_vendor} {cached.gpu_name}, cores={cached.cpu_cores}")
+        else: self.hardware_probe.probe_async(self._on_hardware_probed)
 
         self._stt_ready = False
+        self._stt_unloaded_by_eco = False
         self._last_llm_response = None
         self._trigger_cooldown_end = 0
         self._post_busy_cooldown_end = 0
-        self._last_busy_state = False
-        self._pending_triggers = []
-        self._is_chain_executing = False
+        self._last_busy = False
+        self._pending_triggers = PendingTriggerQueue(self.config.pending_queue_size, self.config.pending_trigger_ttl)
+        self._chain_executing = False
         self.current_weather = {}
-        self.interaction_locked = False
-        self.state = self._load_state()
+        self._interaction_locked = False
+        self.state = StateStore(self.state_path)
+        cleanup_manager.register(self.state.close)
+        self.sovits_manager = None
         if self.config.sovits_enabled:
             self.sovits_manager = SoVITSManager(
                 self.project_root,
                 self.config.sovits_api_port,
                 self.config.sovits_device,
-                self.config.sovits_model_version
+                self.config.sovits_model_version,
+                pack_manager=self.config.pack_manager
             )
-            if not self.sovits_manager.start(timeout=60, kill_existing=self.config.sovits_kill_existing):
-                QMessageBox.critical(None, "SoVITS Error", "无法启动 GPT-SoVITS 服务，请检查配置。")
-                sys.exit(1)
+            # 后台启动，界面先显示；就绪前的回复只显示文字
+            self.sovits_manager.on_state_changed = self.sovits_state_changed.emit
+            self.sovits_state_changed.connect(self._handle_sovits_state)
+            self.sovits_manager.start_async(timeout=60, kill_existing=self.config.sovits_kill_existing)
+        # 后端模块在此处才导入，耗时计入 startup_trace 的 backends 阶段
+        from resona_desktop_pet.backend import LLMBackend, TTSBackend, STTBackend
         self.llm_backend = LLMBackend(self.config, log_path=llm_log_file)
         self.tts_backend = TTSBackend(self.config, sovits_log_path=sovits_log_path)
         self.stt_backend = STTBackend(self.config)
+        self._apply_hardware(self.hardware)
+        startup_trace.mark("backends")
         self._loop = asyncio.new_event_loop()
         self._loop_thread = threading.Thread(target=self._run_loop, daemon=True)
         self._loop_thread.start()
@@ -153,8 +159,13 @@ class ApplicationController(QObject):
         self.audio_player.playback_finished.connect(self._on_audio_finished)
         self.main_window = MainWindow(self.config)
         self.main_window.controller = self
+        startup_trace.mark("main_window")
+        self._first_paint = FirstPaintWatcher(self.main_window.character)
+        self._first_paint.painted.connect(self._on_first_paint)
+        self.main_window.busy_changed.connect(lambda _: self._check_busy_edge())
 
         self.tray_icon = TrayIcon(self.main_window)
+        if self.sovits_manager: self.tray_icon.set_tts_status(self.sovits_manager.state)
         self.tray_icon.show()
 
         self.debug_panel = None
@@ -167,17 +178,23 @@ class ApplicationController(QObject):
             except Exception as e:
                 log(f"[Main] Failed to initialize DebugPanel: {e}")
 
-        self.main_window.stats["total_clicks"] = self.state.get("total_clicks", 0)
+        self.main_window.stats.set_total_clicks(self.state.counter("total_clicks").value)
+        self.clipboard_watcher = ClipboardWatcher(QApplication.clipboard(), self.config, self)
         self.behavior_monitor = BehaviorMonitor(self.config, self)
         self.behavior_monitor.fullscreen_status_changed.connect(self._handle_fullscreen_status)
+        self.behavior_monitor.eco_mode_changed.connect(self._handle_eco_mode)
         self.behavior_monitor.trigger_matched.connect(self._handle_behavior_trigger)
         self.behavior_monitor.start()
+        startup_trace.mark("behavior_monitor")
         self._mocker_process = None
         if self.config.debug_trigger:
             import subprocess
             mocker_script = self.project_root / "tools" / "sensor_mocker.py"
             log(f"[Debug] debugtrigger is ENABLED. Starting sensor mocker: {mocker_script}")
             self._mocker_process = subprocess.Popen([sys.executable, str(mocker_script)], cwd=str(self.project_root))
+        self.config.subscribe(self._on_config_changed)
+        self._pack_switch_seq = 0
+        self.pack_prepared.connect(self._apply_prepared_pack)
         self.main_window.pack_changed.connect(self._handle_pack_change)
         self.main_window.request_query.connect(self._handle_user_query)
         self.main_window.replay_requested.connect(self._replay_last_response)
@@ -187,18 +204,63 @@ class ApplicationController(QObject):
         self.stt_result_ready.connect(self._handle_stt_result)
         self.request_stt_start.connect(self._handle_stt_request)
         self.request_global_show.connect(self.main_window.manual_show)
-        self._trigger_check_timer = QTimer()
-        self._trigger_check_timer.timeout.connect(self._check_pending_triggers)
-        self._trigger_check_timer.start(1000)
+        self._drain_timer = QTimer()
+        self._drain_timer.setSingleShot(True)
+        self._drain_timer.timeout.connect(self._drain_pending_triggers)
         self._busy_watchdog = QTimer()
         self._busy_watchdog.setSingleShot(True)
         self._busy_watchdog.timeout.connect(self._force_unlock)
         QTimer.singleShot(2000, self._check_startup_events)
         QTimer.singleShot(1000, self._init_hotkeys)
         QTimer.singleShot(500, self.main_window.manual_show)
+        startup_trace.mark("controller")
+    def _on_first_paint(self):
+        startup_trace.finish("first_paint", log_dir / "startup_trace.json")
+        # 首帧之后再预热：LLM SDK 在后台线程导入，音频输出需在 GUI 线程创建
+        threading.Thread(target=self.llm_backend.warm_up, name="resona-llm-warmup", daemon=True).start()
+        QTimer.singleShot(0, self.audio_player.warm_up)
+    @property
+    def gpu_vendor(self) -> str:
+        return self.hardware.gpu_vendor
+    @property
+    def can_monitor_gpu(self) -> bool:
+        return self.hardware.can_monitor_gpu
+    def _on_hardware_probed(self, caps):
+        # 运行在探测线程中；HardwareCapabilities 不可变，整体替换即可被其他线程安全读取
+        self.hardware = caps
+        log(f"[Main] Hardware probed: GPU={caps.gpu_vendor} {caps.gpu_name}, cores={caps.cpu_cores}/{caps.physical_cores}, "
+            f"cpu_temp={caps.has_cpu_temp}, gpu_sensor={caps.has_gpu_sensor}")
+        if caps.gpu_vendor == "AMD":
+            log("[Main] AMD GPU detected. Disabling GPU monitoring features to prevent crashes.")
+        self._apply_hardware(caps)
+    def _apply_hardware(self, caps):
+        stt = getattr(self, "stt_backend", None)
+        if stt: stt.num_threads = max(1, min(4, caps.cpu_cores))
     @property
     def is_busy(self) -> bool:
-        return self._is_chain_executing or self.main_window.is_busy or self.interaction_locked
+        mw = getattr(self, "main_window", None)
+        return self._chain_executing or (mw is not None and mw.is_busy) or self._interaction_locked
+    @property
+    def _is_chain_executing(self) -> bool:
+        return self._chain_executing
+    @_is_chain_executing.setter
+    def _is_chain_executing(self, value: bool):
+        self._chain_executing = value
+        self._check_busy_edge()
+    @property
+    def interaction_locked(self) -> bool:
+        return self._interaction_locked
+    @interaction_locked.setter
+    def interaction_locked(self, value: bool):
+        self._interaction_locked = value
+        self._check_busy_edge()
+    def _check_busy_edge(self):
+        busy = self.is_busy
+        if busy == self._last_busy: return
+        self._last_busy = busy
+        if not busy:
+            self._post_busy_cooldown_end = time.time() + self.config.post_busy_delay
+            self._schedule_pending_drain()
     def _init_hotkeys(self):
         try:
             import keyboard
@@ -283,58 +345,66 @@ class ApplicationController(QObject):
             log(f"[Main] OverflowError in _on_audio_finished: {e}")
             self._is_chain_executing = False
     def _trigger_voice_response(self, text, emotion, voice_file=None, is_behavior=False, tts_text=None, tts_lang=None):
-        v_path = None
-        if voice_file:
-            pack_audio_path = self.config.pack_manager.get_path("audio", "event_dir")
-            v_path = (pack_audio_path / voice_file) if pack_audio_path else Path(voice_file)
-        if v_path and v_path.exists():
+        v_path = self.config.pack_manager.resolve_audio("event_dir", voice_file) if voice_file else None
+        if v_path:
             log(f"[Main] Playing pre-recorded: {v_path}")
             self.main_window.set_speaking(True)
             self.main_window.show_response(text, emotion)
             self.audio_player.play(str(v_path))
-        elif self.config.sovits_enabled and not is_behavior:
+        elif self.config.sovits_enabled and not is_behavior and self.sovits_manager and self.sovits_manager.is_ready:
             log("[Main] Handing over to SoVITS synthesis chain.")
             self.main_window.set_speaking(True)
             asyncio.run_coroutine_threadsafe(self._generate_tts(tts_text or text, emotion, language=tts_lang), self._loop)
         else:
+            if self.config.sovits_enabled and not is_behavior:
+                log(f"[Main] SoVITS not ready ({self.sovits_manager.state if self.sovits_manager else 'none'}), text only.")
             log("[Main] No audio source available, showing text response with timeout.")
             self.main_window.show_behavior_response_with_timeout(text, emotion)
+    def _handle_sovits_state(self, state: str, detail: str):
+        tray = getattr(self, "tray_icon", None)
+        if tray is None: return
+        tray.set_tts_status(state)
+        if state == SoVITSState.FAILED:
+            tray.show_message("SoVITS Error", f"无法启动 GPT-SoVITS 服务，请检查配置。暂时只显示文字回复。\n{detail}",
+                              QSystemTrayIcon.MessageIcon.Warning)
     async def _generate_tts(self, text: str, emotion: str, language: Optional[str] = None):
         if not language and self.config.use_pack_settings:
             language = self.config.pack_manager.get_info("tts_language", "ja")
 
         result = await self.tts_backend.synthesize(text, emotion, language=language)
         self.tts_ready.emit(result)
-    def _handle_behavior_trigger(self, actions: list):
-        if not actions or self.main_window.manual_hidden: return
+    def _handle_behavior_trigger(self, fire: TriggerFire):
+        if not fire.actions or self.main_window.manual_hidden: return
         if self.interaction_locked: return
-        if self.main_window.is_processing or self.main_window.is_listening:
-            return
 
-        if self.is_busy:
-            return
-
-        now = time.time()
         is_debug = self.config.debug_trigger
         if is_debug:
-            self._execute_actions_chain(actions)
+            if not self.is_busy:
+                self.behavior_monitor.mark_dispatched(fire)
+                self._execute_actions_chain(fire.actions)
             return
-        if self.is_busy or now < self._trigger_cooldown_end:
-            if not self._pending_triggers:
-                self._pending_triggers.append(actions)
-        else:
-            self._trigger_cooldown_end = now + self.config.trigger_cooldown
-            self._execute_actions_chain(actions)
-    def _check_pending_triggers(self):
+        if self._pending_triggers.push(fire, time.time()):
+            self._schedule_pending_drain()
+    def _schedule_pending_drain(self):
+        if not self._pending_triggers or self.is_busy: return
+        delay = max(self._post_busy_cooldown_end, self._trigger_cooldown_end) - time.time()
+        self._drain_timer.start(max(0, int(delay * 1000)))
+    def _drain_pending_triggers(self):
+        if self.is_busy: return
         now = time.time()
-        if self._last_busy_state and not self.main_window.is_busy:
-            self._post_busy_cooldown_end = now + self.config.post_busy_delay
-        self._last_busy_state = self.main_window.is_busy
-        if self._pending_triggers and not self.is_busy and now >= self._post_busy_cooldown_end and now >= self._trigger_cooldown_end:
-            log("[Main] Executing pending trigger from queue.")
-            trigger = self._pending_triggers.pop(0)
-            self._trigger_cooldown_end = now + self.config.trigger_cooldown
-            self._execute_actions_chain(trigger)
+        if now < max(self._post_busy_cooldown_end, self._trigger_cooldown_end):
+            self._schedule_pending_drain()
+            return
+        # 随执行发生的状态变化都在 mark_dispatched 中提交，被去重、挤出或过期的命中没有副作用
+        while True:
+            fire = self._pending_triggers.pop(now)
+            if fire is None: return
+            if not self.behavior_monitor.is_superseded(fire): break
+            log(f"[Main] Dropping pending trigger {fire.rule_id}: its group already fired after it matched.")
+        log(f"[Main] Executing pending trigger {fire.rule_id} from queue.")
+        self._trigger_cooldown_end = now + self.config.trigger_cooldown
+        self.behavior_monitor.mark_dispatched(fire, now)
+        self._execute_actions_chain(fire.actions)
     def _execute_actions_chain(self, actions):
         self._is_chain_executing = True
         self._current_sequence = actions
@@ -447,12 +517,31 @@ class ApplicationController(QObject):
                         params = action.get("params", [])
                         threading.Thread(target=module.execute_action, args=(atype, params), daemon=True).start()
     def _handle_pack_change(self, pack_id: str):
-        log(f"[Main] Switching pack to {pack_id}")
-        self.main_window.hide()
-        self.config.pack_manager.set_active_pack(pack_id)
-        self.config.pack_manager.load_plugins(self.config.plugins_enabled)
+        # 新包在后台线程准备，期间旧包照常工作；准备完成后回到 GUI 线程一次性换入
+        self._pack_switch_seq += 1
+        seq, started = self._pack_switch_seq, time.perf_counter()
+        pm, plugins_enabled = self.config.pack_manager, self.config.plugins_enabled
+        log(f"[Main] Preparing pack {pack_id} in background")
+        def run():
+            try: result = pm.prepare(pack_id, plugins_enabled)
+            except Exception as e: result = e
+            self.pack_prepared.emit((seq, pack_id, started, result))
+        threading.Thread(target=run, name="resona-pack-switch", daemon=True).start()
+    def _apply_prepared_pack(self, payload):
+        seq, pack_id, started, prepared = payload
+        if seq != self._pack_switch_seq:
+            log(f"[Main] Pack {pack_id} superseded by a newer switch, discarded")
+            return
+        if isinstance(prepared, Exception):
+            log(f"[Main] Pack switch to {pack_id} failed, keeping current pack: {prepared}")
+            self.tray_icon.show_message("Pack Error", f"无法切换到资源包 {pack_id}，继续使用当前资源包。\n{prepared}",
+                                        QSystemTrayIcon.MessageIcon.Warning)
+            return
+        ready = time.perf_counter()
+        self._pending_triggers.clear()
+        self.config.pack_manager.activate(prepared)
 
-        pdata = self.config.pack_manager.pack_data
+        pdata = prepared.pack_data
         new_name = pdata.get("character", {}).get("name", "Unknown")
         new_outfit = pdata.get("character", {}).get("outfits", [{}])[0].get("id", "default")
         raw_prompt_rel = pdata.get("logic", {}).get("prompts", [{}])[0].get("path", "")
@@ -461,25 +550,32 @@ class ApplicationController(QObject):
         self.config.set("General", "default_outfit", new_outfit)
         self.config.set("Prompt", "file_path", Path(raw_prompt_rel).name)
         self.config.save()
-        if self.config.sovits_enabled:
-            self.sovits_manager.stop()
-            self.sovits_manager.start(timeout=60, kill_existing=True)
+        self.state.retarget(self.state_path)
+        self.main_window.stats.set_total_clicks(self.state.counter("total_clicks").value)
+        self.tts_backend.emotions_config = prepared.emotions
+        # 以下读取都命中 prepare() 预热过的资源缓存
         self.behavior_monitor.load_triggers()
         self.main_window.load_thinking_texts()
         self.main_window.load_listening_texts()
-        self.main_window.manual_show()
+        if prepared.outfit: self.main_window.safe_set_outfit(prepared.outfit)
+        if self.sovits_manager:
+            # 停止旧服务与启动新服务都在后台线程，就绪前回复只显示文字
+            self.sovits_manager.start_async(timeout=60, kill_existing=True, restart=True)
+        done = time.perf_counter()
+        phases = ", ".join(f"{k}={v}ms" for k, v in prepared.timings.items())
+        log(f"[Main] Pack switched to {prepared.folder} in {(done - started) * 1000:.0f}ms "
+            f"(prepare {(ready - started) * 1000:.0f}ms: {phases}; swap {(done - ready) * 1000:.0f}ms)")
     def _show_error_response(self, error_type, details=""):
         error_config_path = self.config.pack_manager.get_path("logic", "error_config")
         text, emotion, audio = f"Error: {details}", "<E:sad>", None
-        if error_config_path and error_config_path.exists():
+        if error_config_path and self.config.pack_manager.exists(error_config_path):
             try:
-                with open(error_config_path, "r", encoding="utf-8") as f:
-                    cfg = json.load(f).get(error_type, {})
-                    text = cfg.get("text", text)
-                    emotion = cfg.get("emotion", emotion)
-                    if cfg.get("audio"):
-                        aud_dir = self.config.pack_manager.get_path("audio", "error_dir")
-                        if aud_dir: audio = str(aud_dir / cfg["audio"])
+                cfg = self.config.pack_manager.read_json(error_config_path).get(error_type, {})
+                text = cfg.get("text", text)
+                emotion = cfg.get("emotion", emotion)
+                if cfg.get("audio"):
+                    aud_path = self.config.pack_manager.resolve_audio("error_dir", cfg["audio"])
+                    if aud_path: audio = str(aud_path)
             except: pass
         self._trigger_voice_response(text, emotion, audio, is_behavior=True)
         self._is_chain_executing = False
@@ -511,6 +607,16 @@ class ApplicationController(QObject):
             QTimer.singleShot(2000, self.main_window.finish_processing)
     def _handle_fullscreen_status(self, hidden):
         self.main_window.set_fullscreen_hidden(hidden)
+    def _handle_eco_mode(self, active, reason):
+        log(f"[Eco] {'Entering' if active else 'Leaving'} eco mode ({reason or 'resumed'})")
+        self.main_window.set_eco_mode(active)
+        if active and self.config.eco_unload_stt and self._stt_ready:
+            if self.stt_backend.unload_model():
+                self._stt_ready = False
+                self._stt_unloaded_by_eco = True
+        elif not active and self._stt_unloaded_by_eco:
+            self._stt_unloaded_by_eco = False
+            asyncio.run_coroutine_threadsafe(self._async_init_stt(), self._loop)
     def _check_startup_events(self):
         enabled = self.config.weather_enabled
         log(f"[Main] Startup events check. Weather enabled: {enabled}")
@@ -558,30 +664,28 @@ class ApplicationController(QObject):
         if SimpleSettingsDialog(self.config).exec():
             log("[Main] Config updated via settings dialog.")
             self.config.load()
+    def _on_config_changed(self, snapshot, changed):
+        # 只处理与改动字段相关的子系统，其余设置在下次读取时自然生效
+        log(f"[Main] Config changed: {', '.join(sorted(changed))}")
+        if changed & {"pending_queue_size", "pending_trigger_ttl"}:
+            self._pending_triggers.capacity = snapshot.pending_queue_size
+            self._pending_triggers.ttl = snapshot.pending_trigger_ttl
+        if changed & {"always_on_top", "show_in_taskbar"} and not self.main_window.manual_hidden:
+            self.main_window._apply_window_settings()
+        if changed & {"plugins_enabled", "use_pack_settings"}:
+            self.config.pack_manager.load_plugins(snapshot.plugins_enabled)
             self.behavior_monitor.load_triggers()
     def cleanup(self):
         if self._mocker_process: self._mocker_process.terminate()
         if self.behavior_monitor: self.behavior_monitor.stop()
         if self.sovits_manager: self.sovits_manager.stop()
         self.stt_backend.cleanup()
+        self.state.close()
         cleanup_manager.cleanup()
         self._loop.call_soon_threadsafe(self._loop.stop)
     @property
     def state_path(self) -> Path:
-        pack_dir = self.config.pack_manager.packs_dir / self.config.pack_manager.active_pack_id
-        return pack_dir / "state.json"
-    def _load_state(self) -> dict:
-        if self.state_path.exists():
-            try:
-                with open(self.state_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except: pass
-        return {}
-    def _save_state(self):
-        try:
-            with open(self.state_path, "w", encoding="utf-8") as f:
-                json.dump(self.state, f, indent=4, ensure_ascii=False)
-        except: pass
+        return self.config.pack_manager.data_dir / "state.json"
 def is_admin():
     try: return ctypes.windll.shell32.IsUserAnAdmin()
     except: return False
@@ -591,26 +695,28 @@ def main():
     config = ConfigManager()
     needs_admin = False
     trigger_path = config.pack_manager.get_path("logic", "triggers")
-    if trigger_path and trigger_path.exists():
+    if trigger_path and config.pack_manager.exists(trigger_path):
         try:
-            with open(trigger_path, "r", encoding="utf-8") as f:
-                triggers = json.load(f)
-                def check_sensitive(node):
-                    if isinstance(node, dict):
-                        if node.get('type') in ['cpu_temp', 'gpu_temp', 'url_match']: return True
-                        for c in node.get('conditions', []):
-                            if check_sensitive(c): return True
-                    return False
-                for rule in triggers:
-                    if check_sensitive(rule): needs_admin = True; break
+            # 解析结果缓存在 PackManager 中，BehaviorMonitor.load_triggers 直接复用
+            triggers = config.pack_manager.read_json(trigger_path)
+            def check_sensitive(node):
+                if isinstance(node, dict):
+                    if node.get('type') in ['cpu_temp', 'gpu_temp', 'url_match']: return True
+                    for c in node.get('conditions', []):
+                        if check_sensitive(c): return True
+                return False
+            for rule in triggers:
+                if check_sensitive(rule): needs_admin = True; break
         except: pass
     if needs_admin and sys.platform == 'win32' and not is_admin():
         run_as_admin()
         sys.exit()
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
-    controller = ApplicationController(sovits_log_path=sovits_log_file)
+    controller = ApplicationController(config, sovits_log_path=sovits_log_file)
     app.aboutToQuit.connect(controller.cleanup)
-    sys.exit(app.exec())
+    code = app.exec()
+    log_pipeline.stop()
+    sys.exit(code)
 if __name__ == "__main__":
     main()
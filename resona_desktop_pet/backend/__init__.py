@@ -1,6 +1,20 @@
-from .llm_backend import LLMBackend
-from .tts_backend import TTSBackend
-from .stt_backend import STTBackend
-from .sovits_manager import SoVITSManager
+import importlib
+
+# 按需导入：只 import 本包时不会连带加载各后端模块及其依赖
+_LAZY = {
+    "LLMBackend": ".llm_backend",
+    "TTSBackend": ".tts_backend",
+    "STTBackend": ".stt_backend",
+    "SoVITSManager": ".sovits_manager",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None: raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = ["LLMBackend", "TTSBackend", "STTBackend", "SoVITSManager"]
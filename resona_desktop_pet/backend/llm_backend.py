@@ -1,5 +1,6 @@
 ﻿import json
 import re
+import threading
 from datetime import datetime
 from typing import Optional, Callable, Any, List
 from pathlib import Path
@@ -50,10 +51,23 @@ class LLMBackend:
         self._claude_client = None
         self._gemini_safety = {}
         self._active_model_name = None
-        
-        self.reconnect()
+        # warm_up 线程与 query 可能同时初始化客户端，串行化后只会建一次
+        self._client_lock = threading.RLock()
+        # 不在构造时导入 SDK（openai / anthropic / genai 导入耗时较长），由 warm_up 或首次 query 触发
+
+    def warm_up(self):
+        """在后台线程预先导入并初始化当前模型的客户端。"""
+        self._ensure_client(self.config.get_llm_config()["model_name"])
+
+    def _ensure_client(self, model_name: str):
+        with self._client_lock:
+            if model_name != self._active_model_name: self.reconnect()
 
     def reconnect(self):
+        with self._client_lock:
+            self._reconnect()
+
+    def _reconnect(self):
         llm_cfg = self.config.get_llm_config()
         model_type = llm_cfg["model_type"]
         model_name = llm_cfg["model_name"]
@@ -155,15 +169,9 @@ class LLMBackend:
         llm_logger = logging.getLogger("LLM")
         
         if not self.log_path: return
+        # 只入队，由日志管线的写线程写入 llm_*.log，不阻塞 asyncio 循环
         try:
-            self.log_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.log_path, "a", encoding="utf-8") as f:
-                ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                f.write(f"\n={'='*20} {ts} {'='*20}\n")
-                f.write(f"[REQUEST]\n{json.dumps(request_data, ensure_ascii=False, indent=2)}\n")
-                f.write(f"[RESPONSE RAW]\n{response_raw}\n")
-            
-            llm_logger.info(f"Interaction logged to {self.log_path.name}")
+            llm_logger.info(f"\n[REQUEST]\n{json.dumps(request_data, ensure_ascii=False, indent=2)}\n[RESPONSE RAW]\n{response_raw}")
         except Exception as e:
             print(f"[LLM] Logging error: {e}")
 
@@ -300,8 +308,7 @@ class LLMBackend:
         model_type = llm_config["model_type"]
         model_name = llm_config["model_name"]
         
-        if model_name != self._active_model_name:
-            self.reconnect()
+        self._ensure_client(model_name)
 
         try:
             messages = self._build_messages(question)
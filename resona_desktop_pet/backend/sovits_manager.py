@@ -2,25 +2,56 @@
 import sys
 import subprocess
 import time
-import requests
 import threading
+import logging
 import re
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 import signal
 import psutil
 from ..cleanup_manager import register_cleanup, register_pid
 
+class SoVITSState:
+    IDLE = "idle"
+    STARTING = "starting"    # 正在准备配置并拉起子进程
+    WARMING = "warming"      # 子进程已启动，等待 API 响应（加载模型中）
+    READY = "ready"
+    FAILED = "failed"
+
+
 class SoVITSManager:
-    def __init__(self, project_root: Path, port: int = 9880, device: str = "cuda", model_version: str = "v2"):
+    def __init__(self, project_root: Path, port: int = 9880, device: str = "cuda", model_version: str = "v2", pack_manager=None):
         self.project_root = project_root
+        self.pack_manager = pack_manager
         self.port = port
         self.device = device
         self.model_version = model_version
         self.process: Optional[subprocess.Popen] = None
         self.api_url = f"http://127.0.0.1:{port}"
+        self.state = SoVITSState.IDLE
+        self.state_detail = ""
+        # 状态回调在启动线程中调用，GUI 侧应通过 Signal 转回主线程
+        self.on_state_changed: Optional[Callable[[str, str], None]] = None
+        self._start_thread: Optional[threading.Thread] = None
+        self.api_script = None
         register_cleanup(self.stop)
-        gpt_sovits_root = project_root / "GPT-SoVITS"
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == SoVITSState.READY
+
+    def _set_state(self, state: str, detail: str = "") -> bool:
+        self.state, self.state_detail = state, detail
+        logging.info(f"[SoVITS] 状态: {state}{f' ({detail})' if detail else ''}")
+        if self.on_state_changed:
+            try: self.on_state_changed(state, detail)
+            except Exception: pass
+        return state == SoVITSState.READY
+
+    def _locate_api(self):
+        # 在启动线程中遍历 GPT-SoVITS 目录，避免阻塞界面
+        if self.api_script is not None: return
+        gpt_sovits_root = self.project_root / "GPT-SoVITS"
         api_files = list(gpt_sovits_root.rglob("api_v2.py"))
         if api_files:
             self.api_script = api_files[-1]
@@ -31,19 +62,50 @@ class SoVITSManager:
         try: self.rel_api_script = os.path.relpath(self.api_script, self.gpt_sovits_dir)
         except: self.rel_api_script = str(self.api_script)
         self.config_file = self.gpt_sovits_dir / "configs" / "tts_infer.yaml"
-        
+
+    def _resolve_pack(self):
+        # 有 PackManager 时直接复用其已解析的当前包，不再重复读取 config.cfg 与扫描 pack.json
+        if self.pack_manager is not None:
+            return self.pack_manager.active_pack_id, self.pack_manager.pack_root
+        pack_id = "Resona_Default"
+        try:
+            import configparser
+            cfg = configparser.ConfigParser()
+            cfg.read(self.project_root / "config.cfg", encoding="utf-8")
+            pack_id = cfg.get("General", "active_pack", fallback="Resona_Default")
+        except: pass
+        return pack_id, self.project_root / "packs" / pack_id
+
     def is_running(self) -> bool:
         try:
+            import requests
             response = requests.get(f"{self.api_url}/", timeout=2)
             return response.status_code == 200 or response.status_code == 404
         except Exception: return False
     
+    def start_async(self, timeout: int = 60, kill_existing: bool = False, restart: bool = False) -> threading.Thread:
+        """在后台线程中启动，进度通过 on_state_changed 通知。若上一次启动仍在进行，先等它结束。
+
+        restart=True 时先在同一线程中停止当前服务（切换资源包时使用），停止等待也不占用 GUI 线程。
+        """
+        previous = self._start_thread
+        def run():
+            if previous and previous.is_alive(): previous.join()
+            if restart: self.stop()
+            try: self.start(timeout, kill_existing)
+            except Exception as e: self._set_state(SoVITSState.FAILED, str(e))
+        self._start_thread = threading.Thread(target=run, name="resona-sovits-start", daemon=True)
+        self._start_thread.start()
+        return self._start_thread
+
     def start(self, timeout: int = 60, kill_existing: bool = False) -> bool:
+        self._set_state(SoVITSState.STARTING)
         if self.is_running():
             if kill_existing:
                 self._kill_process_on_port(self.port)
                 time.sleep(2)
-            else: return True
+            else: return self._set_state(SoVITSState.READY, "reused")
+        self._locate_api()
         
         if sys.platform == "win32":
             try:
@@ -56,38 +118,24 @@ class SoVITSManager:
                     with open(pth_path, "w", encoding="utf-8") as f: f.write(fix_code)
             except: pass
 
-        if not self.api_script.exists(): return False
-        if not self.config_file.exists(): return False
+        if not self.api_script.exists(): return self._set_state(SoVITSState.FAILED, f"missing {self.api_script}")
+        if not self.config_file.exists(): return self._set_state(SoVITSState.FAILED, f"missing {self.config_file}")
         actual_config_file = self.config_file
-        pack_id = "Resona_Default"
-        try:
-            import configparser
-            cfg = configparser.ConfigParser()
-            cfg.read(self.project_root / "config.cfg", encoding="utf-8")
-            pack_id = cfg.get("General", "active_pack", fallback="Resona_Default")
-        except: pass
-        
-        pack_dir = self.project_root / "packs" / pack_id
+        pack_id, pack_dir = self._resolve_pack()
         if not pack_dir.exists():
-            found = False
-            for subdir in (self.project_root / "packs").iterdir():
-                if subdir.is_dir():
-                    pack_json = subdir / "pack.json"
-                    if pack_json.exists():
-                        try:
-                            import json
-                            with open(pack_json, "r", encoding="utf-8") as f:
-                                data = json.load(f)
-                                info = data.get("pack_info", {})
-                                if info.get("id") == pack_id or data.get("id") == pack_id:
-                                    pack_dir = subdir
-                                    found = True
-                                    break
-                        except: pass
-            if not found:
+            # 目录名与包 id 不一致时通过包索引查找，不再逐个解析 pack.json
+            if self.pack_manager is not None: index = self.pack_manager.index
+            else:
+                from ..config.pack_index import PackIndex
+                index = PackIndex(self.project_root / "packs", self.project_root / "cache" / "pack_index.json")
+            entry = index.get(pack_id)
+            if entry is not None: pack_dir = index.packs_dir / entry.folder
+            else:
                 print(f"[SoVITS] Warning: Pack ID '{pack_id}' not found in any directory.")
                 
         pack_model_dir = pack_dir / "models" / "sovits"
+        # .resonapack 内的模型需解出为真实文件才能交给 SoVITS 进程
+        if self.pack_manager is not None: pack_model_dir = self.pack_manager.materialize(pack_model_dir)
         if self.device == "cuda":
             try:
                 override_path = self.project_root / "TEMP" / f"tts_infer_override_{pack_id}.yaml"
@@ -140,21 +188,34 @@ class SoVITSManager:
                     win32job.AssignProcessToJobObject(h_job, self.process._handle)
                     self._h_job = h_job
                 except Exception: pass
-            def stream_output(pipe, prefix):
+            def stream_output(pipe, logger, level):
+                # 子进程输出走 SoVITS 专用日志（入队即返回，且有限流），不再逐行 print 到主日志
+                # stderr 至少按 WARNING 记录，会同时出现在主日志；Traceback 整段（到异常说明行为止）按 ERROR 记录
+                in_traceback = False
                 try:
                     for line in iter(pipe.readline, ''):
-                        if line: print(f"{prefix} {line.strip()}")
+                        if not line.strip(): continue
+                        line_level = level
+                        if level >= logging.WARNING:
+                            if line.startswith("Traceback"): in_traceback = True
+                            if in_traceback:
+                                line_level = logging.ERROR
+                                if not line[:1].isspace() and not line.startswith("Traceback"): in_traceback = False
+                        logger.log(line_level, line.rstrip())
                 except Exception: pass
-            threading.Thread(target=stream_output, args=(self.process.stdout, "[SoVITS]"), daemon=True).start()
-            threading.Thread(target=stream_output, args=(self.process.stderr, "[SoVITS Error]"), daemon=True).start()
+            threading.Thread(target=stream_output, args=(self.process.stdout, logging.getLogger("SoVITS.stdout"), logging.INFO), daemon=True).start()
+            threading.Thread(target=stream_output, args=(self.process.stderr, logging.getLogger("SoVITS.stderr"), logging.WARNING), daemon=True).start()
+            self._set_state(SoVITSState.WARMING)
             start_time = time.time()
             while time.time() - start_time < timeout:
-                if self.is_running(): return True
-                if self.process.poll() is not None: return False
+                if self.is_running(): return self._set_state(SoVITSState.READY)
+                process = self.process
+                if process is None: return False  # 被 stop() 主动中止，状态已置为 IDLE
+                if process.poll() is not None: return self._set_state(SoVITSState.FAILED, f"exited with code {process.returncode}")
                 time.sleep(0.5)
             self.stop()
-            return False
-        except Exception: return False
+            return self._set_state(SoVITSState.FAILED, f"timeout after {timeout}s")
+        except Exception as e: return self._set_state(SoVITSState.FAILED, str(e))
     
     def _kill_process_on_port(self, port: int):
         for proc in psutil.process_iter(['pid', 'name']):
@@ -166,7 +227,9 @@ class SoVITSManager:
     def stop(self) -> None:
         if self.process is None: return
         try:
-            try: requests.post(f"{self.api_url}/control", json={"command": "exit"}, timeout=2)
+            try:
+                import requests
+                requests.post(f"{self.api_url}/control", json={"command": "exit"}, timeout=2)
             except: pass
             try:
                 parent = psutil.Process(self.process.pid)
@@ -183,7 +246,9 @@ class SoVITSManager:
                     if sys.platform == "win32": subprocess.run(["taskkill", "/F", "/T", "/PID", str(self.process.pid)], capture_output=True)
                     else: os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
         except Exception: pass
-        finally: self.process = None
+        finally:
+            self.process = None
+            self._set_state(SoVITSState.IDLE)
     
     def restart(self, timeout: int = 60) -> bool:
         self.stop(); time.sleep(2); return self.start(timeout)
@@ -3,7 +3,6 @@ import os
 import tarfile
 import threading
 import wave
-import requests
 from pathlib import Path
 from typing import Optional, Callable
 from dataclasses import dataclass
@@ -23,6 +22,7 @@ class STTBackend:
         self.config = config
         self.project_root = Path(config.config_path).parent
         self._recognizer = None
+        self.num_threads = 4
         self._stream = None
         self._is_recording = False
         self._audio_data = []
@@ -53,6 +53,7 @@ class STTBackend:
         filename = url.split("/")[-1]
         target_path = target_dir / filename
         try:
+            import requests
             response = requests.get(url, stream=True)
             response.raise_for_status()
             with open(target_path, 'wb') as f:
@@ -103,7 +104,6 @@ class STTBackend:
             log(f"CRITICAL: Model directory {model_dir} does not exist.")
             return False
         try:
-            import sherpa_onnx
             model_file, tokens_file = None, None
             for f in model_dir.iterdir():
                 if f.name.endswith(".onnx"): model_file = f
@@ -112,14 +112,8 @@ class STTBackend:
                 log(f"CRITICAL: Missing files in {model_dir}. Need .onnx and tokens.txt")
                 return False
             log(f"Loading SenseVoice model: {model_file.name} (Lang: {current_lang or 'auto'})")
-            self._recognizer = sherpa_onnx.OfflineRecognizer.from_sense_voice(
-                model=str(model_file.absolute()), 
-                tokens=str(tokens_file.absolute()), 
-                num_threads=4, 
-                use_itn=True, 
-                debug=False,
-                language=current_lang
-            )
+            # sherpa_onnx 的导入与模型构建都较慢，放到工作线程，避免阻塞 asyncio 循环
+            self._recognizer = await asyncio.to_thread(self._create_recognizer, model_file, tokens_file, current_lang)
             self._model_loaded = True
             self._loaded_language = current_lang
             log("SenseVoice model loaded successfully.")
@@ -128,6 +122,17 @@ class STTBackend:
             log(f"Failed to initialize sherpa-onnx: {e}")
             return False
 
+    def _create_recognizer(self, model_file: Path, tokens_file: Path, language: str):
+        import sherpa_onnx
+        return sherpa_onnx.OfflineRecognizer.from_sense_voice(
+            model=str(model_file.absolute()),
+            tokens=str(tokens_file.absolute()),
+            num_threads=self.num_threads,
+            use_itn=True,
+            debug=False,
+            language=language
+        )
+
     async def _extract_model(self, archive_path: Path, target_dir: Path) -> None:
         await asyncio.get_event_loop().run_in_executor(None, self._extract_sync, archive_path, target_dir)
 
@@ -237,6 +242,12 @@ class STTBackend:
             log(f"Recognition error: {e}")
             return STTResult(error=str(e))
 
+    def unload_model(self) -> bool:
+        if self._is_recording or not self._model_loaded: return False
+        self._recognizer = None
+        self._model_loaded = False
+        log("SenseVoice model unloaded.")
+        return True
     def stop_recording(self) -> None: self._is_recording = False
     def is_recording(self) -> bool: return self._is_recording
     def cleanup(self) -> None: self.stop_recording(); self.unregister_hotkey()
@@ -1,7 +1,7 @@
 import json
 import os
 import asyncio
-import aiohttp
+import logging
 import traceback
 from datetime import datetime
 from pathlib import Path
@@ -16,6 +16,10 @@ class TTSResult:
 def log(message):
     timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
     print(f"[{timestamp}] {message}")
+def _parse_yaml(path: Path):
+    import yaml
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
 class TTSBackend:
     def __init__(self, config: ConfigManager, sovits_log_path: Optional[Path] = None):
         self.config = config
@@ -25,15 +29,22 @@ class TTSBackend:
         self._temp_dir = self.project_root / "TEMP"
         self._temp_dir.mkdir(exist_ok=True)
         self.api_url = f"http://127.0.0.1:{config.sovits_api_port}"
-        self.timeout = aiohttp.ClientTimeout(total=config.sovits_timeout)
+        self._timeout = None
+    @property
+    def timeout(self):
+        # aiohttp 导入较慢，推迟到第一次请求 SoVITS 时
+        if self._timeout is None:
+            import aiohttp
+            self._timeout = aiohttp.ClientTimeout(total=self.config.sovits_timeout)
+        return self._timeout
+
     def _load_emotions_config(self) -> dict:
         json_path = self.config.pack_manager.get_path("logic", "emotions")
-        if json_path and json_path.exists():
+        if json_path and self.config.pack_manager.exists(json_path):
             try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    log(f"[TTS] Loaded {len(data)} emotions from pack.")
-                    return data
+                data = self.config.pack_manager.read_json(json_path)
+                log(f"[TTS] Loaded {len(data)} emotions from pack.")
+                return data
             except Exception as e:
                 log(f"[TTS] CRITICAL: Error loading pack emotions.json: {e}")
         return {}
@@ -44,40 +55,39 @@ class TTSBackend:
             target = "<E:smile>"
         return self.emotions_config.get(target, {})
     def _resolve_ref_audio_path(self, ref_wav: str) -> Path:
-        pack_emotion_dir = self.config.pack_manager.get_path("audio", "emotion_dir")
-        if pack_emotion_dir:
-            path = pack_emotion_dir / ref_wav
-            if path.exists():
-                return path
+        path = self.config.pack_manager.resolve_audio("emotion_dir", ref_wav)
+        if path: return path
         raise FileNotFoundError(f"Reference audio {ref_wav} not found.")
     def _log_sovits_params(self, payload: dict):
         log_file_path = self.sovits_log_path if self.sovits_log_path else self.project_root / "sovits_log.txt"
         models_info = "Unknown models"
         override_config = self.project_root / "models" / "sovits" / "tts_infer_override.yaml"
-        if override_config.exists():
-            try:
-                import yaml
-                with open(override_config, "r", encoding="utf-8") as f:
-                    config_data = yaml.safe_load(f)
-                    ver_key = self.config.sovits_model_version
-                    section = config_data.get(ver_key, config_data.get("default", {}))
-                    t2s = section.get("t2s_weights_path", "N/A")
-                    vits = section.get("vits_weights_path", "N/A")
-                    ver = section.get("version", ver_key)
-                    models_info = f"GPT: {t2s}, SoVITS: {vits}, Version: {ver}"
-            except: pass
+        try:
+            config_data = self.config.pack_manager.read_resource(override_config, "yaml", _parse_yaml)
+            ver_key = self.config.sovits_model_version
+            section = config_data.get(ver_key, config_data.get("default", {}))
+            t2s = section.get("t2s_weights_path", "N/A")
+            vits = section.get("vits_weights_path", "N/A")
+            ver = section.get("version", ver_key)
+            models_info = f"GPT: {t2s}, SoVITS: {vits}, Version: {ver}"
+        except: pass
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
         log_entry = f"""---
 {timestamp} ---
 Models: {models_info}
 Parameters: {json.dumps(payload, ensure_ascii=False, indent=2)}
 """
+        if self.sovits_log_path:
+            # 由日志管线的写线程落盘，避免在 asyncio 循环线程上做文件 IO
+            logging.getLogger("SoVITS.params").info(log_entry.rstrip())
+            return
         try:
             with open(log_file_path, "a", encoding="utf-8") as f: f.write(log_entry)
         except: pass
     async def load_model(self) -> bool:
         if not self.config.sovits_enabled: return False
         try:
+            import aiohttp
             async with aiohttp.ClientSession(timeout=self.timeout) as session:
                 async with session.get(self.api_url) as response:
                     return response.status in [200, 404, 405]
@@ -110,6 +120,7 @@ Parameters: {json.dumps(payload, ensure_ascii=False, indent=2)}
             }
             self._log_sovits_params(payload)
             log(f"[TTS] Sending request to {self.api_url}/tts")
+            import aiohttp
             async with aiohttp.ClientSession(timeout=self.timeout) as session:
                 async with session.post(f"{self.api_url}/tts", json=payload) as response:
                     log(f"[TTS] API response status: {response.status}")
@@ -1,20 +1,34 @@
-import json
 import time
 import random
 import ctypes
 import psutil
 import logging
+import threading
+from collections import deque
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from PySide6.QtCore import QThread, Signal
+from .eco_mode import EcoModePolicy
+from .mock_channel import MockChannelServer
+from .sensor_collector import SensorCollector
+from .ui.clipboard_watcher import ClipboardSnapshot
+from .ui.interaction_stats import InteractionSnapshot
+from .triggers import (CalendarCondition, CALENDAR_TYPES, AGGREGATE_TYPES, CumulativeWindow, PidLedger, SensorAggregates, SequenceAutomaton,
+                       TriggerFire, is_calendar_only, iter_leaf_conditions, next_calendar_change)
+MAX_SCHEDULED_SLEEP = 300.0
+HARDWARE_TYPES = ("cpu_temp", "gpu_temp", "cpu_usage", "gpu_usage")
+def _rule_priority(rule) -> int:
+    try: return int(rule.get("priority", 0))
+    except (TypeError, ValueError): return 0
 class WindowInfo:
     def __init__(self, hwnd, pid, title, process_name, rect, url=None):
         self.hwnd = hwnd; self.pid = pid; self.title = title
         self.process_name = process_name.lower(); self.rect = rect; self.url = url
 class BehaviorMonitor(QThread):
     fullscreen_status_changed = Signal(bool)
-    trigger_matched = Signal(list)
+    eco_mode_changed = Signal(bool, str)
+    trigger_matched = Signal(object)
     def __init__(self, config_manager, controller):
         super().__init__()
         self.config = config_manager
@@ -22,24 +36,49 @@ class BehaviorMonitor(QThread):
         self.project_root = Path(config_manager.config_path).parent
         self.running = True
         self.triggers = []
+        self._rule_order = []
         self.app_start_time = time.time()
         self.global_history = {}
         self.trigger_counts = {}
         self.pid_history = {}
-        self.triggered_pids = set()
-        self.rule_hit_states = {}
+        self.pid_ledger = PidLedger()
+        self._sequences = {}
+        self._cumulative = {}
+        # 已执行、待行为线程提交的命中（one_shot PID、SEQUENCE / CUMULATIVE 清零）
+        self._dispatched = deque()
         self.last_cycle_idle = 0.0
         self.is_fullscreen = False
         self.is_first_run = True
-        self.last_clip_text = self._get_clipboard()
+        clip = self._clipboard_snapshot()
+        self.last_clip_text = clip.text
+        self._last_clip_version = clip.version
         self.last_music_title = ""
         self._last_mock_data = {}
+        self._last_mock_version = 0
+        self._mock_channel = None
         self.plugin_status_cache = {}
+        self._wake_event = threading.Event()
+        self._calendar_specs = {}
+        self._calendar_only = False
+        self._next_full_check = 0.0
+        self._retry_pending = False
+        self.sensor_aggregates = SensorAggregates()
+        self.sensor_collector = SensorCollector()
+        self.eco_mode = EcoModePolicy(config_manager)
+        self._last_hw_stats = {"cpu_temp": 0.0, "gpu_temp": 0.0, "cpu_usage": 0.0, "gpu_usage": 0.0}
         self.load_triggers()
+        # 只关心影响调度的配置项，其他设置变化不会打扰行为线程
+        config_manager.subscribe(self._on_config_changed, ("behavior_interval", "behavior_enabled", "debug_trigger",
+                                                           "trigger_cooldown", "eco_mode_enabled", "eco_interval_factor"))
+    def _on_config_changed(self, snapshot, changed):
+        if "behavior_interval" in changed:
+            self.sensor_aggregates.compile(self.triggers, snapshot.behavior_interval)
+        self._next_full_check = 0.0
+        self.wake()
 
     def _poll_plugins(self):
         pm = self.config.pack_manager
-        if not self.config.plugins_enabled:
+        if not self.config.snapshot.plugins_enabled:
             self.plugin_status_cache = {}
             return
 
@@ -68,36 +107,150 @@ class BehaviorMonitor(QThread):
 
     def load_triggers(self):
         trigger_path = self.config.pack_manager.get_path("logic", "triggers")
-        if trigger_path and trigger_path.exists():
+        compiled = self.config.pack_manager.compiled()
+        if compiled is not None:
+            # tools/validate_pack.py 生成的规则已校验并规范化，无效规则已剔除
+            self.triggers = compiled["triggers"]
+            logging.info(f"[Behavior] Loaded {len(self.triggers)} precompiled triggers.")
+        elif trigger_path and self.config.pack_manager.exists(trigger_path):
             try:
-                with open(trigger_path, "r", encoding="utf-8") as f:
-                    self.triggers = json.load(f)
+                self.triggers = self.config.pack_manager.read_json(trigger_path)
                 logging.info(f"[Behavior] Loaded {len(self.triggers)} triggers from pack.")
             except Exception as e:
                 logging.error(f"[Behavior] Load failed: {e}")
+        self._compile_schedule()
+        self.sensor_aggregates.compile(self.triggers, self.config.snapshot.behavior_interval)
+        self._compile_logic_state()
+        self.pid_ledger.forget_rules({str(r.get("id", "default")) for r in self.triggers if r.get("one_shot_per_pid")})
+        self.wake()
+    def _compile_schedule(self):
+        # priority 越大越先判定，同优先级保持文件顺序
+        self._rule_order = sorted(self.triggers, key=lambda r: -_rule_priority(r))
+        self._calendar_specs = {}
+        for rule in self.triggers:
+            for c in iter_leaf_conditions(rule):
+                if c.get("type") in CALENDAR_TYPES:
+                    self._calendar_specs[id(c)] = CalendarCondition(c)
+        active = [r for r in self.triggers if r.get("enabled", True) and not r.get("startup_only")]
+        self._calendar_only = bool(active) and all(is_calendar_only(r) for r in active)
+        self._next_full_check = 0.0
+        if self._calendar_only:
+            logging.info(f"[Behavior] 仅含日历条件 ({len(self._calendar_specs)} 个)，空闲时按计划唤醒。")
+    def _compile_logic_state(self):
+        # SEQUENCE / CUMULATIVE 节点需要跨 tick 保存状态，按 rule_id + 节点路径预分配；结构未变的节点沿用旧状态
+        sequences, cumulative = {}, {}
+        def walk(node, rid, path):
+            conds = node.get("conditions", [])
+            logic = node.get("logic", "AND").upper()
+            if logic == "SEQUENCE":
+                old = self._sequences.get(rid, {}).get(path)
+                within = float(node.get("within_sec", 300))
+                if old and old.steps == len(conds) and old.within_sec == within:
+                    sequences.setdefault(rid, {})[path] = old
+                else:
+                    sequences.setdefault(rid, {})[path] = SequenceAutomaton(len(conds), within)
+            elif logic == "CUMULATIVE":
+                old = self._cumulative.get(rid, {}).get(path)
+                window = float(node.get("window_sec", 0) or 0)
+                reset = bool(node.get("reset_on_fire", True))
+                if old and old.slots == len(conds) and old.window_sec == window:
+                    old.reset_on_fire = reset
+                    cumulative.setdefault(rid, {})[path] = old
+                else:
+                    cumulative.setdefault(rid, {})[path] = CumulativeWindow(len(conds), window, reset)
+            for i, c in enumerate(conds):
+                if "logic" in c: walk(c, rid, f"{path}_{i}")
+        for rule in self.triggers:
+            walk(rule, str(rule.get("id", "default")), "root")
+        self._sequences = sequences
+        self._cumulative = cumulative
+    def wake(self):
+        self._wake_event.set()
+    def mark_dispatched(self, fire: TriggerFire, now: Optional[float] = None):
+        # 动作真正执行时由控制器调用；排队后被去重、挤出或过期的命中没有任何副作用
+        # 冷却与次数立即计入；自动机与 PID 记录只在行为线程上修改，下一轮判定前统一提交
+        now = time.time() if now is None else now
+        self.global_history[fire.group] = now
+        self._last_any_trigger_time = now
+        self.trigger_counts[fire.group] = self.trigger_counts.get(fire.group, 0) + 1
+        self._dispatched.append(fire)
+    def is_superseded(self, fire: TriggerFire) -> bool:
+        """同组在这次命中之后已经执行过（判定与执行并发时会出现），这条不应再执行。"""
+        return self.global_history.get(fire.group, 0) >= fire.matched_at
+    def _commit_dispatched(self):
+        while self._dispatched:
+            fire = self._dispatched.popleft()
+            for automaton in self._sequences.get(fire.rule_id, {}).values(): automaton.reset()
+            for window in self._cumulative.get(fire.rule_id, {}).values():
+                if window.reset_on_fire: window.reset()
+            if fire.pids: self.pid_ledger.mark(fire.rule_id, fire.pids, fire.start_times)
     def stop(self):
         self.running = False
+        if self._mock_channel:
+            self._mock_channel.close()
+            self._mock_channel = None
+        self.sensor_collector.shutdown()
+        self.wake()
     def run(self):
         while self.running:
             try:
-                if self.config.behavior_enabled:
-                    self._perform_checks(is_startup=self.is_first_run)
-                    self.is_first_run = False
+                if self.config.snapshot.behavior_enabled:
+                    if self._can_sleep_until_scheduled() and time.time() < self._next_full_check:
+                        self._check_fullscreen_only()
+                        if self.eco_mode.active: self._update_eco_mode(self.is_fullscreen)
+                    else:
+                        self._perform_checks(is_startup=self.is_first_run)
+                        self.is_first_run = False
+                        self._next_full_check = self._compute_next_wake(time.time())
             except Exception as e:
                 logging.error(f"[Behavior] Loop error: {e}")
-            time.sleep(self.config.behavior_interval)
+            self._wake_event.wait(self.config.snapshot.behavior_interval)
+            self._wake_event.clear()
+    def _can_sleep_until_scheduled(self) -> bool:
+        if self.is_first_run or self.config.snapshot.debug_trigger: return False
+        return self._calendar_only or self.eco_mode.active
+    def _compute_next_wake(self, now: float) -> float:
+        if self.eco_mode.active and not self.config.snapshot.debug_trigger:
+            return now + self.config.snapshot.behavior_interval * self.config.snapshot.eco_interval_factor
+        if not self._calendar_only: return 0.0
+        if self._retry_pending: return now + self.config.snapshot.behavior_interval
+        candidates = [now + MAX_SCHEDULED_SLEEP]
+        change = next_calendar_change(self._calendar_specs.values(), datetime.fromtimestamp(now))
+        if change is not None: candidates.append(change.timestamp())
+        for rule in self.triggers:
+            gid = rule.get("trigger_group_id", str(rule.get("id", "default")))
+            if gid in self.global_history:
+                candidates.append(self.global_history[gid] + rule.get("cooldown", 5))
+        candidates.append(getattr(self, "_last_any_trigger_time", 0) + self.config.snapshot.trigger_cooldown)
+        return min(t for t in candidates if t > now)
+    def _update_eco_mode(self, is_fullscreen, on_battery=None, cpu_usage=None):
+        was_active, old_reason = self.eco_mode.active, self.eco_mode.reason
+        active, reason = self.eco_mode.evaluate(is_fullscreen, on_battery, cpu_usage)
+        if active == was_active and reason == old_reason: return
+        logging.info(f"[Behavior] 节能模式: {'进入' if active else '退出'} ({reason or old_reason})")
+        if not active: self._next_full_check = 0.0  # 退出时立即恢复完整检查
+        self.eco_mode_changed.emit(active, reason)
+    def _check_fullscreen_only(self):
+        try:
+            win_info = self._get_window_info(ctypes.windll.user32.GetForegroundWindow())
+        except Exception:
+            return
+        if win_info:
+            fs = self._is_fullscreen(win_info)
+            if fs != self.is_fullscreen:
+                self.is_fullscreen = fs
+                self.fullscreen_status_changed.emit(fs)
     def _perform_checks(self, is_startup=False):
         now = time.time()
         self._poll_plugins()
 
-        if self.config.debug_trigger:
-            mock_path = self.project_root / "TEMP" / "mock_data.json"
-            if mock_path.exists():
+        if self.config.snapshot.debug_trigger:
+            if self._mock_channel is None:
+                self._mock_channel = MockChannelServer(self.project_root / "TEMP", on_update=self.wake)
+            version, m = self._mock_channel.latest()
+            if version:
                 try:
-                    with open(mock_path, "r", encoding="utf-8") as f:
-                        m = json.load(f)
-
-                    if m == self._last_mock_data:
+                    if version == self._last_mock_version:
                         logging.debug("[Behavior] Mock 数据无变化，跳过检查")
                         return
 
@@ -106,15 +259,8 @@ class BehaviorMonitor(QThread):
                         self.is_fullscreen = is_fs
                         self.fullscreen_status_changed.emit(is_fs)
 
-                    current_pids = {}
-                    for p in psutil.process_iter(['name', 'pid', 'create_time']):
-                        try:
-                            pid = p.info['pid']; pn = p.info['name'].lower()
-                            current_pids[pid] = pn
-                            if pid not in self.pid_history:
-                                self.pid_history[pid] = {"name": pn, "start_time": p.info['create_time']}
-                        except: continue
-                    self.active_processes = set(current_pids.values())
+                    self._merge_processes(self._scan_processes())
+                    self._update_eco_mode(is_fs, bool(m.get("on_battery", False)), m.get("cpu_usage"))
 
                     clip_text = m.get("clip_text", "")
                     clip_changed_text = clip_text if clip_text != self._last_mock_data.get("clip_text") else ""
@@ -123,8 +269,10 @@ class BehaviorMonitor(QThread):
                     music_changed_text = curr_music if curr_music != self._last_mock_data.get("music_title") else ""
 
                     self._last_mock_data = m.copy()
+                    self._last_mock_version = version
 
                     hw_stats = {"cpu_temp": m.get("cpu_temp"), "gpu_temp": m.get("gpu_temp"), "cpu_usage": m.get("cpu_usage"), "gpu_usage": m.get("gpu_usage")}
+                    self.sensor_aggregates.push(now, hw_stats)
                     win_info = WindowInfo(0, 0, m.get("win_title"), m.get("win_pname"), (0,0,0,0), m.get("win_url"))
 
                     logging.debug(f"[Behavior] 使用 mock 数据检查: plugins={m.get('plugins', {})}")
@@ -141,22 +289,33 @@ class BehaviorMonitor(QThread):
                     logging.error(f"[Behavior] Mock 数据读取失败: {e}")
 
         try:
-            current_pids = {}
-            for p in psutil.process_iter(['name', 'pid', 'create_time']):
-                try:
-                    pid = p.info['pid']; pn = p.info['name'].lower()
-                    current_pids[pid] = pn
-                    if pid not in self.pid_history:
-                        self.pid_history[pid] = {"name": pn, "start_time": p.info['create_time']}
-                except: continue
-            self.active_processes = set(current_pids.values())
-            hwnd = ctypes.windll.user32.GetForegroundWindow()
-            win_info = self._get_window_info(hwnd)
-            idle_time = self._get_idle_time()
-            hw_stats = self._get_hardware_stats()
-            curr_clip = self._get_clipboard()
-            clip_changed_text = curr_clip if curr_clip != self.last_clip_text else ""
-            curr_music = self._get_cloudmusic_title()
+            # 各传感器互相独立，并发采集；超过截止时间的沿用上一次结果
+            # 节能模式下只采集进程/窗口/闲置，硬件与音乐沿用上次的值；剪贴板由 GUI 线程事件驱动，不占采集开销
+            eco = self.eco_mode.active
+            probes = {
+                "processes": self._scan_processes,
+                "window": lambda: self._get_window_info(ctypes.windll.user32.GetForegroundWindow()),
+                "idle": self._get_idle_time,
+            }
+            if not eco:
+                probes.update(hardware=self._get_hardware_stats, music=self._get_cloudmusic_title)
+            sensors = self.sensor_collector.collect(probes, self.config.snapshot.sensor_deadline, defaults={
+                "idle": 0.0,
+                "hardware": self._last_hw_stats,
+                "music": self.last_music_title,
+            })
+            if sensors["processes"] is not None: self._merge_processes(sensors["processes"])
+            win_info = sensors["window"]
+            idle_time = sensors["idle"]
+            # 节能模式下没有新读数，硬件条件一律不成立，避免旧值被当成实时数据反复触发
+            hw_stats = None if eco else sensors.get("hardware", self._last_hw_stats)
+            if not eco:
+                self._last_hw_stats = hw_stats
+                self.sensor_aggregates.push(now, hw_stats)
+            clip = self._clipboard_snapshot()
+            curr_clip = clip.text
+            clip_changed_text = curr_clip if clip.version != self._last_clip_version else ""
+            curr_music = sensors.get("music", self.last_music_title)
             music_changed_text = curr_music if curr_music != self.last_music_title else ""
             weather = getattr(self.controller, "current_weather", {})
             if win_info:
@@ -164,37 +323,72 @@ class BehaviorMonitor(QThread):
                 if fs != self.is_fullscreen:
                     self.is_fullscreen = fs
                     self.fullscreen_status_changed.emit(fs)
+            self._update_eco_mode(self.is_fullscreen, cpu_usage=None if eco else hw_stats.get("cpu_usage"))
             self._process_rule_matching(now, win_info, idle_time, hw_stats, curr_clip, weather, is_startup,
                                       clip_changed=clip_changed_text, music_title=curr_music, music_changed=music_changed_text)
             self.last_cycle_idle = idle_time
             self.last_clip_text = curr_clip
+            self._last_clip_version = clip.version
             self.last_music_title = curr_music
         except Exception as e:
             logging.error(f"[Behavior] Check failed: {e}")
+    def _scan_processes(self) -> Dict[int, tuple]:
+        current = {}
+        for p in psutil.process_iter(['name', 'pid', 'create_time']):
+            try: current[p.info['pid']] = (p.info['name'].lower(), p.info['create_time'])
+            except: continue
+        return current
+    def _merge_processes(self, current: Dict[int, tuple]):
+        # 在监听线程上合并，采集线程只返回快照，不直接改 pid_history
+        for pid, (pn, start_time) in current.items():
+            info = self.pid_history.get(pid)
+            if info is None or info["start_time"] != start_time:
+                self.pid_history[pid] = {"name": pn, "start_time": start_time}
+        for pid in [p for p in self.pid_history if p not in current]: del self.pid_history[pid]
+        self.active_processes = {pn for pn, _ in current.values()}
+        if len(self.pid_ledger):
+            self.pid_ledger.prune({pid: info["start_time"] for pid, info in self.pid_history.items()})
     def _process_rule_matching(self, now, win, idle, hw, clip, weather, is_startup, m_date=None, m_time=None, clip_changed="", music_title="", music_changed=""):
-        is_debug = self.config.debug_trigger
+        is_debug = self.config.snapshot.debug_trigger
         is_recovering = (idle < 1.0 and self.last_cycle_idle > 1.0)
         recovery_duration = self.last_cycle_idle if is_recovering else 0.0
-        for rule in self.triggers:
+        self._retry_pending = False
+        self._commit_dispatched()
+        in_global_cooldown = now - getattr(self, "_last_any_trigger_time", 0) < self.config.snapshot.trigger_cooldown
+        max_matches = self.config.snapshot.pending_queue_size
+        matches = 0
+        stats = getattr(getattr(self.controller, "main_window", None), "stats", None)
+        ui = stats.snapshot if stats else InteractionSnapshot()
+        for rule in self._rule_order:
             if not rule.get("enabled", True): continue
             if rule.get("startup_only") and not is_startup: continue
             rule_id = str(rule.get("id", "default"))
             gid = rule.get("trigger_group_id", rule_id)
-            if not is_debug:
-                if now - self.global_history.get(gid, 0) < rule.get("cooldown", 5): continue
-                if self.trigger_counts.get(gid, 0) >= rule.get("max_triggers", 9999): continue
-                if now - getattr(self, "_last_any_trigger_time", 0) < self.config.trigger_cooldown: continue
-            ui = getattr(self.controller.main_window, "stats", {})
-            matched = self._check_recursive_logic(rule, win, idle, recovery_duration, hw, ui, clip, weather, rule_id, m_date, m_time, clip_changed, music_title, music_changed)
+            blocked = not is_debug and (now - self.global_history.get(gid, 0) < rule.get("cooldown", 5)
+                                        or self.trigger_counts.get(gid, 0) >= rule.get("max_triggers", 9999)
+                                        or in_global_cooldown)
+            # SEQUENCE / CUMULATIVE 需要持续记录事件，冷却期间也判定，只是不触发
+            if blocked and rule_id not in self._sequences and rule_id not in self._cumulative: continue
+            hit_pids = []
+            matched = self._check_recursive_logic(rule, now, win, idle, recovery_duration, hw, ui, clip, weather, rule_id, m_date, m_time, clip_changed, music_title, music_changed, pids=hit_pids)
+            if blocked: continue
+            one_shot = bool(matched and hit_pids and rule.get("one_shot_per_pid") and not is_debug)
+            start_times = {}
+            if one_shot:
+                start_times = {p: self.pid_history.get(p, {}).get("start_time", 0.0) for p in hit_pids}
+                hit_pids = self.pid_ledger.fresh(rule_id, hit_pids, start_times)
+                if not hit_pids: continue
             if matched:
-                if not is_debug and random.random() > rule.get("probability", 1.0): continue
+                if not is_debug and random.random() > rule.get("probability", 1.0):
+                    self._retry_pending = True
+                    continue
                 logging.info(f"[Behavior] Trigger Matched: {rule_id}")
-                self.global_history[gid] = now
-                self._last_any_trigger_time = now
-                self.trigger_counts[gid] = self.trigger_counts.get(gid, 0) + 1
-                self.trigger_matched.emit(rule.get("actions", []))
-                break
-    def _check_recursive_logic(self, node, win, idle, recovery, hw, ui, clip, weather, rid, m_date, m_time, clip_changed, music_title, music_changed, path="root") -> bool:
+                # 命中时只做 fresh() 过滤；PID 标记与自动机清零随 TriggerFire 延迟到真正执行时
+                self.trigger_matched.emit(TriggerFire(rule_id, gid, _rule_priority(rule), rule.get("actions", []), now,
+                                                      tuple(hit_pids) if one_shot else (), start_times))
+                matches += 1
+                if is_debug or matches >= max_matches: break
+    def _check_recursive_logic(self, node, now, win, idle, recovery, hw, ui, clip, weather, rid, m_date, m_time, clip_changed, music_title, music_changed, path="root", pids=None) -> bool:
         logic = node.get("logic", "AND").upper()
         conds = node.get("conditions", [])
         if not conds: return False
@@ -202,25 +396,25 @@ class BehaviorMonitor(QThread):
         for i, c in enumerate(conds):
             c_path = f"{path}_{i}"
             if "logic" in c:
-                res = self._check_recursive_logic(c, win, idle, recovery, hw, ui, clip, weather, rid, m_date, m_time, clip_changed, music_title, music_changed, c_path)
+                res = self._check_recursive_logic(c, now, win, idle, recovery, hw, ui, clip, weather, rid, m_date, m_time, clip_changed, music_title, music_changed, c_path, pids)
             else:
-                res, _ = self._test_single_condition_v6(c, win, idle, recovery, hw, ui, clip, weather, m_date, m_time, clip_changed, music_title, music_changed)
-            if logic == "CUMULATIVE":
-                if res: self.rule_hit_states.setdefault(rid, {})[c_path] = True
-                results.append(self.rule_hit_states.get(rid, {}).get(c_path, False))
-            else:
-                results.append(res)
+                res, c_pids = self._test_single_condition_v6(c, now, win, idle, recovery, hw, ui, clip, weather, m_date, m_time, clip_changed, music_title, music_changed)
+                if res and pids is not None: pids.extend(p for p in c_pids if p not in pids)
+            results.append(res)
         if logic == "AND": return all(results)
         if logic == "OR": return any(results)
-        if logic == "CUMULATIVE": return all(results)
+        if logic == "CUMULATIVE":
+            window = self._cumulative.get(rid, {}).get(path)
+            return window.update(results, now) if window else False
+        if logic == "SEQUENCE":
+            automaton = self._sequences.get(rid, {}).get(path)
+            return automaton.advance(results, now) if automaton else False
         return False
-    def _test_single_condition_v6(self, c, win, idle, recovery, hw, ui, clip, weather, m_date, m_time, clip_changed, music_title, music_changed):
+    def _test_single_condition_v6(self, c, now, win, idle, recovery, hw, ui, clip, weather, m_date, m_time, clip_changed, music_title, music_changed):
         t = c.get("type")
         res, pids = False, []
-        if t == "cpu_temp": res = hw["cpu_temp"] > c.get("gt", 0)
-        elif t == "gpu_temp": res = hw["gpu_temp"] > c.get("gt", 0)
-        elif t == "cpu_usage": res = hw["cpu_usage"] > c.get("gt", 0)
-        elif t == "gpu_usage": res = hw["gpu_usage"] > c.get("gt", 0)
+        if t in HARDWARE_TYPES: res = hw is not None and hw[t] > c.get("gt", 0)
+        elif t in AGGREGATE_TYPES: res = hw is not None and self.sensor_aggregates.test(c, now)
         elif t in ["process_active", "process_background"]:
             wl = [p.lower() for p in c.get("pnames", [c.get("pname", "")]) if p]
             in_mock = m_date is not None
@@ -232,7 +426,7 @@ class BehaviorMonitor(QThread):
                     if win.pid not in targets:
                         targets.append(win.pid)
             if c.get("only_new") and not in_mock:
-                targets = [p for p in targets if self.pid_history[p]["start_time"] > self.app_start_time]
+                targets = [p for p in targets if self.pid_history.get(p, {}).get("start_time", 0) > self.app_start_time]
             if targets: res, pids = True, targets
         elif t == "clip_match":
             in_mock = m_date is not None
@@ -245,12 +439,10 @@ class BehaviorMonitor(QThread):
         elif t == "url_match": res = any(kw.lower() in (win.url or "").lower() for kw in c.get("keywords", [])) if win else False
         elif t == "title_match": res = any(kw.lower() in win.title.lower() for kw in c.get("keywords", [])) if win else False
         elif t == "weather_match": res = any(kw in (weather.get("condition", "") if weather else "") for kw in c.get("keywords", []))
-        elif t == "hover_duration": res = ui.get("is_hovering") and (time.time() - ui.get("hover_start_time", 0)) > c.get("sec", 0)
-        elif t == "leave_duration": res = not ui.get("is_hovering") and (time.time() - ui.get("hover_leave_time", 0)) > c.get("sec", 0)
-        elif t == "long_press": res = ui.get("is_pressing") and (time.time() - ui.get("press_start_time", 0)) > c.get("sec", 0)
-        elif t == "click_count":
-            recent = [x for x in ui.get("last_click_times", []) if (time.time() - x) < c.get("duration", 5)]
-            res = len(recent) >= c.get("count", 1)
+        elif t == "hover_duration": res = ui.is_hovering and (now - ui.hover_start_time) > c.get("sec", 0)
+        elif t == "leave_duration": res = not ui.is_hovering and (now - ui.hover_leave_time) > c.get("sec", 0)
+        elif t == "long_press": res = ui.is_pressing and (now - ui.press_start_time) > c.get("sec", 0)
+        elif t == "click_count": res = ui.clicks_within(c.get("count", 1), c.get("duration", 5), now)
         elif t == "idle_recovery": res = recovery > c.get("sec", 0)
         elif t == "idle_duration": res = idle > c.get("sec", 0)
         elif t == "fullscreen": res = self.is_fullscreen
@@ -288,25 +480,10 @@ class BehaviorMonitor(QThread):
                     logging.info(f"[Behavior] 检测到机器爆炸: {status}")
             else:
                 res = False
-        elif t == "date_match":
-            d = m_date if m_date else datetime.now().strftime("%m-%d")
-            res = d == c.get("date", "")
-        # === 新增：检测特定分钟数 (比如整点或半点) ===
-        elif t == "time_cron":
-            try:
-                curr_t = m_time if m_time else datetime.now().strftime("%H:%M")
-                current_minute = int(curr_t.split(":")[1])
-                res = current_minute in c.get("minutes", [])
-            except:
-                res = False
-        # ===============================================
-        elif t == "time_range":
-            try:
-                curr_t = m_time if m_time else datetime.now().strftime("%H:%M")
-                now_t = datetime.strptime(curr_t, "%H:%M").time()
-                s, e = c.get("range", "").split("-")
-                res = datetime.strptime(s, "%H:%M").time() <= now_t <= datetime.strptime(e, "%H:%M").time()
-            except: res = False
+        elif t in CALENDAR_TYPES:
+            # date_match / time_cron (整点半点) / time_range，在 load_triggers 时预编译
+            spec = self._calendar_specs.get(id(c)) or CalendarCondition(c)
+            res = spec.matches(datetime.fromtimestamp(now), m_date, m_time)
         return res, pids
     def _get_idle_time(self):
         class LASTINPUTINFO(ctypes.Structure):
@@ -333,25 +510,27 @@ class BehaviorMonitor(QThread):
             ctypes.windll.user32.GetWindowTextW(hwnd, buff, length + 1)
             rect = ctypes.wintypes.RECT(); ctypes.windll.user32.GetWindowRect(hwnd, ctypes.byref(rect))
             url = None
-            if self.config.use_ui_automation and pname in ["chrome.exe", "msedge.exe"]:
+            if self.config.snapshot.use_ui_automation and not self.eco_mode.active and pname in ["chrome.exe", "msedge.exe"]:
                 try:
                     import uiautomation as auto
-                    ctrl = auto.ControlFromHandle(hwnd)
-                    edit = ctrl.EditControl(Name="地址和搜索栏") or ctrl.EditControl(Name="Address and search bar")
-                    if edit: url = edit.GetValuePattern().Value
+                    with auto.UIAutomationInitializerInThread():
+                        ctrl = auto.ControlFromHandle(hwnd)
+                        edit = ctrl.EditControl(Name="地址和搜索栏") or ctrl.EditControl(Name="Address and search bar")
+                        if edit: url = edit.GetValuePattern().Value
                 except: pass
             return WindowInfo(hwnd, pid.value, buff.value, pname, (rect.left, rect.top, rect.right, rect.bottom), url)
         except: return None
     def _get_hardware_stats(self):
         stats = {"cpu_temp": 0.0, "gpu_temp": 0.0, "cpu_usage": 0.0, "gpu_usage": 0.0}
+        hw = getattr(self.controller, "hardware", None)
         try:
             stats["cpu_usage"] = psutil.cpu_percent()
-            if hasattr(psutil, "sensors_temperatures"):
+            if (hw is None or hw.has_cpu_temp) and hasattr(psutil, "sensors_temperatures"):
                 t = psutil.sensors_temperatures()
                 if 'coretemp' in t: stats["cpu_temp"] = t['coretemp'][0].current
         except: pass
 
-        if not getattr(self.controller, "can_monitor_gpu", True):
+        if hw is None or not (hw.can_monitor_gpu and hw.has_gpu_sensor):
             return stats
 
         try:
@@ -370,12 +549,9 @@ class BehaviorMonitor(QThread):
                     stats["gpu_usage"] = gpus[0].load * 100
             except: pass
         return stats
-    def _get_clipboard(self):
-        if not self.config.monitor_clipboard: return ""
-        try:
-            import pyperclip
-            return pyperclip.paste() or ""
-        except: return ""
+    def _clipboard_snapshot(self) -> ClipboardSnapshot:
+        watcher = getattr(self.controller, "clipboard_watcher", None)
+        return watcher.snapshot if watcher and self.config.snapshot.monitor_clipboard else ClipboardSnapshot()
     def _is_fullscreen(self, info: WindowInfo) -> bool:
         try:
             sw = ctypes.windll.user32.GetSystemMetrics(0); sh = ctypes.windll.user32.GetSystemMetrics(1)
@@ -384,7 +560,7 @@ class BehaviorMonitor(QThread):
         except (OverflowError, ValueError):
             return False
     def _get_cloudmusic_title(self) -> str:
-        if not self.config.monitor_music: return ""
+        if not self.config.snapshot.monitor_music: return ""
         title = ""
         def callback(hwnd, _):
             nonlocal title
@@ -1,3 +1,5 @@
 from .config_manager import ConfigManager
+from .snapshot import ConfigSnapshot
+from .pack_index import PackIndex, PackEntry
 
-__all__ = ["ConfigManager"]
+__all__ = ["ConfigManager", "ConfigSnapshot", "PackIndex", "PackEntry"]
@@ -1,15 +1,24 @@
 import configparser
+import io
 import os
+import re
+import tempfile
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, FrozenSet
 
 
 from .pack_manager import PackManager
+from .snapshot import ConfigSnapshot
 
 class ConfigManager:
     def __init__(self, config_path: str = "config.cfg"):
         self.config_path = Path(config_path).absolute()
         self.config = configparser.ConfigParser(interpolation=None)
+        self.snapshot = ConfigSnapshot()
+        self._listeners: List[Tuple[Callable[[ConfigSnapshot, FrozenSet[str]], None], Optional[FrozenSet[str]]]] = []
+        self._dirty: Set[Tuple[str, str]] = set()
+        self._disk_stamp: Optional[Tuple[int, int]] = None
+        self._index_lines([])
         self.load()
 
 
@@ -18,49 +27,120 @@ class ConfigManager:
 
     def load(self):
         if self.config_path.exists():
-            self.config.read(self.config_path, encoding="utf-8")
+            text = self.config_path.read_text(encoding="utf-8")
+            self.config.read_string(text, source=str(self.config_path))
+            self._index_lines(text.splitlines(keepends=True))
+            self._disk_stamp = self._file_stamp()
+        self.publish()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.config_path.stat()
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _reload_if_changed(self):
+        """文件在 load() 之后被外部修改时重新读取并建索引，set() 过的值覆盖在外部修改之上。"""
+        if self._file_stamp() == self._disk_stamp: return
+        text = self.config_path.read_text(encoding="utf-8")
+        pending = {(section, key): self.config.get(section, key) for section, key in self._dirty}
+        self.config.read_string(text, source=str(self.config_path))
+        for (section, key), val in pending.items(): self.config.set(section, key, val)
+        self._index_lines(text.splitlines(keepends=True))
+        self._disk_stamp = self._file_stamp()
+        print("[Config] config.cfg 已在外部修改，保存前已重新读取")
+
+    def subscribe(self, callback: Callable[[ConfigSnapshot, FrozenSet[str]], None], keys: Optional[Iterable[str]] = None):
+        """快照字段变化时回调 callback(snapshot, changed)；keys 为关心的字段名，None 表示全部。"""
+        self._listeners.append((callback, frozenset(keys) if keys is not None else None))
+
+    def publish(self) -> FrozenSet[str]:
+        """重新解析并整体替换快照，只通知关心已变化字段的订阅者。set() 的修改在 save() 或 publish() 后生效。"""
+        old, new = self.snapshot, ConfigSnapshot.from_config(self)
+        self.snapshot = new
+        changed = new.diff(old)
+        if changed:
+            for callback, keys in list(self._listeners):
+                if keys is None or keys & changed:
+                    try: callback(new, changed)
+                    except Exception as e: print(f"[Config] 配置变更回调出错: {e}")
+        return changed
 
     def save(self) -> None:
+        """只改写 set() 真正修改过的行，保留注释和文件中原有的键名写法；文件中没有的键追加到所在段末尾。
 
+        没有修改时不写盘。先写同目录临时文件再 os.replace，写到一半崩溃也不会损坏 config.cfg。
+        文件在 load() 之后被外部修改过（mtime/大小变化）时先重新读取，外部改动不会被覆盖。
+        """
         if not self.config_path.exists():
-            with open(self.config_path, "w", encoding="utf-8") as f:
-                self.config.write(f)
+            buf = io.StringIO()
+            self.config.write(buf)
+            self._write_atomic(buf.getvalue())
+            self.load()
+            self._dirty.clear()
             return
+        if not self._dirty: return
 
-        with open(self.config_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        new_lines = []
-        current_section = None
-        processed_items = set() 
-
-        for line in lines:
+        self._reload_if_changed()
+        lines = list(self._lines)
+        inserts = {}
+        for section, key in sorted(self._dirty):
+            val = self.config.get(section, key)
+            i = self._key_index.get((section, key))
+            if i is not None:
+                lines[i] = self._format_line(lines[i], val)
+            else:
+                inserts.setdefault(section, []).append(f"{key} = {val}\n")
+        if lines and not lines[-1].endswith("\n"): lines[-1] += "\n"
+        # 从后往前插入，前面记录的行号不受影响
+        for section, new in sorted(inserts.items(), key=lambda kv: -self._section_end.get(kv[0], len(lines))):
+            pos = self._section_end.get(section)
+            if pos is None: lines += [f"\n[{section}]\n"] + new
+            else: lines[pos + 1:pos + 1] = new
+
+        self._write_atomic("".join(lines))
+        self._index_lines(lines)
+        self._disk_stamp = self._file_stamp()
+        self._dirty.clear()
+        self.publish()
+
+    def _index_lines(self, lines: List[str]):
+        """记录每个键所在行号与每段最后一个非空行的行号，save() 据此直接定位。"""
+        self._lines = list(lines)
+        self._key_index: Dict[Tuple[str, str], int] = {}
+        self._section_end: Dict[str, int] = {}
+        section = None
+        for i, line in enumerate(self._lines):
             stripped = line.strip()
             if stripped.startswith("[") and stripped.endswith("]"):
-                current_section = stripped[1:-1]
-                new_lines.append(line)
-                continue
-            
-            if current_section and "=" in line and not stripped.startswith(("#", ";")):
-                key = line.split("=", 1)[0].strip()
-                found = False
-                for mem_key in self.config.options(current_section):
-                    if mem_key.lower() == key.lower():
-                        val = self.config.get(current_section, mem_key)
-                        comment = ""
-                        if "#" in line: comment = " #" + line.split("#", 1)[1].strip()
-                        elif ";" in line: comment = " ;" + line.split(";", 1)[1].strip()
-                        new_lines.append(f"{key} = {val}{comment}\n")
-                        processed_items.add((current_section.lower(), key.lower()))
-                        found = True
-                        break
-                if not found:
-                    new_lines.append(line)
-            else:
-                new_lines.append(line)
-
-        with open(self.config_path, "w", encoding="utf-8") as f:
-            f.writelines(new_lines)
+                section = stripped[1:-1]
+                self._section_end[section] = i
+            elif section and stripped:
+                # 本仓库的注释写在键的下一行，新键要追加在注释之后
+                self._section_end[section] = i
+                if "=" in line and not stripped.startswith(("#", ";")):
+                    self._key_index[(section, line.split("=", 1)[0].strip().lower())] = i
+
+    @staticmethod
+    def _format_line(line: str, value: str) -> str:
+        key, rest = line.split("=", 1)
+        # 行内注释需以空白开头，避免把值里的 # 当成注释
+        m = re.search(r"\s[#;]", rest)
+        comment = " " + rest[m.start():].strip() if m else ""
+        return f"{key.strip()} = {value}{comment}\n"
+
+    def _write_atomic(self, payload: str):
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{self.config_path.name}.", suffix=".tmp", dir=str(self.config_path.parent))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, self.config_path)
+        except BaseException:
+            if os.path.exists(tmp_name): os.remove(tmp_name)
+            raise
 
     def get(self, section: str, key: str, fallback: Any = None) -> str:
         val = self.config.get(section, key, fallback=None)
@@ -96,9 +176,12 @@ class ConfigManager:
             return fallback
 
     def set(self, section: str, key: str, value: Any) -> None:
+        value = str(value)
         if not self.config.has_section(section):
             self.config.add_section(section)
-        self.config.set(section, key, str(value))
+        if self.config.get(section, key, fallback=None) == value: return
+        self.config.set(section, key, value)
+        self._dirty.add((section, self.config.optionxform(key)))
 
 
     @property
@@ -136,11 +219,11 @@ class ConfigManager:
 
     @property
     def use_pack_settings(self) -> bool:
-        return self.getboolean("General", "use_pack_settings", True)
+        return self.snapshot.use_pack_settings
 
     @property
     def plugins_enabled(self) -> bool:
-        return self.getboolean("General", "plugins_enabled", False)
+        return self.snapshot.plugins_enabled
 
     @property
     def tts_language(self) -> str:
@@ -158,47 +241,47 @@ class ConfigManager:
 
     @property
     def thinking_text_enabled(self) -> bool:
-        return self.getboolean("General", "ThinkingText", True)
+        return self.snapshot.thinking_text_enabled
 
     @property
     def thinking_text_switch(self) -> bool:
-        return self.getboolean("General", "ThinkingTextSwitch", True)
+        return self.snapshot.thinking_text_switch
 
     @property
     def thinking_text_time(self) -> float:
-        return self.getfloat("General", "ThinkingTextTime", 1.0)
+        return self.snapshot.thinking_text_time
 
     @property
     def thinking_text_switch_time(self) -> float:
-        return self.getfloat("General", "ThinkingTextSwitchTime", 5.0)
+        return self.snapshot.thinking_text_switch_time
 
     @property
     def listening_text_enabled(self) -> bool:
-        return self.getboolean("General", "ListeningText", True)
+        return self.snapshot.listening_text_enabled
 
     @property
     def debug_panel(self) -> bool:
-        return self.getboolean("General", "debug_panel", False)
+        return self.snapshot.debug_panel
 
     @property
     def debug_trigger(self) -> bool:
-        return self.getboolean("General", "debugtrigger", False)
+        return self.snapshot.debug_trigger
 
     @property
     def always_show_ui(self) -> bool:
-        return self.getboolean("General", "always_show_ui", False)
+        return self.snapshot.always_show_ui
 
     @property
     def idle_fade_delay(self) -> float:
-        return self.getfloat("General", "idle_fade_delay", 3.0)
+        return self.snapshot.idle_fade_delay
 
     @property
     def text_read_speed(self) -> float:
-        return self.getfloat("General", "text_read_speed", 0.2)
+        return self.snapshot.text_read_speed
 
     @property
     def base_display_time(self) -> float:
-        return self.getfloat("General", "base_display_time", 2.0)
+        return self.snapshot.base_display_time
 
     @property
     def sprite_width(self) -> int:
@@ -226,51 +309,87 @@ class ConfigManager:
 
     @property
     def monitor_clipboard(self) -> bool:
-        return self.get_bool("Advanced", "monitor_clipboard", True)
+        return self.snapshot.monitor_clipboard
+
+    @property
+    def clipboard_max_chars(self) -> int:
+        return self.snapshot.clipboard_max_chars
 
     @property
     def monitor_music(self) -> bool:
-        return self.get_bool("General", "monitor_music", True)
+        return self.snapshot.monitor_music
 
     @property
     def use_ui_automation(self) -> bool:
-        return self.get_bool("Advanced", "use_ui_automation", True)
+        return self.snapshot.use_ui_automation
 
     @property
     def check_last_input(self) -> bool:
-        return self.get_bool("Advanced", "check_last_input", True)
+        return self.snapshot.check_last_input
 
     @property
     def behavior_enabled(self) -> bool:
-        return self.getboolean("Behavior", "enabled", True)
+        return self.snapshot.behavior_enabled
 
     @property
     def behavior_interval(self) -> float:
-        return self.getfloat("Behavior", "interval", 1.0)
+        return self.snapshot.behavior_interval
 
     @property
     def always_on_top(self) -> bool:
-        return self.getboolean("General", "always_on_top", False)
+        return self.snapshot.always_on_top
 
     @property
     def behavior_text_read_multiplier(self) -> float:
-        return self.getfloat("Behavior", "behavior_text_read_multiplier", 1.5)
+        return self.snapshot.behavior_text_read_multiplier
 
     @property
     def trigger_cooldown(self) -> float:
-        return self.getfloat("Behavior", "trigger_cooldown", 30.0)
+        return self.snapshot.trigger_cooldown
 
     @property
     def post_busy_delay(self) -> float:
-        return self.getfloat("Behavior", "post_busy_delay", 5.0)
+        return self.snapshot.post_busy_delay
+
+    @property
+    def sensor_deadline(self) -> float:
+        return self.snapshot.sensor_deadline
+
+    @property
+    def pending_queue_size(self) -> int:
+        return self.snapshot.pending_queue_size
+
+    @property
+    def pending_trigger_ttl(self) -> float:
+        return self.snapshot.pending_trigger_ttl
+
+    @property
+    def eco_mode_enabled(self) -> bool:
+        return self.snapshot.eco_mode_enabled
+
+    @property
+    def eco_on_battery(self) -> bool:
+        return self.snapshot.eco_on_battery
+
+    @property
+    def eco_cpu_threshold(self) -> float:
+        return self.snapshot.eco_cpu_threshold
+
+    @property
+    def eco_interval_factor(self) -> float:
+        return self.snapshot.eco_interval_factor
+
+    @property
+    def eco_unload_stt(self) -> bool:
+        return self.snapshot.eco_unload_stt
 
     @property
     def idle_opacity(self) -> float:
-        return self.getfloat("General", "idle_opacity", 0.8)
+        return self.snapshot.idle_opacity
 
     @property
     def show_in_taskbar(self) -> bool:
-        return self.getboolean("General", "show_in_taskbar", True)
+        return self.snapshot.show_in_taskbar
 
     @property
     def global_show_hotkey(self) -> str:
@@ -282,14 +401,14 @@ class ConfigManager:
         filename = self.get("General", "tray_icon_path", "icon.ico")
         
 
-        pack_path = self.pack_manager.packs_dir / self.pack_manager.active_pack_id
-        if pack_path.exists():
+        pack_path = self.pack_manager.pack_root
+        if self.pack_manager.exists(pack_path):
 
             path = pack_path / filename
-            if path.exists(): return str(path.absolute())
+            if self.pack_manager.exists(path): return str(self.pack_manager.materialize(path).absolute())
 
             path = pack_path / "assets" / filename
-            if path.exists(): return str(path.absolute())
+            if self.pack_manager.exists(path): return str(self.pack_manager.materialize(path).absolute())
             
 
         default_path = Path(self.config_path.parent) / "icon.ico"
@@ -309,7 +428,7 @@ class ConfigManager:
 
     @property
     def stt_enabled(self) -> bool:
-        return self.getboolean("STT", "enabled", True)
+        return self.snapshot.stt_enabled
 
     @property
     def stt_hotkey(self) -> str:
@@ -338,7 +457,7 @@ class ConfigManager:
 
     @property
     def sovits_enabled(self) -> bool:
-        return self.getboolean("SoVITS", "enabled", True)
+        return self.snapshot.sovits_enabled
 
     @property
     def sovits_device(self) -> str:
@@ -378,28 +497,16 @@ class ConfigManager:
 
     @property
     def sovits_timeout(self) -> int:
-        return self.getint("SoVITS", "api_timeout", 120)
+        return self.snapshot.sovits_timeout
 
     @property
     def sovits_kill_existing(self) -> bool:
         return self.getboolean("SoVITS", "kill_existing", True)
 
 
-    @property
-    def monitor_clipboard(self) -> bool:
-        return self.get_bool("General", "monitor_clipboard", True)
-
-    @property
-    def monitor_music(self) -> bool:
-        return self.get_bool("General", "monitor_music", True)
-
-    @property
-    def use_ui_automation(self) -> bool:
-        return self.get_bool("Advanced", "use_ui_automation", True)
-
     @property
     def special_dates_mode(self) -> str:
-        return self.get("Advanced", "special_dates_mode", "once")
+        return self.snapshot.special_dates_mode
 
 
     @property
@@ -443,18 +550,18 @@ class ConfigManager:
                 target_prompt = prompts[0]
             
             rel_path = target_prompt.get("path")
-            pack_root = self.pack_manager.packs_dir / self.pack_manager.active_pack_id
+            pack_root = self.pack_manager.pack_root
             full_path = pack_root / rel_path
             
-            if full_path.exists():
-                return full_path.read_text(encoding="utf-8")
+            text = self._read_prompt(full_path)
+            if text is not None: return text
             
             default_prompt_path = self.pack_manager.get_path("logic", "prompts")
             if default_prompt_path:
                 prompt_dir = default_prompt_path.parent
                 legacy_path = prompt_dir / target_val
-                if legacy_path.exists():
-                     return legacy_path.read_text(encoding="utf-8")
+                text = self._read_prompt(legacy_path)
+                if text is not None: return text
 
             raise RuntimeError(f"CRITICAL: Prompt file for ID '{target_val}' or path '{rel_path}' not found.")
 
@@ -468,17 +575,24 @@ class ConfigManager:
             prompt_dir = default_prompt_path.parent
             target_path = prompt_dir / filename
             
-            if target_path.exists() and target_path.is_file():
-                try:
-                    return target_path.read_text(encoding="utf-8")
-                except Exception as e:
-                    print(f"[Config] Error reading prompt file: {e}")
+            try:
+                text = self._read_prompt(target_path)
+                if text is not None: return text
+            except Exception as e:
+                print(f"[Config] Error reading prompt file: {e}")
             
-            if default_prompt_path.exists():
-                return default_prompt_path.read_text(encoding="utf-8")
+            text = self._read_prompt(default_prompt_path)
+            if text is not None: return text
         
         raise RuntimeError(f"CRITICAL: Required prompt file '{filename}' not found in active pack and no default available.")
 
+    def _read_prompt(self, path: Path) -> Optional[str]:
+        # 每次查询都会调用：不先 exists/is_file 探测，直接走资源缓存，不存在的结果也会被缓存
+        try:
+            return self.pack_manager.read_text(path)
+        except (FileNotFoundError, IsADirectoryError, PermissionError):
+            return None
+
     def get_llm_config(self) -> dict:
         mode = self.get("General", "llm_mode", "cloud").lower()
         
@@ -0,0 +1,156 @@
+import os
+import json
+import mmap
+import struct
+import zipfile
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+BUNDLE_SUFFIX = ".resonapack"
+MANIFEST_NAME = "pack.json"
+# 打包时跳过的目录与文件（运行期数据、缓存）
+DEFAULT_EXCLUDE = ("__pycache__", ".git", "state.json")
+
+# zip 本地文件头：签名, 版本, 标志, 压缩方式, 时间, 日期, CRC, 压缩大小, 原始大小, 文件名长度, 扩展字段长度
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+
+
+class PackBundle:
+    """.resonapack 单文件资源包：不压缩 (ZIP_STORED) 的 zip，中央目录即成员索引。
+
+    打开时只解析一次中央目录并换算出每个成员数据在文件中的偏移，之后的读取都是对 mmap 的切片，
+    不解压、不再逐个打开小文件。以压缩方式写入的成员仍可读取，只是退回 zipfile 解压。
+    成员名统一使用 "/" 分隔的相对路径。
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        st = self.path.stat()
+        self.stamp: Tuple[int, int] = (st.st_mtime_ns, st.st_size)
+        self._file = open(self.path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            with zipfile.ZipFile(self._file) as zf: infos = zf.infolist()
+        except Exception:
+            self._file.close()
+            raise
+        # name -> (数据偏移, 大小)；偏移为 None 表示压缩成员
+        self._members: Dict[str, Tuple[Optional[int], int]] = {}
+        self._dirs = {""}
+        for info in infos:
+            name = info.filename.rstrip("/")
+            parts = name.split("/")
+            self._dirs.update("/".join(parts[:i]) for i in range(1, len(parts)))
+            if info.is_dir():
+                self._dirs.add(name)
+                continue
+            offset = None
+            if info.compress_type == zipfile.ZIP_STORED:
+                sig, *_, name_len, extra_len = _LOCAL_HEADER.unpack_from(self._mmap, info.header_offset)
+                if sig != _LOCAL_SIGNATURE: raise zipfile.BadZipFile(f"{self.path}: 成员 {name} 的本地文件头损坏")
+                offset = info.header_offset + _LOCAL_HEADER.size + name_len + extra_len
+            self._members[name] = (offset, info.file_size)
+        self._extracted: Dict[str, Path] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self): return self
+
+    def __exit__(self, *exc): self.close()
+
+    def close(self):
+        try: self._mmap.close()
+        except (BufferError, ValueError): pass
+        self._file.close()
+
+    def names(self) -> List[str]:
+        return sorted(self._members)
+
+    def has(self, name: str) -> bool:
+        return name in self._members
+
+    def is_dir(self, name: str) -> bool:
+        return name.strip("/") in self._dirs
+
+    def listdir(self, name: str = "") -> List[str]:
+        """直接子项的名称（文件与目录）。"""
+        prefix = name.strip("/") + "/" if name.strip("/") else ""
+        children = {n[len(prefix):].split("/", 1)[0] for n in list(self._members) + list(self._dirs)
+                    if n.startswith(prefix) and n != prefix.rstrip("/")}
+        children.discard("")
+        return sorted(children)
+
+    def size(self, name: str) -> int:
+        return self._members[name][1]
+
+    def read(self, name: str) -> bytes:
+        offset, size = self._members[name]
+        if offset is None:
+            with zipfile.ZipFile(self.path) as zf: return zf.read(name)
+        return self._mmap[offset:offset + size]
+
+    def read_json(self, name: str):
+        return json.loads(self.read(name).decode("utf-8-sig"))
+
+    def extract(self, name: str, dest_root: Path) -> Path:
+        """把成员（或目录下的全部成员）写到 dest_root 下，返回对应的真实路径。
+
+        供需要真实文件路径的场合使用（音频播放、SoVITS 参考音频、插件导入）。已写出且大小一致的文件跳过。
+        """
+        name = name.strip("/")
+        cached = self._extracted.get(name)
+        if cached is not None: return cached
+        dest = Path(dest_root).joinpath(*name.split("/")) if name else Path(dest_root)
+        if name in self._members: targets = [name]
+        else: targets = [n for n in self._members if n.startswith(name + "/")] if name else list(self._members)
+        with self._lock:
+            for member in targets:
+                out = Path(dest_root).joinpath(*member.split("/"))
+                try:
+                    if out.stat().st_size == self._members[member][1]: continue
+                except OSError: pass
+                out.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_name = tempfile.mkstemp(prefix=f".{out.name}.", suffix=".tmp", dir=str(out.parent))
+                try:
+                    with os.fdopen(fd, "wb") as f: f.write(self.read(member))
+                    os.replace(tmp_name, out)
+                except BaseException:
+                    if os.path.exists(tmp_name): os.remove(tmp_name)
+                    raise
+            if targets: self._extracted[name] = dest
+        return dest
+
+
+def _iter_pack_files(pack_dir: Path, exclude: Iterable[str]) -> List[Tuple[Path, str]]:
+    skip = set(exclude)
+    files = []
+    for root, dirs, names in os.walk(pack_dir):
+        dirs[:] = sorted(d for d in dirs if d not in skip)
+        for n in sorted(names):
+            if n in skip or n.endswith(".pyc"): continue
+            full = Path(root) / n
+            files.append((full, full.relative_to(pack_dir).as_posix()))
+    return files
+
+
+def build_bundle(pack_dir: Path, out_path: Optional[Path] = None, exclude: Iterable[str] = DEFAULT_EXCLUDE) -> Path:
+    """把资源包目录打包为 .resonapack。pack.json 写在最前，其余成员按路径排序，输出先写临时文件再替换。"""
+    pack_dir = Path(pack_dir)
+    manifest = pack_dir / MANIFEST_NAME
+    with open(manifest, "r", encoding="utf-8") as f: json.load(f)  # 清单无法解析时直接失败
+    out_path = Path(out_path) if out_path else pack_dir.with_name(pack_dir.name + BUNDLE_SUFFIX)
+    files = _iter_pack_files(pack_dir, exclude)
+    files.sort(key=lambda item: (item[1] != MANIFEST_NAME, item[1]))
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{out_path.name}.", suffix=".tmp", dir=str(out_path.parent))
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(tmp_name, "w", compression=zipfile.ZIP_STORED) as zf:
+            for full, arcname in files: zf.write(full, arcname)
+        os.replace(tmp_name, out_path)
+    except BaseException:
+        if os.path.exists(tmp_name): os.remove(tmp_name)
+        raise
+    return out_path
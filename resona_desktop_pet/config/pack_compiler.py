@@ -0,0 +1,327 @@
+import os
+import ast
+import json
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .pack_index import stamp
+from ..triggers import AGGREGATE_TYPES, CALENDAR_TYPES, CalendarCondition
+
+COMPILED_VERSION = 1
+SPRITE_EXTS = (".png", ".jpg", ".webp")
+FALLBACK_EMOTION = "<E:smile>"
+LOGIC_TYPES = ("AND", "OR", "CUMULATIVE", "SEQUENCE")
+
+# 叶子条件类型 -> 必填字段（元组内任一即可）
+CONDITION_REQUIRED = {
+    "cpu_temp": (), "gpu_temp": (), "cpu_usage": (), "gpu_usage": (),
+    "process_active": ("pnames", "pname"), "process_background": ("pnames", "pname"),
+    "clip_match": ("keywords",), "music_match": ("keywords",), "url_match": ("keywords",),
+    "title_match": ("keywords",), "weather_match": ("keywords",),
+    "hover_duration": (), "leave_duration": (), "long_press": (), "click_count": (),
+    "idle_recovery": (), "idle_duration": (), "fullscreen": (), "plugin_check": (), "is_machine_explosion": (),
+    **{t: () for t in AGGREGATE_TYPES},
+}
+ACTION_TYPES = ("speak", "delay", "random_group", "move_to", "fade_out", "lock_interaction", "exit_app", "query_llm")
+NUMBER_FIELDS = ("gt", "sec", "rate", "count", "duration", "window_sec", "within_sec", "gt_value", "lt_value",
+                 "opacity", "hover_recovery", "weight", "priority", "cooldown", "max_triggers", "probability")
+LIST_FIELDS = ("keywords", "pnames", "minutes", "conditions", "actions", "branches")
+# 运行时按不区分大小写匹配的字段，编译时预先转小写
+LOWERCASE_FIELDS = {"clip_match": "keywords", "music_match": "keywords", "url_match": "keywords",
+                    "title_match": "keywords", "process_active": "pnames", "process_background": "pnames"}
+
+
+def _relative(path: Path, root: Path) -> str:
+    try: return path.relative_to(root).as_posix()
+    except ValueError: return str(path)  # 清单中写的绝对路径原样保留
+
+
+@dataclass(frozen=True)
+class PackIssue:
+    level: str      # "error": 运行时会失效或抛异常；"warning": 运行时会退回默认行为
+    where: str
+    message: str
+
+    def __str__(self):
+        return f"[{self.level}] {self.where}: {self.message}"
+
+
+class _Compiler:
+    """对当前激活的资源包做一次完整检查，同时生成运行时可直接使用的预编译数据。"""
+
+    def __init__(self, pm):
+        self.pm = pm
+        self.root = pm.pack_root
+        self.issues: List[PackIssue] = []
+        self.sources: Set[Path] = {self.root / "pack.json"}
+        self.plugin_conditions: Set[str] = set()
+        self.plugin_actions: Set[str] = set()
+        self.emotions: Dict[str, Any] = {}
+        self.used_emotions: Set[str] = set()
+        self.audio: Dict[str, Dict[str, Optional[str]]] = {"event_dir": {}, "emotion_dir": {}, "error_dir": {}}
+
+    def error(self, where, message): self.issues.append(PackIssue("error", where, message))
+
+    def warn(self, where, message): self.issues.append(PackIssue("warning", where, message))
+
+    def _load(self, key: str, where: str) -> Any:
+        path = self.pm.get_path("logic", key)
+        if path is None: return None
+        self.sources.add(path)
+        if not self.pm.exists(path):
+            self.error(where, f"清单引用的文件不存在: {path.name}")
+            return None
+        try: return self.pm.read_json(path)
+        except ValueError as e:
+            self.error(where, f"JSON 解析失败: {e}")
+            return None
+
+    def _resolve_audio(self, kind: str, name: str, where: str) -> Optional[str]:
+        table = self.audio[kind]
+        if name in table: return table[name]
+        root = self.pm.get_path("audio", kind, materialize=False)
+        rel = None
+        if root is None:
+            self.warn(where, f"清单未配置 {kind}，无法使用音频 {name}")
+        else:
+            path = root / name
+            self.sources.add(path.parent)
+            if self.pm.is_file(path): rel = _relative(path, self.root)
+            else: self.warn(where, f"音频不存在: {name}")
+        table[name] = rel
+        return rel
+
+    # ---- 插件 ----
+    def check_plugins(self):
+        rel = self.pm.pack_data.get("logic", {}).get("plugins")
+        if not rel: return
+        plugin_dir = self.root / rel
+        self.sources.add(plugin_dir)
+        if not self.pm.exists(plugin_dir):
+            self.error("pack.json", f"插件目录不存在: {rel}")
+            return
+        seen = {}
+        for name in self.pm.listdir(plugin_dir):
+            if not name.endswith(".py"): continue
+            path, where = plugin_dir / name, f"plugins/{name}"
+            self.sources.add(path)
+            try: tree = ast.parse(self.pm.read_bytes(path), filename=name)
+            except SyntaxError as e:
+                self.error(where, f"语法错误: {e}")
+                continue
+            # 只做静态分析，不执行插件代码
+            info, funcs = None, {n.name for n in tree.body if isinstance(n, ast.FunctionDef)}
+            for node in tree.body:
+                if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "INFO" for t in node.targets):
+                    try: info = ast.literal_eval(node.value)
+                    except ValueError:
+                        self.error(where, "INFO 必须是字面量字典")
+                        info = False
+            if info is None:
+                self.warn(where, "缺少 INFO，不会被加载")
+                continue
+            if not isinstance(info, dict) or not info.get("id"):
+                if info is not False: self.error(where, "INFO 缺少 id")
+                continue
+            if info["id"] in seen: self.error(where, f"插件 id {info['id']} 与 {seen[info['id']]} 重复")
+            seen[info["id"]] = name
+            for key, func, target in (("triggers", "check_status", self.plugin_conditions),
+                                      ("actions", "execute_action", self.plugin_actions)):
+                items = info.get(key, [])
+                if not isinstance(items, list):
+                    self.error(where, f"INFO.{key} 必须是列表")
+                    continue
+                for item in items:
+                    if not isinstance(item, dict) or not item.get("type"): self.error(where, f"INFO.{key} 中的条目缺少 type")
+                    else: target.add(item["type"])
+                if items and func not in funcs: self.error(where, f"声明了 {key} 但没有定义 {func}()")
+
+    # ---- 触发器 ----
+    def _number(self, node: dict, key: str, where: str) -> bool:
+        value = node.get(key)
+        if value is None or (isinstance(value, (int, float)) and not isinstance(value, bool)): return True
+        try:
+            node[key] = float(value)
+            self.warn(where, f"{key} 应为数字，已按 {node[key]} 编译")
+            return True
+        except (TypeError, ValueError):
+            self.error(where, f"{key} 必须是数字: {value!r}")
+            return False
+
+    def _fields(self, node: dict, where: str) -> bool:
+        ok = all([self._number(node, k, where) for k in NUMBER_FIELDS if k in node])
+        for k in LIST_FIELDS:
+            if k in node and not isinstance(node[k], list):
+                self.error(where, f"{k} 必须是列表")
+                ok = False
+        return ok
+
+    def _condition(self, node: dict, where: str) -> bool:
+        if not isinstance(node, dict):
+            self.error(where, "条件必须是对象")
+            return False
+        if not self._fields(node, where): return False
+        if "logic" in node:
+            node["logic"] = str(node["logic"]).upper()
+            if node["logic"] not in LOGIC_TYPES:
+                self.error(where, f"未知的 logic: {node['logic']}")
+                return False
+            conds = node.get("conditions", [])
+            if not conds: self.warn(where, "conditions 为空，永远不会满足")
+            return all([self._condition(c, f"{where}.{i}") for i, c in enumerate(conds)])
+        t = node.get("type")
+        if t in CALENDAR_TYPES:
+            spec = CalendarCondition(node)
+            if not spec.valid or (t == "date_match" and spec.month_day is None) or (t == "time_cron" and not spec.minutes):
+                self.error(where, f"{t} 参数无效")
+                return False
+            return True
+        if t in self.plugin_conditions: return True
+        if t not in CONDITION_REQUIRED:
+            self.error(where, f"未知的条件类型: {t}")
+            return False
+        required = CONDITION_REQUIRED[t]
+        if required and not any(node.get(k) for k in required):
+            self.error(where, f"{t} 缺少 {' / '.join(required)}")
+            return False
+        field = LOWERCASE_FIELDS.get(t)
+        if field and field in node: node[field] = [str(v).lower() for v in node[field]]
+        return True
+
+    def _actions(self, actions: list, where: str) -> bool:
+        ok = True
+        for i, act in enumerate(actions):
+            w = f"{where}.actions.{i}"
+            if not isinstance(act, dict) or not self._fields(act, w):
+                if not isinstance(act, dict): self.error(w, "动作必须是对象")
+                ok = False
+                continue
+            t = act.get("type")
+            if t == "speak":
+                emotion = str(act.get("emotion", FALLBACK_EMOTION)).split("|")[0]
+                self.used_emotions.add(emotion)
+                if self.emotions and emotion not in self.emotions:
+                    self.warn(w, f"情绪 {emotion} 未在 emotions.json 中定义，语音合成回退到 {FALLBACK_EMOTION}")
+                if act.get("voice_file"): self._resolve_audio("event_dir", act["voice_file"], w)
+            elif t == "random_group":
+                for j, b in enumerate(act.get("branches", [])):
+                    if not isinstance(b, dict) or not isinstance(b.get("actions", []), list):
+                        self.error(f"{w}.branches.{j}", "分支必须是含 actions 列表的对象")
+                        ok = False
+                    elif not (self._fields(b, f"{w}.branches.{j}") and self._actions(b.get("actions", []), f"{w}.branches.{j}")):
+                        ok = False
+            elif t == "move_to" and act.get("pos", "bottom_right") not in ("top_left", "bottom_right"):
+                self.warn(w, f"未知的位置 {act.get('pos')}，不会移动")
+            elif t not in ACTION_TYPES and t not in self.plugin_actions:
+                self.warn(w, f"未知的动作类型 {t}，运行时会被忽略")
+        return ok
+
+    def compile_triggers(self) -> list:
+        rules = self._load("triggers", "triggers.json")
+        if rules is None: return []
+        if not isinstance(rules, list):
+            self.error("triggers.json", "顶层必须是列表")
+            return []
+        # 在副本上规范化，不修改 PackManager 缓存中的共享对象
+        rules = json.loads(json.dumps(rules))
+        compiled, ids = [], set()
+        for i, rule in enumerate(rules):
+            rid = str(rule.get("id", "default")) if isinstance(rule, dict) else "?"
+            where = f"triggers.json[{i}:{rid}]"
+            if not isinstance(rule, dict):
+                self.error(where, "规则必须是对象")
+                continue
+            if "id" not in rule: self.warn(where, "缺少 id，冷却与计数会与其他无 id 的规则共享")
+            elif rid in ids: self.warn(where, f"id {rid} 重复")
+            ids.add(rid)
+            rule.setdefault("logic", "AND")
+            conditions_ok = self._condition(rule, where)
+            if self._actions(rule.get("actions", []), where) and conditions_ok: compiled.append(rule)
+            else: self.error(where, "规则已从预编译结果中剔除")
+        return compiled
+
+    # ---- 情绪 / 立绘 / 错误配置 ----
+    def check_emotions(self):
+        data = self._load("emotions", "emotions.json")
+        if not isinstance(data, dict):
+            if data is not None: self.error("emotions.json", "顶层必须是对象")
+            return
+        self.emotions = data
+        if FALLBACK_EMOTION not in data: self.error("emotions.json", f"缺少回退情绪 {FALLBACK_EMOTION}")
+        for emotion, cfg in data.items():
+            where = f"emotions.json:{emotion}"
+            if not isinstance(cfg, dict) or not cfg.get("ref_wav"):
+                self.error(where, "缺少 ref_wav")
+                continue
+            if not cfg.get("ref_text"): self.warn(where, "缺少 ref_text")
+            self._resolve_audio("emotion_dir", cfg["ref_wav"], where)
+
+    def check_error_config(self):
+        data = self._load("error_config", "error_config.json")
+        if not isinstance(data, dict): return
+        for key, cfg in data.items():
+            if not isinstance(cfg, dict): continue
+            self.used_emotions.add(cfg.get("emotion", "<E:sad>"))
+            if cfg.get("audio"): self._resolve_audio("error_dir", cfg["audio"], f"error_config.json:{key}")
+
+    def compile_sprites(self) -> Dict[str, Dict[str, str]]:
+        sprites = {}
+        sprites_dir = self.root / "assets" / "sprites"
+        emotions = set(self.emotions) | self.used_emotions
+        for outfit in self.pm.get_outfits():
+            outfit_dir = sprites_dir / outfit
+            where = f"sprites/{outfit}"
+            self.sources.update((outfit_dir, outfit_dir / "sum.json"))
+            try: table = self.pm.read_json(outfit_dir / "sum.json")
+            except (OSError, ValueError) as e:
+                self.error(where, f"sum.json 无法读取: {e}")
+                continue
+            files = set(self.pm.listdir(outfit_dir))
+            resolved = {}
+            for emotion, names in table.items():
+                for name in names if isinstance(names, list) else []:
+                    file = next((name + ext for ext in SPRITE_EXTS if name + ext in files), None)
+                    if file: resolved[name] = file
+                    else: self.error(where, f"{emotion} 的立绘 {name} 不存在")
+            for emotion in sorted(emotions - set(table)):
+                if emotion == FALLBACK_EMOTION: self.error(where, f"sum.json 缺少回退情绪 {FALLBACK_EMOTION}")
+                else: self.warn(where, f"sum.json 缺少 {emotion}，运行时回退到 {FALLBACK_EMOTION}")
+            sprites[outfit] = resolved
+        return sprites
+
+    def run(self) -> dict:
+        self.check_plugins()
+        self.check_emotions()
+        triggers = self.compile_triggers()
+        self.check_error_config()
+        sprites = self.compile_sprites()
+        return {"version": COMPILED_VERSION, "pack": self.pm.active_pack_id,
+                "sources": self.pm.source_stamps(self.sources),
+                "triggers": triggers, "sprites": sprites, "audio": self.audio,
+                "issues": {"errors": sum(i.level == "error" for i in self.issues),
+                           "warnings": sum(i.level == "warning" for i in self.issues)}}
+
+
+def compile_pack(pm) -> Tuple[dict, List[PackIssue]]:
+    """检查 pm 当前激活的资源包，返回 (预编译数据, 问题列表)。"""
+    compiler = _Compiler(pm)
+    artifact = compiler.run()
+    return artifact, compiler.issues
+
+
+def is_fresh(artifact: Any, pack_root: Path) -> bool:
+    if not isinstance(artifact, dict) or artifact.get("version") != COMPILED_VERSION: return False
+    return all(stamp(pack_root / rel) == old for rel, old in artifact.get("sources", {}).items())
+
+
+def write_artifact(path: Path, artifact: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f: json.dump(artifact, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name): os.remove(tmp_name)
+        raise
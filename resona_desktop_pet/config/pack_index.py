@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import logging
+import zipfile
+import tempfile
+import threading
+from dataclasses import dataclass, asdict, field, fields
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .pack_bundle import BUNDLE_SUFFIX, MANIFEST_NAME, PackBundle
+
+INDEX_VERSION = 1
+# 两次目录校验之间的最短间隔，右键菜单反复打开时不再重复 stat
+INDEX_REVALIDATE_SEC = 2.0
+
+
+@dataclass
+class PackEntry:
+    folder: str
+    id: str = ""
+    name: str = ""
+    version: str = ""
+    outfits: List[str] = field(default_factory=list)    # assets/sprites 下含 sum.json 的目录
+    emotions: List[str] = field(default_factory=list)   # emotions.json 中的标签
+    plugins: List[str] = field(default_factory=list)    # 插件目录下的 *.py 文件名
+    # 相对包目录的来源路径 -> (mtime_ns, size)，任一变化时只重建该包的条目
+    stamps: Dict[str, List[int]] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PackEntry":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+
+def stamp(path: Path) -> List[int]:
+    """文件或目录的 [mtime_ns, size]，不存在时为 [-1, -1]。索引与预编译数据都用它判断来源是否变化。"""
+    try:
+        st = path.stat()
+        return [st.st_mtime_ns, st.st_size]
+    except OSError:
+        return [-1, -1]
+
+
+def _rel(pack_dir: Path, rel: Optional[str]) -> Optional[Path]:
+    if not rel: return None
+    p = Path(rel)
+    return p if p.is_absolute() else pack_dir / rel
+
+
+def _source_paths(pack_dir: Path, manifest: dict) -> Dict[str, Optional[Path]]:
+    """决定条目内容的文件与目录。目录的 mtime 在增删子项时变化，足以发现新增的服装或插件。"""
+    logic = manifest.get("logic", {})
+    return {
+        "manifest": pack_dir / "pack.json",
+        "sprites": pack_dir / "assets" / "sprites",
+        "plugins": _rel(pack_dir, logic.get("plugins")),
+        "emotions": _rel(pack_dir, logic.get("interaction_configs", {}).get("emotions")),
+    }
+
+
+def _read_json(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _new_entry(folder: str, manifest: dict) -> PackEntry:
+    info = manifest.get("pack_info", {})
+    return PackEntry(folder=folder, id=info.get("id") or manifest.get("id") or "",
+                     name=info.get("name", ""), version=str(info.get("version", "")))
+
+
+def build_entry(pack_dir: Path) -> PackEntry:
+    """读取单个包目录，生成索引条目。pack.json 无法解析时抛出异常。"""
+    if pack_dir.suffix == BUNDLE_SUFFIX: return build_bundle_entry(pack_dir)
+    manifest = _read_json(pack_dir / MANIFEST_NAME)
+    entry = _new_entry(pack_dir.name, manifest)
+    sources = _source_paths(pack_dir, manifest)
+    sprites = sources["sprites"]
+    if sprites.is_dir():
+        entry.outfits = sorted(d.name for d in sprites.iterdir() if d.is_dir() and (d / "sum.json").exists())
+    if sources["plugins"] and sources["plugins"].is_dir():
+        entry.plugins = sorted(f.name for f in sources["plugins"].glob("*.py"))
+    if sources["emotions"] and sources["emotions"].exists():
+        try: entry.emotions = list(_read_json(sources["emotions"]).keys())
+        except (OSError, ValueError, AttributeError) as e:
+            logging.warning(f"[PackIndex] {pack_dir.name} 的情绪配置无法解析: {e}")
+    # pack.json 改动了插件/情绪路径时其自身的 stamp 会先变化，因此只需记录当时解析出的路径
+    entry.stamps = {os.path.relpath(p, pack_dir): stamp(p) for p in sources.values() if p is not None}
+    return entry
+
+
+def build_bundle_entry(bundle_path: Path) -> PackEntry:
+    """.resonapack 只读中央目录与清单，整个文件的 mtime/大小即为条目的 stamp。"""
+    with PackBundle(bundle_path) as bundle:
+        manifest = bundle.read_json(MANIFEST_NAME)
+        entry = _new_entry(bundle_path.name, manifest)
+        logic = manifest.get("logic", {})
+        entry.outfits = sorted(d for d in bundle.listdir("assets/sprites")
+                               if bundle.has(f"assets/sprites/{d}/sum.json"))
+        plugins = (logic.get("plugins") or "").strip("/")
+        if plugins: entry.plugins = [n for n in bundle.listdir(plugins) if n.endswith(".py")]
+        emotions = (logic.get("interaction_configs", {}).get("emotions") or "").strip("/")
+        if emotions and bundle.has(emotions):
+            try: entry.emotions = list(bundle.read_json(emotions).keys())
+            except (ValueError, AttributeError) as e:
+                logging.warning(f"[PackIndex] {bundle_path.name} 的情绪配置无法解析: {e}")
+    entry.stamps = {".": stamp(bundle_path)}
+    return entry
+
+
+class PackIndex:
+    """角色包索引，持久化到 cache/pack_index.json。
+
+    目录包与 .resonapack 单文件包都会被收录，条目的 folder 为 packs 下的目录名或文件名。
+    refresh() 只列一次 packs 目录并 stat 每个包的少量文件；只有 mtime/大小变化的包才会重新读取
+    pack.json，其余条目直接沿用磁盘上的索引。结果变化时原子写回。
+    """
+
+    def __init__(self, packs_dir: Path, cache_path: Path):
+        self.packs_dir = Path(packs_dir)
+        self.cache_path = Path(cache_path)
+        self.entries: Dict[str, PackEntry] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("packs_dir") != str(self.packs_dir): return
+        self.entries = {e["folder"]: PackEntry.from_dict(e) for e in data.get("packs", []) if e.get("folder")}
+
+    @staticmethod
+    def _is_stale(pack_dir: Path, entry: PackEntry) -> bool:
+        if not entry.stamps: return True
+        return any(stamp(pack_dir / rel) != old for rel, old in entry.stamps.items())
+
+    def refresh(self, force: bool = False) -> bool:
+        """按目录变化增量更新索引，返回索引是否有变化。"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < INDEX_REVALIDATE_SEC: return False
+        with self._lock:
+            self._checked_at = now
+            changed = False
+            seen = set()
+            if self.packs_dir.is_dir():
+                for pack_dir in self.packs_dir.iterdir():
+                    if pack_dir.suffix == BUNDLE_SUFFIX:
+                        if not pack_dir.is_file(): continue
+                    elif not pack_dir.is_dir() or not (pack_dir / MANIFEST_NAME).exists(): continue
+                    seen.add(pack_dir.name)
+                    old = self.entries.get(pack_dir.name)
+                    if old is not None and not self._is_stale(pack_dir, old): continue
+                    try:
+                        self.entries[pack_dir.name] = build_entry(pack_dir)
+                    except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+                        logging.warning(f"[PackIndex] 无法读取 {pack_dir.name} 的 pack.json: {e}")
+                        self.entries.pop(pack_dir.name, None)
+                        seen.discard(pack_dir.name)
+                    changed = True
+            for folder in set(self.entries) - seen:
+                del self.entries[folder]
+                changed = True
+            if changed: self._save()
+            return changed
+
+    def folders(self) -> List[str]:
+        self.refresh()
+        return sorted(self.entries)
+
+    def id_map(self) -> Dict[str, str]:
+        # 同一 id 同时存在目录与 .resonapack 时目录优先，便于边改边测
+        ordered = sorted(self.entries.values(), key=lambda e: (not e.folder.endswith(BUNDLE_SUFFIX), e.folder))
+        return {e.id: e.folder for e in ordered if e.id}
+
+    def get(self, pack_id: str) -> Optional[PackEntry]:
+        """按 id 或目录名查找。"""
+        self.refresh()
+        entry = self.entries.get(pack_id)
+        if entry is not None: return entry
+        return next((e for e in self.entries.values() if e.id == pack_id), None)
+
+    def _save(self):
+        payload = json.dumps({"version": INDEX_VERSION, "packs_dir": str(self.packs_dir),
+                              "packs": [asdict(self.entries[k]) for k in sorted(self.entries)]},
+                             indent=2, ensure_ascii=False)
+        tmp_name = None
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(prefix=".pack_index.", suffix=".tmp", dir=str(self.cache_path.parent))
+            with os.fdopen(fd, "w", encoding="utf-8") as f: f.write(payload)
+            os.replace(tmp_name, self.cache_path)
+        except OSError as e:
+            logging.warning(f"[PackIndex] 写入索引失败: {e}")
+            if tmp_name and os.path.exists(tmp_name):
+                try: os.remove(tmp_name)
+                except OSError: pass
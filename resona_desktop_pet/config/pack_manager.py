@@ -1,9 +1,45 @@
 import json
 import os
 import sys
+import time
+import shutil
+import hashlib
+import logging
+import threading
 import importlib.util
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List, Tuple
+
+from .pack_index import PackIndex, PackEntry, stamp
+from .pack_bundle import BUNDLE_SUFFIX, PackBundle
+
+# 同一文件在该间隔内不重复 stat，热路径完全不碰文件系统
+RESOURCE_REVALIDATE_SEC = 2.0
+# 每这么多次查询输出一次缓存命中率
+RESOURCE_STATS_EVERY = 500
+
+_MISSING = object()
+
+
+def _parse_json(path: Path) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@dataclass
+class PreparedPack:
+    """prepare() 在后台线程读好的资源包，activate() 在 GUI 线程一次性换入。"""
+    folder: str
+    pack_data: Dict[str, Any]
+    plugins: Dict[str, Any]
+    plugin_trigger_map: Dict[str, str]
+    plugin_action_map: Dict[str, str]
+    emotions: Dict[str, Any]
+    outfit: Optional[str]
+    compiled: Optional[dict]
+    timings: Dict[str, float] = field(default_factory=dict)  # 各阶段耗时 (ms)
+
 
 class PackManager:
     def __init__(self, project_root: Path):
@@ -15,23 +51,231 @@ class PackManager:
         self.loaded_plugins: Dict[str, Any] = {}
         self.plugin_trigger_map: Dict[str, str] = {}
         self.plugin_action_map: Dict[str, str] = {}
+        # (path, kind) -> [mtime_ns, size, checked_at, value]
+        self._resource_cache: Dict[Tuple[Path, str], list] = {}
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.index = PackIndex(self.packs_dir, project_root / "cache" / "pack_index.json")
+        # .resonapack 文件名 -> 已映射的包；需要真实路径的成员解出到 extract_root 下
+        self._bundles: Dict[str, PackBundle] = {}
+        self.extract_root = project_root / "cache" / "bundles"
+        # (包名, 校验时间, 预编译数据或 None)
+        self._compiled: Optional[Tuple[str, float, Optional[dict]]] = None
         self._scan_packs()
 
+    def read_resource(self, path: Path, kind: str, parse: Callable[[Path], Any]) -> Any:
+        """资源缓存：按 (路径, 类型) 缓存 parse(path) 的结果，文件 mtime 或大小变化时重新解析。
+
+        最近 RESOURCE_REVALIDATE_SEC 秒内校验过的条目直接返回，不再 stat。返回的是共享对象，
+        调用方不得修改；文件不存在或解析失败时照常抛出异常。.resonapack 内的成员以整个包文件的
+        mtime/大小校验，json/text 直接从映射内存解析。
+        """
+        path = Path(path)
+        key = (path, kind)
+        now = time.monotonic()
+        entry = self._resource_cache.get(key)
+        if entry and now - entry[2] < RESOURCE_REVALIDATE_SEC:
+            self._count(True)
+            if entry[3] is _MISSING: raise FileNotFoundError(str(path))
+            return entry[3]
+        try:
+            current = self._stat(path)
+        except FileNotFoundError:
+            # 不存在的文件同样缓存一个校验周期，避免可选资源每次都探测磁盘
+            with self._cache_lock:
+                self._resource_cache[key] = [-1, -1, now, _MISSING]
+            self._count(False)
+            raise
+        if entry and entry[0] == current[0] and entry[1] == current[1]:
+            entry[2] = now
+            self._count(True)
+            return entry[3]
+        value = self._parse(path, kind, parse)
+        with self._cache_lock:
+            self._resource_cache[key] = [current[0], current[1], now, value]
+        self._count(False)
+        return value
+
+    def _stat(self, path: Path) -> Tuple[int, int]:
+        member = self._locate(path)
+        if member is None:
+            st = path.stat()
+            return st.st_mtime_ns, st.st_size
+        bundle, name = member
+        if not bundle.has(name): raise FileNotFoundError(str(path))
+        return bundle.stamp
+
+    def _parse(self, path: Path, kind: str, parse: Callable[[Path], Any]) -> Any:
+        member = self._locate(path)
+        if member is None: return parse(path)
+        bundle, name = member
+        if kind == "json": return bundle.read_json(name)
+        if kind == "text": return bundle.read(name).decode("utf-8")
+        return parse(bundle.extract(name, self._extract_dir(bundle)))
+
+    def read_json(self, path: Path) -> Any:
+        return self.read_resource(path, "json", _parse_json)
+
+    def read_text(self, path: Path) -> str:
+        return self.read_resource(path, "text", lambda p: p.read_text(encoding="utf-8"))
+
+    # ---- .resonapack 透明访问 ----
+    # 单文件包的包根目录就是 packs/<名称>.resonapack 这个文件路径本身，get_path 等拼出的
+    # packs/X.resonapack/logic/triggers.json 之类的路径由下面几个方法解析到包内成员。
+
+    @property
+    def pack_root(self) -> Path:
+        return self.packs_dir / self.active_pack_id
+
+    @property
+    def data_dir(self) -> Path:
+        """可写的包数据目录（state.json 等）。单文件包不能写入，使用同级的 <名称>_data 目录。"""
+        if self.active_pack_id.endswith(BUNDLE_SUFFIX):
+            return self.packs_dir / (self.active_pack_id[:-len(BUNDLE_SUFFIX)] + "_data")
+        return self.pack_root
+
+    def _bundle(self, filename: str) -> PackBundle:
+        bundle = self._bundles.get(filename)
+        path = self.packs_dir / filename
+        st = path.stat()
+        if bundle is not None and bundle.stamp == (st.st_mtime_ns, st.st_size): return bundle
+        with self._cache_lock:
+            bundle = self._bundles.get(filename)
+            if bundle is None or bundle.stamp != (st.st_mtime_ns, st.st_size):
+                # 旧映射可能仍被其他线程持有的切片引用，不主动关闭，交给 GC
+                bundle = self._bundles[filename] = PackBundle(path)
+                logging.info(f"[PackManager] 已映射 {filename} ({len(bundle.names())} 个成员)")
+                self._prune_extracted(bundle)
+        return bundle
+
+    def _locate(self, path: Path) -> Optional[Tuple[PackBundle, str]]:
+        try: parts = Path(path).relative_to(self.packs_dir).parts
+        except ValueError: return None
+        if not parts or not parts[0].endswith(BUNDLE_SUFFIX): return None
+        try: bundle = self._bundle(parts[0])
+        except OSError: return None
+        return bundle, "/".join(parts[1:])
+
+    def _extract_dir(self, bundle: PackBundle) -> Path:
+        digest = hashlib.sha1(repr(bundle.stamp).encode()).hexdigest()[:10]
+        return self.extract_root / f"{bundle.path.stem}-{digest}"
+
+    def _prune_extracted(self, bundle: PackBundle):
+        current = self._extract_dir(bundle)
+        if not self.extract_root.exists(): return
+        for old in self.extract_root.iterdir():
+            if old != current and old.name.rsplit("-", 1)[0] == bundle.path.stem:
+                shutil.rmtree(old, ignore_errors=True)
+
+    def exists(self, path: Path) -> bool:
+        member = self._locate(path)
+        if member is None: return Path(path).exists()
+        bundle, name = member
+        return bundle.has(name) or bundle.is_dir(name)
+
+    def is_file(self, path: Path) -> bool:
+        member = self._locate(path)
+        if member is None: return Path(path).is_file()
+        return member[0].has(member[1])
+
+    def read_bytes(self, path: Path) -> bytes:
+        """不经过资源缓存的原始读取，用于立绘等大文件。"""
+        member = self._locate(path)
+        if member is None: return Path(path).read_bytes()
+        bundle, name = member
+        if not bundle.has(name): raise FileNotFoundError(str(path))
+        return bundle.read(name)
+
+    def listdir(self, path: Path) -> List[str]:
+        member = self._locate(path)
+        if member is None:
+            try: return sorted(os.listdir(path))
+            except OSError: return []
+        return member[0].listdir(member[1])
+
+    def source_stamps(self, paths) -> Dict[str, list]:
+        """相对包根目录的路径 -> [mtime_ns, size]；单文件包整体只记一项。"""
+        if self.active_pack_id.endswith(BUNDLE_SUFFIX): return {".": stamp(self.pack_root)}
+        stamps = {}
+        for p in paths:
+            try: rel = Path(p).relative_to(self.pack_root).as_posix()
+            except ValueError: rel = str(p)
+            stamps[rel] = stamp(Path(p))
+        return stamps
+
+    def materialize(self, path: Path) -> Path:
+        """返回可交给外部（播放器、SoVITS、import）的真实路径；单文件包内的成员按需解出，同一版本只解一次。"""
+        member = self._locate(path)
+        if member is None: return Path(path)
+        bundle, name = member
+        return bundle.extract(name, self._extract_dir(bundle))
+
+    # ---- 预编译数据（tools/validate_pack.py 生成）----
+
+    def compiled_path(self, folder: Optional[str] = None) -> Path:
+        return self.project_root / "cache" / "compiled" / f"{folder or self.active_pack_id}.json"
+
+    def compiled(self) -> Optional[dict]:
+        """当前包的预编译数据；不存在或任一来源文件有变化时返回 None，调用方退回逐个读取文件。"""
+        now = time.monotonic()
+        c = self._compiled
+        if c is not None and c[0] == self.active_pack_id and now - c[1] < RESOURCE_REVALIDATE_SEC: return c[2]
+        data, stale = self._read_compiled(self.active_pack_id)
+        if stale and (c is None or c[0] != self.active_pack_id or c[2] is not None):
+            logging.info(f"[PackManager] {self.active_pack_id} 的预编译数据已过期，改为直接读取资源文件")
+        self._compiled = (self.active_pack_id, now, data)
+        return data
+
+    def _read_compiled(self, folder: str) -> Tuple[Optional[dict], bool]:
+        """返回 (预编译数据, 是否因过期被丢弃)。"""
+        from .pack_compiler import is_fresh
+        try: data = self.read_json(self.compiled_path(folder))
+        except (OSError, ValueError): return None, False
+        if is_fresh(data, self.packs_dir / folder): return data, False
+        return None, True
+
+    def resolve_audio(self, kind: str, name: str) -> Optional[Path]:
+        """音频引用 -> 可播放的真实路径，不存在时返回 None。有预编译数据时不再探测文件。"""
+        compiled = self.compiled()
+        table = compiled["audio"].get(kind, {}) if compiled else {}
+        if name in table:
+            rel = table[name]
+            return self.materialize(self.pack_root / rel) if rel is not None else None
+        if not self.pack_data: self._load_pack_manifest()
+        return self._audio_file(self.pack_root, self.pack_data, kind, name)
+
+    def _audio_file(self, pack_root: Path, pack_data: Dict[str, Any], kind: str, name: str) -> Optional[Path]:
+        # 目录本身不解出，单文件包只解出用到的这一个成员
+        root = self._pack_path(pack_root, pack_data, "audio", kind, materialize=False)
+        path = (root / name) if root else Path(name)
+        return self.materialize(path) if self.is_file(path) else None
+
+    def sprite_file(self, outfit: str, sprite: str) -> Optional[str]:
+        """预编译的立绘文件名（含扩展名），没有记录时返回 None。"""
+        compiled = self.compiled()
+        if not compiled: return None
+        return compiled["sprites"].get(outfit, {}).get(sprite)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        total = self.cache_hits + self.cache_misses
+        return {"entries": len(self._resource_cache), "hits": self.cache_hits, "misses": self.cache_misses,
+                "hit_rate": self.cache_hits / total if total else 0.0}
+
+    def _count(self, hit: bool):
+        with self._cache_lock:
+            if hit: self.cache_hits += 1
+            else: self.cache_misses += 1
+            total = self.cache_hits + self.cache_misses
+        if total % RESOURCE_STATS_EVERY == 0:
+            stats = self.cache_stats()
+            logging.info(f"[PackManager] 资源缓存: {stats['entries']} 项, 命中率 {stats['hit_rate']:.1%} "
+                         f"({stats['hits']}/{total})")
+
     def _scan_packs(self):
-        self.id_map = {}
-        if not self.packs_dir.exists(): return
-        for p_dir in self.packs_dir.iterdir():
-            if p_dir.is_dir():
-                manifest = p_dir / "pack.json"
-                if manifest.exists():
-                    try:
-                        with open(manifest, "r", encoding="utf-8") as f:
-                            data = json.load(f)
-                            info = data.get("pack_info", {})
-                            pid = info.get("id") or data.get("id")
-                            if pid:
-                                self.id_map[pid] = p_dir.name
-                    except: pass
+        # 持久化索引只重新读取有变化的包，未变化的包不再打开 pack.json
+        self.index.refresh(force=True)
+        self.id_map = self.index.id_map()
 
     def set_active_pack(self, pack_id: str):
         folder_name = self.id_map.get(pack_id, pack_id)
@@ -39,28 +283,83 @@ class PackManager:
         self._load_pack_manifest()
         self._unload_plugins()
 
+    def prepare(self, pack_id: str, plugins_enabled: bool) -> PreparedPack:
+        """读取并预热新资源包（清单、插件、触发器、情绪与 TTS 参考音频、文本、默认服装），不改动当前包。
+
+        可在后台线程调用；清单无法读取时抛出异常，当前包不受影响。读过的 JSON 留在资源缓存中，
+        换入后 load_triggers() 等再次读取时直接命中。
+        """
+        timings, mark = {}, [time.perf_counter()]
+        def lap(phase):
+            now = time.perf_counter()
+            timings[phase] = round((now - mark[0]) * 1000, 1)
+            mark[0] = now
+        entry = self.index.get(pack_id)
+        folder = entry.folder if entry else self.id_map.get(pack_id, pack_id)
+        root = self.packs_dir / folder
+        lap("index")
+        pack_data = self.read_json(root / "pack.json")
+        lap("manifest")
+        plugins = self._load_plugin_modules(folder, pack_data) if plugins_enabled else ({}, {}, {})
+        lap("plugins")
+        compiled, _ = self._read_compiled(folder)
+        for key in ("thinking", "listening", "error_config") + (() if compiled else ("triggers",)):
+            path = self._pack_path(root, pack_data, "logic", key)
+            if path and self.exists(path):
+                try: self.read_json(path)
+                except ValueError as e: logging.warning(f"[PackManager] {folder} 的 {key} 无法解析: {e}")
+        lap("logic")
+        emotions = {}
+        path = self._pack_path(root, pack_data, "logic", "emotions")
+        if path and self.exists(path):
+            try: emotions = self.read_json(path)
+            except ValueError as e: logging.warning(f"[PackManager] {folder} 的 emotions 无法解析: {e}")
+        # 单文件包只解出情绪配置引用的参考音频，换入后首次合成不再等待
+        for cfg in emotions.values() if isinstance(emotions, dict) else ():
+            if isinstance(cfg, dict) and cfg.get("ref_wav"): self._audio_file(root, pack_data, "emotion_dir", cfg["ref_wav"])
+        lap("tts")
+        outfit = (pack_data.get("character", {}).get("outfits") or [{}])[0].get("id")
+        if entry is None or outfit not in entry.outfits: outfit = None
+        else:
+            try: self.read_json(root / "assets" / "sprites" / outfit / "sum.json")
+            except (OSError, ValueError): outfit = None
+        lap("sprites")
+        return PreparedPack(folder, pack_data, *plugins, emotions, outfit, compiled, timings)
+
+    def activate(self, prepared: PreparedPack):
+        """换入 prepare() 的结果。每个字段都是整体替换引用，其他线程不会读到清空了一半的字典。"""
+        self.pack_data = prepared.pack_data
+        self.loaded_plugins = prepared.plugins
+        self.plugin_trigger_map = prepared.plugin_trigger_map
+        self.plugin_action_map = prepared.plugin_action_map
+        self._compiled = (prepared.folder, time.monotonic(), prepared.compiled)
+        self.active_pack_id = prepared.folder
+
     def _unload_plugins(self):
-        self.loaded_plugins.clear()
-        self.plugin_trigger_map.clear()
-        self.plugin_action_map.clear()
+        # 换成新对象而不是 clear()，行为监控线程手里的旧引用不会在遍历中途被清空
+        self.loaded_plugins, self.plugin_trigger_map, self.plugin_action_map = {}, {}, {}
 
     def load_plugins(self, enabled: bool):
         if not enabled:
             self._unload_plugins()
             return
+        loaded, trigger_map, action_map = self._load_plugin_modules(self.active_pack_id, self.pack_data)
+        self.loaded_plugins, self.plugin_trigger_map, self.plugin_action_map = loaded, trigger_map, action_map
 
-        plugin_dir_rel = self.pack_data.get("logic", {}).get("plugins")
+    def _load_plugin_modules(self, folder: str, pack_data: Dict[str, Any]) -> Tuple[dict, dict, dict]:
+        loaded, trigger_map, action_map = {}, {}, {}
+        plugin_dir_rel = pack_data.get("logic", {}).get("plugins")
         if not plugin_dir_rel:
-            return
+            return loaded, trigger_map, action_map
 
-        plugin_dir = self.packs_dir / self.active_pack_id / plugin_dir_rel
+        plugin_dir = self.materialize(self.packs_dir / folder / plugin_dir_rel)
         if not plugin_dir.exists() or not plugin_dir.is_dir():
-            return
+            return loaded, trigger_map, action_map
 
         print(f"[PackManager] Loading plugins from {plugin_dir}")
         for f in plugin_dir.glob("*.py"):
             try:
-                module_name = f"resona_plugin_{self.active_pack_id}_{f.stem}"
+                module_name = f"resona_plugin_{folder.replace('.', '_')}_{f.stem}"
                 spec = importlib.util.spec_from_file_location(module_name, f)
                 if spec and spec.loader:
                     module = importlib.util.module_from_spec(spec)
@@ -76,31 +375,31 @@ class PackManager:
                         plugin_id = module.INFO.get("id")
                         print(f"[PackManager] plugin_id: {plugin_id}")
                         if plugin_id:
-                            self.loaded_plugins[plugin_id] = module
+                            loaded[plugin_id] = module
                             triggers = module.INFO.get("triggers", [])
                             print(f"[PackManager] triggers: {triggers}")
                             for t in triggers:
                                 t_type = t.get("type")
                                 print(f"[PackManager] 处理 trigger: type={t_type}")
                                 if t_type:
-                                    self.plugin_trigger_map[t_type] = plugin_id
+                                    trigger_map[t_type] = plugin_id
                                     print(f"[PackManager] 已注册 trigger: {t_type} -> {plugin_id}")
                             for a in module.INFO.get("actions", []):
                                 a_type = a.get("type")
-                                if a_type: self.plugin_action_map[a_type] = plugin_id
+                                if a_type: action_map[a_type] = plugin_id
                             print(f"[PackManager] Loaded plugin: {plugin_id}")
-                            print(f"[PackManager] 当前 plugin_trigger_map: {self.plugin_trigger_map}")
+                            print(f"[PackManager] 当前 plugin_trigger_map: {trigger_map}")
             except Exception as e:
                 print(f"[PackManager] Failed to load plugin {f.name}: {e}")
                 import traceback
                 traceback.print_exc()
+        return loaded, trigger_map, action_map
 
     def _load_pack_manifest(self):
-        manifest_path = self.packs_dir / self.active_pack_id / "pack.json"
-        if manifest_path.exists():
+        manifest_path = self.pack_root / "pack.json"
+        if self.exists(manifest_path):
             try:
-                with open(manifest_path, "r", encoding="utf-8") as f:
-                    self.pack_data = json.load(f)
+                self.pack_data = self.read_json(manifest_path)
             except Exception as e:
                 print(f"[PackManager] Error loading manifest: {e}")
         else:
@@ -118,53 +417,46 @@ class PackManager:
 
         return default
 
-    def get_path(self, category: str, key: str = None) -> Optional[Path]:
+    def get_path(self, category: str, key: str = None, materialize: bool = True) -> Optional[Path]:
         if not self.pack_data:
             self._load_pack_manifest()
-        pack_root = self.packs_dir / self.active_pack_id
+        return self._pack_path(self.pack_root, self.pack_data, category, key, materialize)
+
+    def _pack_path(self, pack_root: Path, pack_data: Dict[str, Any], category: str, key: str = None,
+                   materialize: bool = True) -> Optional[Path]:
         try:
             rel_path = None
             if category == "logic":
-                configs = self.pack_data.get("logic", {}).get("interaction_configs", {})
+                configs = pack_data.get("logic", {}).get("interaction_configs", {})
                 if key == "triggers": rel_path = configs.get("triggers")
                 elif key == "prompts":
-                    prompts = self.pack_data.get("logic", {}).get("prompts", [])
+                    prompts = pack_data.get("logic", {}).get("prompts", [])
                     if prompts: rel_path = prompts[0].get("path")
                 elif key == "error_config": rel_path = configs.get("error_config")
                 elif key == "emotions": rel_path = configs.get("emotions")
                 elif key == "thinking": rel_path = configs.get("thinking")
                 elif key == "listening": rel_path = configs.get("listening")
             elif category == "audio":
-                audio_cfg = self.pack_data.get("audio", {})
+                audio_cfg = pack_data.get("audio", {})
                 if key == "event_dir": rel_path = audio_cfg.get("event_audio_dir")
                 elif key == "emotion_dir": rel_path = audio_cfg.get("emotion_audio_dir")
                 elif key == "error_dir": rel_path = audio_cfg.get("error_audio_dir")
             elif category == "model":
-                rel_path = self.pack_data.get("character", {}).get("sovits_model", {}).get(key)
+                rel_path = pack_data.get("character", {}).get("sovits_model", {}).get(key)
 
             if rel_path:
                 p = Path(rel_path)
-                return p if p.is_absolute() else pack_root / rel_path
+                p = p if p.is_absolute() else pack_root / rel_path
+                # 音频与模型交给外部播放器 / SoVITS，需要真实文件
+                return self.materialize(p) if materialize and category in ("audio", "model") else p
         except: pass
         return None
 
     def get_available_emotions(self) -> list:
         emotions_path = self.get_path("logic", "emotions")
-        if emotions_path and emotions_path.exists():
+        if emotions_path and self.exists(emotions_path):
             try:
-                with open(emotions_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    return list(data.keys())
-            except: pass
-        return []
-
-    def get_available_emotions(self) -> list:
-        emotions_path = self.get_path("logic", "emotions")
-        if emotions_path and emotions_path.exists():
-            try:
-                with open(emotions_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    return list(data.keys())
+                return list(self.read_json(emotions_path).keys())
             except: pass
         return []
 
@@ -172,5 +464,14 @@ class PackManager:
         return self.pack_data.get("character", {}).get("name", "Unknown")
 
     def get_available_packs(self) -> list:
-        if not self.packs_dir.exists(): return []
-        return [d.name for d in self.packs_dir.iterdir() if d.is_dir() and (d / "pack.json").exists()]
+        packs = self.index.folders()
+        self.id_map = self.index.id_map()
+        return packs
+
+    def get_pack_entry(self, pack_id: Optional[str] = None) -> Optional[PackEntry]:
+        return self.index.get(pack_id or self.active_pack_id)
+
+    def get_outfits(self, pack_id: Optional[str] = None) -> List[str]:
+        """包内 assets/sprites 下可用的服装目录（来自索引）。"""
+        entry = self.get_pack_entry(pack_id)
+        return list(entry.outfits) if entry else []
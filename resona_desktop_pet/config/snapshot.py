@@ -0,0 +1,78 @@
+from dataclasses import dataclass, field, fields
+from typing import FrozenSet, Optional
+
+
+def _opt(section: str, key: str, default, minimum: Optional[float] = None):
+    return field(default=default, metadata={"section": section, "key": key, "minimum": minimum})
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """config.cfg 中常用配置项的类型化只读快照。
+
+    每次 load()/publish() 解析一次后整体替换发布，热路径直接读属性，不再逐次查询 configparser。
+    字段的 metadata 记录其来源 [section] key，类型由注解决定。
+    """
+    # [General]
+    use_pack_settings: bool = _opt("General", "use_pack_settings", True)
+    plugins_enabled: bool = _opt("General", "plugins_enabled", False)
+    debug_trigger: bool = _opt("General", "debugtrigger", False)
+    debug_panel: bool = _opt("General", "debug_panel", False)
+    always_on_top: bool = _opt("General", "always_on_top", False)
+    always_show_ui: bool = _opt("General", "always_show_ui", False)
+    show_in_taskbar: bool = _opt("General", "show_in_taskbar", True)
+    idle_opacity: float = _opt("General", "idle_opacity", 0.8)
+    idle_fade_delay: float = _opt("General", "idle_fade_delay", 3.0)
+    text_read_speed: float = _opt("General", "text_read_speed", 0.2)
+    base_display_time: float = _opt("General", "base_display_time", 2.0)
+    thinking_text_enabled: bool = _opt("General", "ThinkingText", True)
+    thinking_text_switch: bool = _opt("General", "ThinkingTextSwitch", True)
+    thinking_text_time: float = _opt("General", "ThinkingTextTime", 1.0)
+    thinking_text_switch_time: float = _opt("General", "ThinkingTextSwitchTime", 5.0)
+    listening_text_enabled: bool = _opt("General", "ListeningText", True)
+    monitor_music: bool = _opt("General", "monitor_music", True)
+    # [Advanced]
+    monitor_clipboard: bool = _opt("Advanced", "monitor_clipboard", True)
+    clipboard_max_chars: int = _opt("Advanced", "clipboard_max_chars", 4096, minimum=1)
+    use_ui_automation: bool = _opt("Advanced", "use_ui_automation", True)
+    check_last_input: bool = _opt("Advanced", "check_last_input", True)
+    special_dates_mode: str = _opt("Advanced", "special_dates_mode", "once")
+    # [Behavior]
+    behavior_enabled: bool = _opt("Behavior", "enabled", True)
+    behavior_interval: float = _opt("Behavior", "interval", 1.0)
+    behavior_text_read_multiplier: float = _opt("Behavior", "behavior_text_read_multiplier", 1.5)
+    trigger_cooldown: float = _opt("Behavior", "trigger_cooldown", 30.0)
+    post_busy_delay: float = _opt("Behavior", "post_busy_delay", 5.0)
+    sensor_deadline: float = _opt("Behavior", "sensor_deadline", 0.5)
+    pending_queue_size: int = _opt("Behavior", "pending_queue_size", 4, minimum=1)
+    pending_trigger_ttl: float = _opt("Behavior", "pending_trigger_ttl", 60.0)
+    eco_mode_enabled: bool = _opt("Behavior", "eco_mode", True)
+    eco_on_battery: bool = _opt("Behavior", "eco_on_battery", True)
+    eco_cpu_threshold: float = _opt("Behavior", "eco_cpu_threshold", 90.0)
+    eco_interval_factor: float = _opt("Behavior", "eco_interval_factor", 4.0, minimum=1.0)
+    eco_unload_stt: bool = _opt("Behavior", "eco_unload_stt", False)
+    # [STT] / [SoVITS]
+    stt_enabled: bool = _opt("STT", "enabled", True)
+    sovits_enabled: bool = _opt("SoVITS", "enabled", True)
+    sovits_timeout: int = _opt("SoVITS", "api_timeout", 120)
+
+    @classmethod
+    def from_config(cls, cfg) -> "ConfigSnapshot":
+        """cfg 为 ConfigManager，按字段类型调用对应的解析方法。"""
+        values = {}
+        for f in fields(cls):
+            section, key, minimum = f.metadata["section"], f.metadata["key"], f.metadata["minimum"]
+            try:
+                if f.type in (bool, "bool"): value = cfg.getboolean(section, key, f.default)
+                elif f.type in (int, "int"): value = cfg.getint(section, key, f.default)
+                elif f.type in (float, "float"): value = cfg.getfloat(section, key, f.default)
+                else: value = cfg.get(section, key, f.default)
+            except ValueError:
+                print(f"[Config] [{section}] {key} 格式无效，使用默认值 {f.default}")
+                value = f.default
+            if minimum is not None: value = max(type(value)(minimum), value)
+            values[f.name] = value
+        return cls(**values)
+
+    def diff(self, other: "ConfigSnapshot") -> FrozenSet[str]:
+        return frozenset(f.name for f in fields(self) if getattr(self, f.name) != getattr(other, f.name))
@@ -0,0 +1,58 @@
+import logging
+from typing import Callable, Optional, Tuple
+
+import psutil
+
+CPU_HYSTERESIS = 10.0
+
+
+def _read_on_battery() -> Optional[bool]:
+    battery = psutil.sensors_battery()
+    return None if battery is None else not battery.power_plugged
+
+
+class EcoModePolicy:
+    """判定是否进入节能模式：全屏运行、使用电池、系统 CPU 压力过高任一成立即进入。
+
+    battery_reader / cpu_reader 可替换为桩函数以便调试；evaluate 的 on_battery / cpu_usage
+    参数非 None 时直接采用（mock 数据走这条路）。CPU 条件带回差，避免在阈值附近反复切换。
+    """
+
+    def __init__(self, config, battery_reader: Callable[[], Optional[bool]] = _read_on_battery,
+                 cpu_reader: Callable[[], float] = lambda: psutil.cpu_percent(interval=None)):
+        self.config = config
+        self.battery_reader = battery_reader
+        self.cpu_reader = cpu_reader
+        self.active = False
+        self.reason = ""
+
+    def evaluate(self, is_fullscreen: bool, on_battery: Optional[bool] = None,
+                 cpu_usage: Optional[float] = None) -> Tuple[bool, str]:
+        reason = ""
+        if self.config.snapshot.eco_mode_enabled:
+            if is_fullscreen:
+                reason = "fullscreen"
+            elif self.config.snapshot.eco_on_battery and self._on_battery(on_battery):
+                reason = "battery"
+            elif self._cpu_pressure(cpu_usage):
+                reason = "cpu"
+        self.active, self.reason = bool(reason), reason
+        return self.active, reason
+
+    def _on_battery(self, value: Optional[bool]) -> bool:
+        if value is not None: return bool(value)
+        try:
+            return bool(self.battery_reader())
+        except Exception as e:
+            logging.debug(f"[Eco] 读取电池状态失败: {e}")
+            return False
+
+    def _cpu_pressure(self, value: Optional[float]) -> bool:
+        threshold = self.config.snapshot.eco_cpu_threshold
+        if threshold <= 0: return False
+        try:
+            cpu = float(value) if value is not None else float(self.cpu_reader())
+        except Exception:
+            return False
+        if self.reason == "cpu": return cpu >= threshold - CPU_HYSTERESIS
+        return cpu >= threshold
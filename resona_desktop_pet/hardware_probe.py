@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import time
+import logging
+import hashlib
+import platform
+import tempfile
+import threading
+import subprocess
+from dataclasses import dataclass, asdict, fields
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Callable, Optional
+
+CACHE_VERSION = 2  # 2: 混合 AMD 平台按 AMD 处理，旧缓存需重新探测
+CACHE_MAX_AGE = 7 * 24 * 3600
+# PCI vendor id -> 厂商
+PCI_VENDORS = {"0x10de": "NVIDIA", "0x1002": "AMD", "0x1022": "AMD", "0x8086": "Intel"}
+# Windows 显示适配器设备类
+DISPLAY_CLASS_KEY = r"SYSTEM\CurrentControlSet\Control\Class\{4d36e968-e325-11ce-bfc1-08002be10318}"
+
+
+@dataclass(frozen=True)
+class HardwareCapabilities:
+    gpu_vendor: str = "Unknown"
+    gpu_name: str = ""
+    # 默认关闭：AMD 显卡下读取 GPU 传感器曾导致崩溃，只有探测确认硬件后才开启
+    can_monitor_gpu: bool = False
+    has_gpu_sensor: bool = False     # 是否有可用的 GPU 读数来源（pynvml / GPUtil）
+    has_cpu_temp: bool = True
+    cpu_cores: int = 1
+    physical_cores: int = 1
+    fingerprint: str = ""
+    probed_at: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HardwareCapabilities":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+
+def machine_fingerprint() -> str:
+    """只用不需要外部进程的信息：主机名、系统版本、架构与 CPU 数量。"""
+    parts = [platform.node(), platform.system(), platform.release(), platform.machine(), str(os.cpu_count())]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _vendor_from_name(name: str) -> str:
+    up = name.upper()
+    if "NVIDIA" in up or "GEFORCE" in up or "QUADRO" in up: return "NVIDIA"
+    if "AMD" in up or "RADEON" in up: return "AMD"
+    if "INTEL" in up: return "Intel"
+    return "Unknown"
+
+
+def _pick_gpu(names):
+    """多显卡时选出决定能力的那一块：只要有 AMD 显卡（含核显）就按 AMD 处理，与原先的 wmic 判断一致。
+
+    pynvml / GPUtil 只取第 0 块设备，无法保证读到的是 NVIDIA 而不是 AMD，因此混合平台也关闭 GPU 监控。
+    """
+    rank = {"AMD": 0, "NVIDIA": 1, "Intel": 2, "Unknown": 3}
+    best = min(names, key=lambda n: rank[_vendor_from_name(n)], default="")
+    return _vendor_from_name(best), best
+
+
+def _probe_gpu_windows():
+    names = []
+    try:
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, DISPLAY_CLASS_KEY) as root:
+            for i in range(winreg.QueryInfoKey(root)[0]):
+                sub = winreg.EnumKey(root, i)
+                if not sub.isdigit(): continue
+                try:
+                    with winreg.OpenKey(root, sub) as key:
+                        names.append(str(winreg.QueryValueEx(key, "DriverDesc")[0]))
+                except OSError: pass
+    except Exception as e:
+        logging.debug(f"[Hardware] 读取显示适配器注册表失败: {e}")
+    if not names:
+        # 注册表不可读时退回 CIM 查询（wmic 在新版 Windows 上已移除）
+        try:
+            out = subprocess.run(["powershell", "-NoProfile", "-Command",
+                                  "Get-CimInstance Win32_VideoController | Select-Object -ExpandProperty Name"],
+                                 capture_output=True, timeout=15, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+            names = [l.strip() for l in out.stdout.decode("utf-8", errors="ignore").splitlines() if l.strip()]
+        except Exception as e:
+            logging.debug(f"[Hardware] CIM 查询显卡失败: {e}")
+    return _pick_gpu(names)
+
+
+def _read_text(path: Path) -> str:
+    try: return path.read_text(encoding="utf-8", errors="ignore").strip()
+    except OSError: return ""
+
+
+def _probe_gpu_linux(sys_root: Path = Path("/sys")):
+    names = []
+    for card in sorted((sys_root / "class" / "drm").glob("card[0-9]*")):
+        if "-" in card.name: continue  # card0-HDMI-A-1 之类是连接器
+        vendor = PCI_VENDORS.get(_read_text(card / "device" / "vendor").lower())
+        if vendor:
+            names.append(f"{vendor} {_read_text(card / 'device' / 'device')}".strip())
+    vendor, name = _pick_gpu(names)
+    if vendor == "NVIDIA":
+        # 专有驱动会在 /proc 下给出型号
+        for info in Path("/proc/driver/nvidia/gpus").glob("*/information"):
+            for line in _read_text(info).splitlines():
+                if line.startswith("Model:"): return vendor, line.split(":", 1)[1].strip()
+    return vendor, name
+
+
+def _linux_has_cpu_temp(sys_root: Path = Path("/sys")) -> bool:
+    for hw in (sys_root / "class" / "hwmon").glob("hwmon*"):
+        if _read_text(hw / "name") in ("coretemp", "k10temp", "zenpower", "cpu_thermal"): return True
+    return any((sys_root / "class" / "thermal").glob("thermal_zone*/temp"))
+
+
+def _has_cpu_temp() -> bool:
+    if sys.platform.startswith("linux"): return _linux_has_cpu_temp()
+    try:
+        import psutil
+        return bool(getattr(psutil, "sensors_temperatures", lambda: {})())
+    except Exception:
+        return False
+
+
+def probe_hardware() -> HardwareCapabilities:
+    """实际探测，耗时操作，应在后台线程调用。"""
+    if sys.platform == "win32": vendor, name = _probe_gpu_windows()
+    elif sys.platform.startswith("linux"): vendor, name = _probe_gpu_linux()
+    else: vendor, name = "Unknown", ""
+    try:
+        import psutil
+        physical = psutil.cpu_count(logical=False) or os.cpu_count() or 1
+    except Exception:
+        physical = os.cpu_count() or 1
+    can_monitor = vendor != "AMD"
+    has_gpu_sensor = can_monitor and vendor in ("NVIDIA", "Unknown") and bool(find_spec("pynvml") or find_spec("GPUtil"))
+    return HardwareCapabilities(
+        gpu_vendor=vendor, gpu_name=name, can_monitor_gpu=can_monitor, has_gpu_sensor=has_gpu_sensor,
+        has_cpu_temp=_has_cpu_temp(), cpu_cores=os.cpu_count() or 1, physical_cores=physical,
+        fingerprint=machine_fingerprint(), probed_at=time.time())
+
+
+class HardwareProbe:
+    """硬件能力探测结果的磁盘缓存。
+
+    load_cached() 只读缓存文件，可在 GUI 线程调用；指纹不符或过期时返回 None。
+    probe_async() 在后台线程探测并写回缓存，完成后调用回调（回调运行在探测线程中）。
+    """
+
+    def __init__(self, cache_path: Path, max_age: float = CACHE_MAX_AGE):
+        self.cache_path = Path(cache_path)
+        self.max_age = max_age
+
+    def load_cached(self) -> Optional[HardwareCapabilities]:
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != CACHE_VERSION: return None
+        caps = HardwareCapabilities.from_dict(data.get("capabilities", {}))
+        if caps.fingerprint != machine_fingerprint() or time.time() - caps.probed_at > self.max_age: return None
+        return caps
+
+    def probe_async(self, callback: Callable[[HardwareCapabilities], None]) -> threading.Thread:
+        def run():
+            try:
+                caps = probe_hardware()
+            except Exception as e:
+                logging.warning(f"[Hardware] 探测失败: {e}")
+                return
+            self._save(caps)
+            callback(caps)
+        thread = threading.Thread(target=run, name="resona-hw-probe", daemon=True)
+        thread.start()
+        return thread
+
+    def _save(self, caps: HardwareCapabilities):
+        payload = json.dumps({"version": CACHE_VERSION, "capabilities": asdict(caps)}, indent=2, ensure_ascii=False)
+        tmp_name = None
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(prefix=".hardware.", suffix=".tmp", dir=str(self.cache_path.parent))
+            with os.fdopen(fd, "w", encoding="utf-8") as f: f.write(payload)
+            os.replace(tmp_name, self.cache_path)
+        except OSError as e:
+            logging.warning(f"[Hardware] 写入缓存失败: {e}")
+            if tmp_name and os.path.exists(tmp_name):
+                try: os.remove(tmp_name)
+                except OSError: pass
@@ -0,0 +1,211 @@
+import io
+import os
+import sys
+import gzip
+import time
+import queue
+import shutil
+import logging
+import threading
+import logging.handlers
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+APP_LOG_MAX_BYTES = 10 * 1024 * 1024
+APP_LOG_ROTATE_SEC = 24 * 3600
+APP_LOG_KEEP = 20
+QUEUE_SIZE = 10000
+APP_FORMAT = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+DEDICATED_FORMAT = '%(asctime)s - %(message)s'
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """队列满时直接丢弃并计数，保证调用线程（GUI / asyncio）永不因日志阻塞。"""
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RateLimitFilter(logging.Filter):
+    """按 logger 名称做令牌桶限流，用于 SoVITS 子进程输出等高频来源；WARNING 及以上不受限。
+
+    被丢弃的行数会在令牌恢复后附在下一条日志前面提示。
+    """
+
+    def __init__(self, names: Iterable[str], rate: float = 20.0, burst: int = 200):
+        super().__init__()
+        self.names = tuple(names)
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not record.name.startswith(self.names): return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(record.name, [float(self.burst), now, 0])
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1.0
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.msg = f"(限流丢弃 {suppressed} 行) {record.getMessage()}"
+            record.args = None
+        return True
+
+
+class NameFilter(logging.Filter):
+    """include 为空时放行 exclude 之外的所有 logger；min_level_for_excluded 允许被排除的来源的高等级日志通过。"""
+
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = (), min_level_for_excluded: Optional[int] = None):
+        super().__init__()
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.min_level_for_excluded = min_level_for_excluded
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.include: return record.name.startswith(self.include)
+        if self.exclude and record.name.startswith(self.exclude):
+            return self.min_level_for_excluded is not None and record.levelno >= self.min_level_for_excluded
+        return True
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """按大小或时间滚动，滚动出的旧文件以 gzip 压缩。只在 QueueListener 的写线程中使用。"""
+
+    def __init__(self, filename, max_bytes: int = APP_LOG_MAX_BYTES, rotate_sec: float = APP_LOG_ROTATE_SEC,
+                 backup_count: int = APP_LOG_KEEP):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.rotate_sec = rotate_sec
+        self._rollover_at = time.time() + rotate_sec
+        self.namer = lambda name: name + ".gz"
+        self.rotator = _gzip_rotator
+
+    def shouldRollover(self, record) -> bool:
+        if self.rotate_sec > 0 and time.time() >= self._rollover_at: return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        self._rollover_at = time.time() + self.rotate_sec
+
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def compress_old_logs(log_dir: Path, pattern: str, current: Path, keep: int = APP_LOG_KEEP):
+    """压缩之前运行留下的日志，并只保留最近 keep 份。"""
+    for path in sorted(log_dir.glob(pattern)):
+        if path.resolve() == current.resolve() or path.suffix == ".gz": continue
+        try:
+            _gzip_rotator(str(path), str(path) + ".gz")
+        except OSError:
+            pass
+    archives = sorted(log_dir.glob(pattern + ".gz"), key=lambda p: p.stat().st_mtime)
+    for old in archives[:-keep] if keep > 0 else archives:
+        try: old.unlink()
+        except OSError: pass
+
+
+class StreamToLogger(io.TextIOBase):
+    """替换 sys.stdout / sys.stderr：按行转成日志记录，写入动作只是入队。"""
+
+    def __init__(self, logger: logging.Logger, level: int):
+        self.logger = logger
+        self.level = level
+        self._buf = threading.local()
+
+    def write(self, message: str) -> int:
+        buf = getattr(self._buf, "text", "") + message
+        *lines, rest = buf.split("\n")
+        for line in lines:
+            if line.strip(): self.logger.log(self.level, line.rstrip())
+        self._buf.text = rest
+        return len(message)
+
+    def flush(self):
+        rest = getattr(self._buf, "text", "")
+        if rest.strip(): self.logger.log(self.level, rest.rstrip())
+        self._buf.text = ""
+
+    def isatty(self) -> bool:
+        return False
+
+
+class LogPipeline:
+    """单写线程日志管线：所有 logger 与 print 都经 QueueHandler 入队，由 QueueListener 统一写文件与控制台。"""
+
+    def __init__(self, log_dir: Path, app_log: Path, dedicated: Dict[str, Path],
+                 rate_limited: Iterable[str] = ("SoVITS",), console=None):
+        self.log_dir = Path(log_dir)
+        self.app_log = Path(app_log)
+        self.queue = queue.Queue(QUEUE_SIZE)
+        self.dedicated = names = tuple(dedicated)
+        handlers = []
+
+        app_handler = CompressingRotatingFileHandler(self.app_log)
+        app_handler.setFormatter(logging.Formatter(APP_FORMAT))
+        app_handler.addFilter(NameFilter(exclude=names, min_level_for_excluded=logging.WARNING))
+        handlers.append(app_handler)
+        if console is not None:
+            console_handler = logging.StreamHandler(console)
+            console_handler.setFormatter(logging.Formatter(APP_FORMAT))
+            console_handler.addFilter(NameFilter(exclude=names, min_level_for_excluded=logging.WARNING))
+            handlers.append(console_handler)
+        for name, path in dedicated.items():
+            h = CompressingRotatingFileHandler(path)
+            h.setFormatter(logging.Formatter(DEDICATED_FORMAT))
+            h.addFilter(NameFilter(include=(name,)))
+            handlers.append(h)
+
+        self.handler = DroppingQueueHandler(self.queue)
+        self.handler.addFilter(RateLimitFilter(rate_limited))
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self._stopped = False
+
+    def start(self):
+        root = logging.getLogger()
+        for h in list(root.handlers): root.removeHandler(h)
+        root.addHandler(self.handler)
+        root.setLevel(logging.INFO)
+        for name in self.dedicated:
+            lg = logging.getLogger(name)
+            for h in list(lg.handlers): lg.removeHandler(h)
+            lg.propagate = True
+        self.listener.start()
+        threading.Thread(target=compress_old_logs, args=(self.log_dir, "app_*.log", self.app_log),
+                         name="resona-log-compress", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._stopped: return
+        self._stopped = True
+        for stream in (sys.stdout, sys.stderr):
+            if isinstance(stream, StreamToLogger): stream.flush()
+        self.listener.stop()
+        if self.handler.dropped and sys.__stderr__ is not None:
+            sys.__stderr__.write(f"[Log] 队列已满，丢弃了 {self.handler.dropped} 条日志\n")
+
+
+def setup_logging(log_dir: Path, app_log: Path, dedicated: Dict[str, Path]) -> LogPipeline:
+    # 写线程里的 handler 出错时不再把 traceback 打到 stderr，否则会经 StreamToLogger 回流进队列
+    logging.raiseExceptions = False
+    console = sys.__stdout__
+    pipeline = LogPipeline(log_dir, app_log, dedicated, console=console).start()
+    sys.stdout = StreamToLogger(logging.getLogger("stdout"), logging.INFO)
+    sys.stderr = StreamToLogger(logging.getLogger("stderr"), logging.ERROR)
+    return pipeline
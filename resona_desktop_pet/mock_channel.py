@@ -0,0 +1,73 @@
+import json
+import socket
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+PORT_FILE_NAME = "mock_channel.port"
+
+
+class MockChannelServer:
+    """debugtrigger 模式下接收 sensor_mocker 推送的传感器快照。
+
+    本地回环 TCP，每行一条 {"version": n, "data": {...}}。只保留最新快照，
+    只有版本变化时才递增本地版本号并回调 on_update，监听线程据此立即唤醒。
+    """
+
+    def __init__(self, temp_dir: Path, on_update: Optional[Callable[[], None]] = None):
+        self.on_update = on_update
+        self._lock = threading.Lock()
+        self._version = 0
+        self._data: dict = {}
+        self._running = True
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(2)
+        self.port = self._sock.getsockname()[1]
+        temp_dir.mkdir(parents=True, exist_ok=True)
+        self.port_file = temp_dir / PORT_FILE_NAME
+        self.port_file.write_text(str(self.port), encoding="utf-8")
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        logging.info(f"[MockChannel] Listening on 127.0.0.1:{self.port}")
+
+    def latest(self) -> Tuple[int, dict]:
+        with self._lock:
+            return self._version, self._data
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket):
+        last_remote_version = None
+        try:
+            with conn, conn.makefile("r", encoding="utf-8") as stream:
+                for line in stream:
+                    try:
+                        msg = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    data = msg.get("data")
+                    remote_version = msg.get("version")
+                    if not isinstance(data, dict) or remote_version == last_remote_version:
+                        continue
+                    last_remote_version = remote_version
+                    with self._lock:
+                        self._version += 1
+                        self._data = data
+                    if self.on_update:
+                        self.on_update()
+        except OSError:
+            pass
+
+    def close(self):
+        self._running = False
+        try: self._sock.close()
+        except OSError: pass
+        try: self.port_file.unlink()
+        except OSError: pass
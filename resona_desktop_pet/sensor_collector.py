@@ -0,0 +1,52 @@
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+
+class SensorCollector:
+    """在小线程池上并发采集互相独立的传感器。
+
+    每个传感器有各自的截止时间，超时则沿用上一次的值（首次则用 defaults）。
+    超时的任务不会被重复提交，等它完成后下一轮再取结果，因此慢传感器不会堆积线程。
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resona-sensor")
+        self._inflight: Dict[str, Future] = {}
+        self._last: Dict[str, Any] = {}
+        self.timeouts: Dict[str, int] = {}
+
+    def collect(self, sensors: Dict[str, Callable[[], Any]], deadline: float,
+                defaults: Optional[Dict[str, Any]] = None, deadlines: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        defaults = defaults or {}
+        deadlines = deadlines or {}
+        start = time.monotonic()
+        futures = {}
+        for name, fn in sensors.items():
+            f = self._inflight.get(name)
+            if f is None:
+                f = self._pool.submit(fn)
+                self._inflight[name] = f
+            futures[name] = f
+        results = {}
+        for name in sorted(futures, key=lambda n: deadlines.get(n, deadline)):
+            f = futures[name]
+            remaining = start + deadlines.get(name, deadline) - time.monotonic()
+            if not f.done() and remaining > 0:
+                wait([f], timeout=remaining)
+            if f.done():
+                del self._inflight[name]
+                try:
+                    self._last[name] = f.result()
+                except Exception as e:
+                    logging.error(f"[Sensor] {name} failed: {e}")
+            else:
+                self.timeouts[name] = self.timeouts.get(name, 0) + 1
+                logging.debug(f"[Sensor] {name} 超过截止时间，沿用上次结果")
+            results[name] = self._last.get(name, defaults.get(name))
+        return results
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._inflight.clear()
@@ -0,0 +1,45 @@
+import json
+import time
+import logging
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# 尽量早地被 main.py 导入，作为各阶段耗时的起点
+PROCESS_START = time.perf_counter()
+
+
+class StartupTrace:
+    """记录启动各阶段相对进程启动的时间点，首帧绘制后输出汇总并写入 JSON。"""
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = PROCESS_START if origin is None else origin
+        self.phases: List[Tuple[str, float]] = []
+        self.finished = False
+
+    def mark(self, phase: str) -> None:
+        if self.finished: return
+        self.phases.append((phase, time.perf_counter() - self.origin))
+
+    def summary(self) -> dict:
+        rows, prev = [], 0.0
+        for phase, at in self.phases:
+            rows.append({"phase": phase, "at_ms": round(at * 1000, 1), "delta_ms": round((at - prev) * 1000, 1)})
+            prev = at
+        return {"phases": rows, "total_ms": round(prev * 1000, 1)}
+
+    def finish(self, phase: str = "first_paint", out_path: Optional[Path] = None) -> dict:
+        if self.finished: return self.summary()
+        self.mark(phase)
+        self.finished = True
+        data = self.summary()
+        detail = ", ".join(f"{r['phase']}={r['delta_ms']}ms" for r in data["phases"])
+        logging.info(f"[Startup] {phase} 于 {data['total_ms']}ms 完成 ({detail})")
+        if out_path is not None:
+            try:
+                Path(out_path).write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+            except OSError as e:
+                logging.warning(f"[Startup] 写入 {out_path} 失败: {e}")
+        return data
+
+
+startup_trace = StartupTrace()
@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+DEFAULT_FLUSH_DELAY = 2.0
+
+
+class StateCounter:
+    """持久化的整数计数器，读写都只操作内存，由 StateStore 负责落盘。"""
+
+    def __init__(self, store: "StateStore", name: str):
+        self._store = store
+        self.name = name
+
+    @property
+    def value(self) -> int:
+        try:
+            return int(self._store.get(self.name, 0))
+        except (TypeError, ValueError):
+            return 0
+
+    def add(self, delta: int = 1) -> int:
+        with self._store._lock:
+            try:
+                value = int(self._store._data.get(self.name, 0)) + delta
+            except (TypeError, ValueError):
+                value = delta
+            self._store._data[self.name] = value
+            self._store._mark_dirty()
+        return value
+
+    def set(self, value: int) -> None:
+        self._store.set(self.name, int(value))
+
+
+class StateStore:
+    """资源包 state.json 的写后缓存。
+
+    修改只落在内存并标记为脏，后台线程在首次变脏后 flush_delay 秒把期间的所有修改合并为一次写入；
+    写入先写同目录临时文件再 os.replace，崩溃时不会留下半截 JSON。退出时调用 close() 同步刷盘。
+    """
+
+    def __init__(self, path: Path, flush_delay: float = DEFAULT_FLUSH_DELAY):
+        self.flush_delay = flush_delay
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._path = Path(path)
+        self._data: Dict[str, Any] = self._read(self._path)
+        self._counters: Dict[str, StateCounter] = {}
+        self._dirty_since = None
+        self._closed = False
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._writer_loop, name="resona-state", daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            if self._data.get(key) == value and key in self._data: return
+            self._data[key] = value
+            self._mark_dirty()
+
+    def counter(self, name: str) -> StateCounter:
+        c = self._counters.get(name)
+        if c is None:
+            c = self._counters[name] = StateCounter(self, name)
+        return c
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._data)
+
+    def retarget(self, path: Path) -> None:
+        """切换资源包时先把旧数据写回，再载入新包的 state.json。"""
+        self.flush()
+        data = self._read(Path(path))
+        with self._lock:
+            self._path = Path(path)
+            self._data = data
+            self._dirty_since = None
+
+    def flush(self) -> None:
+        # 先拿写锁再取快照，保证并发 flush 时较新的快照不会被较旧的覆盖
+        with self._write_lock:
+            with self._lock:
+                if self._dirty_since is None: return
+                path, payload = self._path, json.dumps(self._data, indent=4, ensure_ascii=False)
+                self._dirty_since = None
+            if not self._write(path, payload):
+                with self._lock:
+                    if self._dirty_since is None: self._dirty_since = time.monotonic()  # 写失败则稍后重试
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed: return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def _mark_dirty(self):
+        # 调用方已持有 _lock；只在由干净变脏时唤醒写线程，连续修改不产生额外开销
+        if self._dirty_since is None:
+            self._dirty_since = time.monotonic()
+            self._cond.notify()
+
+    def _writer_loop(self):
+        while True:
+            with self._cond:
+                while not self._closed and self._dirty_since is None:
+                    self._cond.wait()
+                if self._closed: return
+                remaining = self._dirty_since + self.flush_delay - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+            self.flush()
+
+    @staticmethod
+    def _write(path: Path, payload: str) -> bool:
+        tmp_name = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, path)
+            return True
+        except Exception as e:
+            logging.error(f"[State] 写入 {path} 失败: {e}")
+            if tmp_name and os.path.exists(tmp_name):
+                try: os.remove(tmp_name)
+                except OSError: pass
+            return False
+
+    @staticmethod
+    def _read(path: Path) -> Dict[str, Any]:
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict): return data
+            except Exception as e:
+                logging.warning(f"[State] 读取 {path} 失败: {e}")
+        return {}
@@ -0,0 +1,10 @@
+from .schedule import CalendarCondition, CALENDAR_TYPES, is_calendar_only, iter_leaf_conditions, next_calendar_change
+from .pending import PendingTriggerQueue, TriggerFire
+from .aggregates import AGGREGATE_TYPES, RollingWindow, SensorAggregates
+from .sequence import SequenceAutomaton
+from .pid_ledger import PidLedger
+from .cumulative import CumulativeWindow
+
+__all__ = ["CalendarCondition", "CALENDAR_TYPES", "is_calendar_only", "iter_leaf_conditions", "next_calendar_change",
+           "PendingTriggerQueue", "TriggerFire", "AGGREGATE_TYPES", "RollingWindow", "SensorAggregates", "SequenceAutomaton",
+           "PidLedger", "CumulativeWindow"]
@@ -0,0 +1,142 @@
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from .schedule import iter_leaf_conditions
+
+SENSOR_KEYS = ("cpu_temp", "gpu_temp", "cpu_usage", "gpu_usage")
+AGGREGATE_KINDS = ("avg", "max", "rising")
+AGGREGATE_TYPES = tuple(f"{k}_{kind}" for k in SENSOR_KEYS for kind in AGGREGATE_KINDS)
+DEFAULT_WINDOW_SEC = 60.0
+MAX_WINDOW_SAMPLES = 3600
+
+
+def parse_aggregate_type(t: str) -> Optional[Tuple[str, str]]:
+    if t not in AGGREGATE_TYPES: return None
+    sensor, kind = t.rsplit("_", 1)
+    return sensor, kind
+
+
+def _window_sec(c: dict) -> float:
+    try:
+        return max(1.0, float(c.get("sec", DEFAULT_WINDOW_SEC)))
+    except (TypeError, ValueError):
+        return DEFAULT_WINDOW_SEC
+
+
+class RollingWindow:
+    """固定容量的时间窗口，NumPy 环形缓冲。
+
+    均值与最小二乘斜率由增量和维护，最大值由单调队列维护，
+    push / 查询均摊 O(1)；每写满一轮缓冲会重算一次和并平移时间原点，避免浮点漂移。
+    """
+
+    def __init__(self, window_sec: float, capacity: int):
+        import numpy as np
+        self._np = np
+        self.window_sec = float(window_sec)
+        self.capacity = max(2, min(int(capacity), MAX_WINDOW_SAMPLES))
+        self._t = np.zeros(self.capacity)
+        self._v = np.zeros(self.capacity)
+        self._head = 0
+        self._len = 0
+        self._origin: Optional[float] = None
+        self._since: Optional[float] = None
+        self._sum_v = self._sum_t = self._sum_tv = self._sum_tt = 0.0
+        self._max: deque = deque()
+        self._pushes = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def push(self, now: float, value: float) -> None:
+        if self._origin is None: self._origin = now
+        t = now - self._origin
+        self._evict(t)
+        if self._len == self.capacity: self._pop_oldest()
+        idx = (self._head + self._len) % self.capacity
+        self._t[idx] = t; self._v[idx] = value
+        self._len += 1
+        self._sum_v += value; self._sum_t += t
+        self._sum_tv += t * value; self._sum_tt += t * t
+        while self._max and self._max[-1][1] <= value: self._max.pop()
+        self._max.append((t, value))
+        if self._since is None: self._since = t
+        self._pushes += 1
+        if self._pushes >= self.capacity: self._rebase()
+
+    def _pop_oldest(self) -> None:
+        t, v = float(self._t[self._head]), float(self._v[self._head])
+        self._sum_v -= v; self._sum_t -= t
+        self._sum_tv -= t * v; self._sum_tt -= t * t
+        self._head = (self._head + 1) % self.capacity
+        self._len -= 1
+        while self._max and self._max[0][0] <= t: self._max.popleft()
+
+    def _evict(self, t: float) -> None:
+        cutoff = t - self.window_sec
+        while self._len and self._t[self._head] <= cutoff: self._pop_oldest()
+        if not self._len: self._since = None
+
+    def _rebase(self) -> None:
+        self._pushes = 0
+        if not self._len: return
+        idx = (self._head + self._np.arange(self._len)) % self.capacity
+        shift = float(self._t[self._head])
+        self._t[idx] -= shift
+        self._origin += shift
+        self._since -= shift
+        self._max = deque((t - shift, v) for t, v in self._max)
+        ts, vs = self._t[idx], self._v[idx]
+        self._sum_v, self._sum_t = float(vs.sum()), float(ts.sum())
+        self._sum_tv, self._sum_tt = float((ts * vs).sum()), float((ts * ts).sum())
+
+    def ready(self, now: float) -> bool:
+        if self._origin is None: return False
+        t = now - self._origin
+        self._evict(t)
+        return self._since is not None and t - self._since >= self.window_sec
+
+    def mean(self) -> float:
+        return self._sum_v / self._len if self._len else 0.0
+
+    def max(self) -> float:
+        return self._max[0][1] if self._max else 0.0
+
+    def slope(self) -> float:
+        n = self._len
+        denom = n * self._sum_tt - self._sum_t * self._sum_t
+        if n < 2 or denom <= 1e-9: return 0.0
+        return (n * self._sum_tv - self._sum_t * self._sum_v) / denom
+
+
+class SensorAggregates:
+    """按 (传感器, 窗口秒数) 维护 RollingWindow，只为 triggers 中实际出现的窗口分配内存。"""
+
+    def __init__(self):
+        self._windows: Dict[Tuple[str, float], RollingWindow] = {}
+
+    def compile(self, triggers: list, interval: float) -> None:
+        windows = {}
+        for rule in triggers:
+            for c in iter_leaf_conditions(rule):
+                parsed = parse_aggregate_type(c.get("type"))
+                if not parsed: continue
+                key = (parsed[0], _window_sec(c))
+                if key not in windows:
+                    windows[key] = self._windows.get(key) or RollingWindow(key[1], key[1] / max(interval, 0.05) * 1.5 + 2)
+        self._windows = windows
+
+    def push(self, now: float, stats: dict) -> None:
+        for (sensor, _), window in self._windows.items():
+            value = stats.get(sensor)
+            if value is not None: window.push(now, float(value))
+
+    def test(self, c: dict, now: float) -> bool:
+        parsed = parse_aggregate_type(c.get("type"))
+        if not parsed: return False
+        window = self._windows.get((parsed[0], _window_sec(c)))
+        if not window or not window.ready(now): return False
+        kind = parsed[1]
+        if kind == "avg": return window.mean() > c.get("gt", 0)
+        if kind == "max": return window.max() > c.get("gt", 0)
+        return window.slope() * 60.0 > c.get("rate", 1.0)
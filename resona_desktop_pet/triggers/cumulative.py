@@ -0,0 +1,32 @@
+from array import array
+from typing import List
+
+
+class CumulativeWindow:
+    """CUMULATIVE 逻辑节点的命中记录：每个子条件只保存最近一次成立的时间戳。
+
+    window_sec > 0 时，超过时间窗的命中被清零，表达“最近 N 秒内这些条件都出现过”；
+    window_sec 为 0 时保持旧语义（曾经达成即可）。reset_on_fire 为真时规则触发后全部清零。
+    """
+
+    def __init__(self, slots: int, window_sec: float = 0.0, reset_on_fire: bool = True):
+        self.window_sec = float(window_sec or 0.0)
+        self.reset_on_fire = bool(reset_on_fire)
+        self._hits = array("d", bytes(8 * slots))  # 0.0 表示尚未命中
+
+    @property
+    def slots(self) -> int:
+        return len(self._hits)
+
+    def update(self, results: List[bool], now: float) -> bool:
+        hits = self._hits
+        for i, hit in enumerate(results):
+            if hit: hits[i] = now
+        if self.window_sec > 0:
+            cutoff = now - self.window_sec
+            for i, t in enumerate(hits):
+                if t and t < cutoff: hits[i] = 0.0
+        return all(hits)
+
+    def reset(self) -> None:
+        for i in range(len(self._hits)): self._hits[i] = 0.0
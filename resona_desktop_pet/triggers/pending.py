@@ -0,0 +1,75 @@
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class TriggerFire:
+    """一次规则命中。入队后可能被去重、挤出或过期而不执行；只有执行时才交给
+    BehaviorMonitor.mark_dispatched 提交冷却、one_shot PID 与 SEQUENCE / CUMULATIVE 清零。"""
+    rule_id: str
+    group: str
+    priority: int
+    actions: list
+    matched_at: float
+    pids: Tuple[int, ...] = ()                                   # one_shot_per_pid 命中的进程
+    start_times: Dict[int, float] = field(default_factory=dict)
+
+
+class PendingTriggerQueue:
+    """有界、按 trigger_group 去重、带过期时间的待执行触发队列。
+
+    priority 越大越先执行，同优先级先进先出。同一组重复入队时只保留
+    优先级更高（或同级更新）的那一条；队满时淘汰优先级最低中最旧的一条。
+    """
+
+    def __init__(self, capacity: int = 4, ttl: float = 60.0):
+        self.capacity = max(1, capacity)
+        self.ttl = ttl
+        self._heap: List[Tuple[int, int, str]] = []
+        self._entries: Dict[str, Tuple[int, int, float, TriggerFire]] = {}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def push(self, fire: TriggerFire, now: float) -> bool:
+        self.expire(now)
+        priority, group = fire.priority, fire.group
+        old = self._entries.get(group)
+        if old and old[0] > priority:
+            return False
+        if not old and len(self._entries) >= self.capacity:
+            victim, (v_prio, _, _, _) = min(self._entries.items(), key=lambda kv: (kv[1][0], kv[1][1]))
+            if v_prio > priority:
+                return False
+            del self._entries[victim]
+        seq = next(self._seq)
+        self._entries[group] = (priority, seq, now + self.ttl, fire)
+        heapq.heappush(self._heap, (-priority, seq, group))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(-p, s, g) for g, (p, s, _, _) in self._entries.items()]
+            heapq.heapify(self._heap)
+        return True
+
+    def pop(self, now: float) -> Optional[TriggerFire]:
+        """取出优先级最高且未过期的一条。"""
+        while self._heap:
+            _, seq, group = heapq.heappop(self._heap)
+            entry = self._entries.get(group)
+            if not entry or entry[1] != seq:
+                continue
+            del self._entries[group]
+            if entry[2] < now:
+                continue
+            return entry[3]
+        return None
+
+    def expire(self, now: float) -> None:
+        for group in [g for g, e in self._entries.items() if e[2] < now]:
+            del self._entries[group]
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._entries.clear()
@@ -0,0 +1,42 @@
+from typing import Dict, Iterable, List, Mapping, Set, Tuple
+
+
+class PidLedger:
+    """one_shot_per_pid 的触发记录：每个 PID 对同一规则只触发一次。
+
+    以 (pid, 进程启动时间) 标识进程，防止 PID 被系统复用后误判为已触发；
+    每次进程快照后调用 prune，已退出进程的记录随即清除，内存只与存活进程数相关。
+    """
+
+    def __init__(self):
+        self._fired: Dict[int, Tuple[float, Set[str]]] = {}
+
+    def fresh(self, rule_id: str, pids: Iterable[int], start_times: Mapping[int, float]) -> List[int]:
+        out = []
+        for pid in pids:
+            entry = self._fired.get(pid)
+            if entry is None or entry[0] != start_times.get(pid, 0.0) or rule_id not in entry[1]:
+                out.append(pid)
+        return out
+
+    def mark(self, rule_id: str, pids: Iterable[int], start_times: Mapping[int, float]) -> None:
+        for pid in pids:
+            start = start_times.get(pid, 0.0)
+            entry = self._fired.get(pid)
+            if entry is None or entry[0] != start:
+                entry = self._fired[pid] = (start, set())
+            entry[1].add(rule_id)
+
+    def prune(self, alive: Mapping[int, float]) -> int:
+        dead = [pid for pid, (start, _) in self._fired.items() if alive.get(pid) != start]
+        for pid in dead: del self._fired[pid]
+        return len(dead)
+
+    def forget_rules(self, rule_ids: Set[str]) -> None:
+        for pid in list(self._fired):
+            rules = self._fired[pid][1]
+            rules.intersection_update(rule_ids)
+            if not rules: del self._fired[pid]
+
+    def __len__(self) -> int:
+        return len(self._fired)
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+CALENDAR_TYPES = ("time_range", "time_cron", "date_match")
+MINUTES_PER_DAY = 24 * 60
+
+
+def _parse_hhmm(text: str) -> Optional[int]:
+    try:
+        t = datetime.strptime(text.strip(), "%H:%M")
+        return t.hour * 60 + t.minute
+    except (ValueError, AttributeError):
+        return None
+
+
+def _floor_minute(now: datetime) -> datetime:
+    return now.replace(second=0, microsecond=0)
+
+
+def _floor_day(now: datetime) -> datetime:
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class CalendarCondition:
+    """预编译的日历条件 (time_range / time_cron / date_match)。
+
+    matches() 给出当前取值，next_change() 给出取值下一次可能变化的时刻，
+    None 表示永远不会变化。
+    """
+
+    def __init__(self, cond: dict):
+        self.type = cond.get("type")
+        self.valid = True
+        if self.type == "time_range":
+            parts = str(cond.get("range", "")).split("-")
+            start = _parse_hhmm(parts[0]) if len(parts) == 2 else None
+            end = _parse_hhmm(parts[1]) if len(parts) == 2 else None
+            self.valid = start is not None and end is not None
+            self.start, self.end = start or 0, end or 0
+        elif self.type == "time_cron":
+            minutes = set()
+            for m in cond.get("minutes", []):
+                try: minutes.add(int(m))
+                except (TypeError, ValueError): pass
+            self.minutes = frozenset(m for m in minutes if 0 <= m < 60)
+        elif self.type == "date_match":
+            self.date = str(cond.get("date", ""))
+            try:
+                month, day = (int(x) for x in self.date.split("-"))
+                self.month_day = (month, day)
+                datetime(2000, month, day)
+            except (TypeError, ValueError):
+                self.month_day = None
+        else:
+            self.valid = False
+
+    def _in_range(self, minute_of_day: int) -> bool:
+        if self.start <= self.end:
+            return self.start <= minute_of_day <= self.end
+        return minute_of_day >= self.start or minute_of_day <= self.end
+
+    def matches(self, now: datetime, m_date: Optional[str] = None, m_time: Optional[str] = None) -> bool:
+        if not self.valid: return False
+        if self.type == "date_match":
+            d = m_date if m_date else now.strftime("%m-%d")
+            return d == self.date
+        minute_of_day = _parse_hhmm(m_time) if m_time else now.hour * 60 + now.minute
+        if minute_of_day is None: return False
+        if self.type == "time_cron":
+            return minute_of_day % 60 in self.minutes
+        return self._in_range(minute_of_day)
+
+    def next_change(self, now: datetime) -> Optional[datetime]:
+        if not self.valid: return None
+        if self.type == "time_range":
+            boundaries = {self.start, (self.end + 1) % MINUTES_PER_DAY}
+            if len(boundaries) == 1: return None
+            day = _floor_day(now)
+            candidates = []
+            for b in boundaries:
+                at = day + timedelta(minutes=b)
+                candidates.append(at if at > now else at + timedelta(days=1))
+            return min(candidates)
+        if self.type == "time_cron":
+            if not self.minutes or len(self.minutes) == 60: return None
+            state = now.minute in self.minutes
+            base = _floor_minute(now)
+            for k in range(1, 61):
+                if ((now.minute + k) % 60 in self.minutes) != state:
+                    return base + timedelta(minutes=k)
+            return None
+        if self.type == "date_match":
+            if self.month_day is None: return None
+            tomorrow = _floor_day(now) + timedelta(days=1)
+            if (now.month, now.day) == self.month_day: return tomorrow
+            month, day = self.month_day
+            for year in range(now.year, now.year + 9):
+                try: at = datetime(year, month, day)
+                except ValueError: continue
+                if at > now: return at
+            return None
+        return None
+
+
+def iter_leaf_conditions(node: dict) -> Iterable[dict]:
+    for c in node.get("conditions", []):
+        if "logic" in c:
+            yield from iter_leaf_conditions(c)
+        else:
+            yield c
+
+
+def is_calendar_only(rule: dict) -> bool:
+    leaves = list(iter_leaf_conditions(rule))
+    return bool(leaves) and all(c.get("type") in CALENDAR_TYPES for c in leaves)
+
+
+def next_calendar_change(specs: Iterable[CalendarCondition], now: datetime) -> Optional[datetime]:
+    changes = [at for at in (s.next_change(now) for s in specs) if at is not None]
+    return min(changes) if changes else None
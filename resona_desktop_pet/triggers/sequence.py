@@ -0,0 +1,32 @@
+from typing import List, Optional
+
+DEFAULT_WITHIN_SEC = 300.0
+
+
+class SequenceAutomaton:
+    """SEQUENCE 逻辑节点编译出的 NFA：子条件须按顺序、在 within_sec 秒内依次成立。
+
+    状态 k 表示“已满足前 k 步”，只保存该状态下起点最晚的部分匹配（起点越晚剩余时间越长，
+    足以代表同状态的所有部分匹配），因此内存固定为 steps + 1 个时间戳。
+    每次推进每个部分匹配最多前进一步，超出时间窗的部分匹配被淘汰。
+    """
+
+    def __init__(self, steps: int, within_sec: float = DEFAULT_WITHIN_SEC):
+        self.steps = steps
+        self.within_sec = within_sec
+        self._starts: List[Optional[float]] = [None] * (steps + 1)
+
+    def advance(self, results: List[bool], now: float) -> bool:
+        if not self.steps: return False
+        starts = self._starts
+        cutoff = now - self.within_sec
+        for k in range(1, self.steps + 1):
+            if starts[k] is not None and starts[k] < cutoff: starts[k] = None
+        for k in range(self.steps - 1, 0, -1):
+            if starts[k] is not None and results[k]:
+                if starts[k + 1] is None or starts[k] > starts[k + 1]: starts[k + 1] = starts[k]
+        if results[0]: starts[1] = now
+        return starts[self.steps] is not None
+
+    def reset(self) -> None:
+        self._starts = [None] * (self.steps + 1)
@@ -0,0 +1,41 @@
+import hashlib
+from dataclasses import dataclass
+
+from PySide6.QtCore import QObject
+
+DEFAULT_MAX_CHARS = 4096
+
+
+@dataclass(frozen=True)
+class ClipboardSnapshot:
+    version: int = 0
+    digest: str = ""
+    size: int = 0
+    text: str = ""  # 最多 max_chars 个字符的前缀，供关键词匹配
+
+
+class ClipboardWatcher(QObject):
+    """在 GUI 线程监听 QClipboard.dataChanged，剪贴板不变时没有任何开销。
+
+    只保留内容哈希与截断后的前缀；内容真正变化时 version 加一并整体替换 snapshot，
+    行为监听线程比较 version 即可判断是否有新复制，无需读取或比较完整文本。
+    """
+
+    def __init__(self, clipboard, config, parent=None):
+        super().__init__(parent)
+        self._clipboard = clipboard
+        self.config = config
+        self.snapshot = ClipboardSnapshot()
+        self._read(bump=False)
+        clipboard.dataChanged.connect(self._on_data_changed)
+
+    def _on_data_changed(self):
+        self._read(bump=True)
+
+    def _read(self, bump: bool):
+        if not self.config.monitor_clipboard: return
+        text = self._clipboard.text() or ""
+        digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+        if digest == self.snapshot.digest: return
+        self.snapshot = ClipboardSnapshot(self.snapshot.version + (1 if bump else 0), digest, len(text),
+                                          text[:self.config.clipboard_max_chars])
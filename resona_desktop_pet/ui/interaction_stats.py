@@ -0,0 +1,54 @@
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Tuple
+
+CLICK_HISTORY = 20
+
+
+@dataclass(frozen=True)
+class InteractionSnapshot:
+    is_hovering: bool = False
+    hover_start_time: float = 0.0
+    hover_leave_time: float = 0.0
+    is_pressing: bool = False
+    press_start_time: float = 0.0
+    total_clicks: int = 0
+    click_times: Tuple[float, ...] = ()
+
+    def clicks_within(self, count: int, duration: float, now: float) -> bool:
+        # 时间戳单调递增，只需看倒数第 count 次点击是否仍在窗口内
+        if count <= 0: return True
+        if count > len(self.click_times): return False
+        return now - self.click_times[-count] < duration
+
+
+class InteractionStats:
+    """立绘交互统计，只由 GUI 线程写入。
+
+    每次状态变化都生成新的不可变 InteractionSnapshot 并整体替换 snapshot 引用，
+    行为监听线程读取 snapshot 即可得到一致的数据，无需加锁。
+    """
+
+    def __init__(self, total_clicks: int = 0):
+        self._clicks: deque = deque(maxlen=CLICK_HISTORY)
+        self.snapshot = InteractionSnapshot(total_clicks=total_clicks)
+
+    def _publish(self, **changes):
+        self.snapshot = replace(self.snapshot, **changes)
+
+    def on_enter(self, now: float):
+        self._publish(is_hovering=True, hover_start_time=now)
+
+    def on_leave(self, now: float):
+        self._publish(is_hovering=False, hover_leave_time=now)
+
+    def on_press(self, now: float):
+        self._clicks.append(now)
+        self._publish(is_pressing=True, press_start_time=now,
+                      total_clicks=self.snapshot.total_clicks + 1, click_times=tuple(self._clicks))
+
+    def on_release(self):
+        self._publish(is_pressing=False)
+
+    def set_total_clicks(self, total: int):
+        self._publish(total_clicks=total)
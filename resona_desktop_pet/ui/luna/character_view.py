@@ -10,6 +10,7 @@ from PySide6.QtWidgets import QWidget
 class CharacterView(QWidget):
     leftClicked = Signal()
     rightClicked = Signal()
+    _builtin_outfits: Optional[List[str]] = None
     
     def __init__(self, parent: QWidget = None):
         super().__init__(parent)
@@ -27,14 +28,17 @@ class CharacterView(QWidget):
         self.current_outfit = default_outfit
         self._load_outfit(self.current_outfit)
         
+    def _pack_manager(self):
+        config = getattr(self.parent(), "config", None)
+        return config.pack_manager if config else None
+
     def _get_outfit_path(self, outfit: str) -> Path:
         if not self.project_root: return Path(".")
         try:
-            config = getattr(self.parent(), "config", None)
-            pack_id = config.pack_manager.active_pack_id if config else "Resona_Default"
-            pack_outfit_path = self.project_root / "packs" / pack_id / "assets" / "sprites" / outfit
-            if pack_outfit_path.exists() and (pack_outfit_path / "sum.json").exists():
-                return pack_outfit_path
+            pm = self._pack_manager()
+            if pm:
+                pack_outfit_path = pm.pack_root / "assets" / "sprites" / outfit
+                if pm.exists(pack_outfit_path / "sum.json"): return pack_outfit_path
         except: pass
         return self.project_root / "resona_desktop_pet" / "ui" / "assets" / "modes" / outfit
 
@@ -42,25 +46,27 @@ class CharacterView(QWidget):
         if not self.project_root: return []
         outfits = set()
         try:
-            config = getattr(self.parent(), "config", None)
-            pack_id = config.pack_manager.active_pack_id if config else "Resona_Default"
-            pack_sprites_path = self.project_root / "packs" / pack_id / "assets" / "sprites"
-            if pack_sprites_path.exists():
-                for item in pack_sprites_path.iterdir():
-                    if item.is_dir() and (item / "sum.json").exists(): outfits.add(item.name)
+            pm = self._pack_manager()
+            if pm: outfits.update(pm.get_outfits())
         except: pass
-        modes_path = self.project_root / "resona_desktop_pet" / "ui" / "assets" / "modes"
-        if modes_path.exists():
-            for item in modes_path.iterdir():
-                if item.is_dir() and (item / "sum.json").exists(): outfits.add(item.name)
+        if CharacterView._builtin_outfits is None:
+            # 内置服装随程序发布，运行期间不会变化，只扫描一次
+            modes_path = self.project_root / "resona_desktop_pet" / "ui" / "assets" / "modes"
+            CharacterView._builtin_outfits = sorted(
+                item.name for item in modes_path.iterdir() if item.is_dir() and (item / "sum.json").exists()
+            ) if modes_path.exists() else []
+        outfits.update(CharacterView._builtin_outfits)
         return sorted(list(outfits))
 
     def _load_outfit(self, outfit: str) -> bool:
         outfit_path = self._get_outfit_path(outfit)
         sum_json = outfit_path / "sum.json"
-        if not sum_json.exists(): return False
+        pm = self._pack_manager()
+        if not (pm.exists(sum_json) if pm else sum_json.exists()): return False
         try:
-            with open(sum_json, "r", encoding="utf-8") as f: self.emotion_map = json.load(f)
+            if pm: self.emotion_map = pm.read_json(sum_json)
+            else:
+                with open(sum_json, "r", encoding="utf-8") as f: self.emotion_map = json.load(f)
             self.current_outfit = outfit
             return True
         except: return False
@@ -90,14 +96,25 @@ class CharacterView(QWidget):
 
     def _load_sprite(self, sprite_name: str) -> bool:
         outfit_path = self._get_outfit_path(self.current_outfit)
-        for ext in [".png", ".jpg", ".webp"]:
-            sprite_path = outfit_path / f"{sprite_name}{ext}"
+        pm = self._pack_manager()
+        # 有预编译的立绘索引时先直接读取该文件，不做探测；编译后文件被删除时退回逐个扩展名探测
+        known = pm.sprite_file(self.current_outfit, sprite_name) if pm else None
+        candidates = [f"{sprite_name}{ext}" for ext in (".png", ".jpg", ".webp")]
+        if known: candidates = [known] + [n for n in candidates if n != known]
+        for name in candidates:
+            sprite_path = outfit_path / name
+            if name != known and not (pm.exists(sprite_path) if pm else sprite_path.exists()): continue
             if sprite_path.exists():
                 pixmap = QPixmap(str(sprite_path))
-                if not pixmap.isNull():
-                    self._pixmap = pixmap
-                    self.updateGeometry(); self.update()
-                    return True
+            else:
+                # .resonapack 内的立绘直接从映射内存解码
+                pixmap = QPixmap()
+                try: pixmap.loadFromData(pm.read_bytes(sprite_path))
+                except OSError: continue
+            if not pixmap.isNull():
+                self._pixmap = pixmap
+                self.updateGeometry(); self.update()
+                return True
         return False
 
     def set_scale(self, scale: float):
@@ -1,6 +1,5 @@
 ﻿import os
 import sys
-import json
 import random
 import time
 import ctypes
@@ -9,6 +8,7 @@ from PySide6.QtCore import Qt, QTimer, Signal, QEvent, QPoint, QRect, QPropertyA
 from PySide6.QtGui import QMouseEvent, QWheelEvent, QPixmap, QCursor, QGuiApplication, QAction, QActionGroup, QIcon
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QMenu, QGraphicsOpacityEffect, QApplication
 from resona_desktop_pet.config import ConfigManager
+from ..interaction_stats import InteractionStats
 from .character_view import CharacterView
 from .io_overlay import IOOverlay
 
@@ -17,27 +17,23 @@ class MainWindow(QWidget):
     replay_requested = Signal()
     pack_changed = Signal(str)
     settings_requested = Signal()
+    busy_changed = Signal(bool)
     def __init__(self, config: ConfigManager, parent: QWidget = None):
         super().__init__(parent)
         self.config = config
+        self._is_processing = self._is_listening = self._is_speaking = False
+        self._last_busy = False
         
         self.topmost_timer = QTimer(self)
         self.topmost_timer.setInterval(2500)
         self.topmost_timer.timeout.connect(self._reinforce_topmost)
         
-        self.stats = {
-            "hover_start_time": 0.0,
-            "press_start_time": 0.0,
-            "drag_start_time": 0.0,
-            "last_click_times": [], 
-            "total_clicks": 0,
-            "is_hovering": False,
-            "is_pressing": False
-        }
+        self.stats = InteractionStats()
         self.input_hard_locked = False
         self.faded = False
         self.manual_hidden = False
         self.fullscreen_hidden = False
+        self.eco_mode = False
         self.is_processing = False
         self.is_listening = False
         self.is_speaking = False
@@ -150,15 +146,14 @@ class MainWindow(QWidget):
     def load_thinking_texts(self):
         thinking_path = self.config.pack_manager.get_path("logic", "thinking")
         self.thinking_texts = []
-        if thinking_path and thinking_path.exists():
+        if thinking_path and self.config.pack_manager.exists(thinking_path):
             try:
-                with open(thinking_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        if data and isinstance(data[0], dict):
-                            self.thinking_texts = [item.get("text", "") for item in data if isinstance(item, dict)]
-                        else:
-                            self.thinking_texts = [str(item) for item in data]
+                data = self.config.pack_manager.read_json(thinking_path)
+                if isinstance(data, list):
+                    if data and isinstance(data[0], dict):
+                        self.thinking_texts = [item.get("text", "") for item in data if isinstance(item, dict)]
+                    else:
+                        self.thinking_texts = [str(item) for item in data]
                 print(f"[UI] Loaded {len(self.thinking_texts)} thinking texts")
             except Exception as e:
                 print(f"Error loading thinking texts: {e}")
@@ -166,15 +161,14 @@ class MainWindow(QWidget):
     def load_listening_texts(self):
         listening_path = self.config.pack_manager.get_path("logic", "listening")
         self.listening_texts = []
-        if listening_path and listening_path.exists():
+        if listening_path and self.config.pack_manager.exists(listening_path):
             try:
-                with open(listening_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        if data and isinstance(data[0], dict):
-                            self.listening_texts = [item.get("text", "") for item in data if isinstance(item, dict)]
-                        else:
-                            self.listening_texts = [str(item) for item in data]
+                data = self.config.pack_manager.read_json(listening_path)
+                if isinstance(data, list):
+                    if data and isinstance(data[0], dict):
+                        self.listening_texts = [item.get("text", "") for item in data if isinstance(item, dict)]
+                    else:
+                        self.listening_texts = [str(item) for item in data]
                 print(f"[UI] Loaded {len(self.listening_texts)} listening texts")
             except Exception as e:
                 print(f"Error loading listening texts: {e}")
@@ -386,7 +380,7 @@ class MainWindow(QWidget):
             
             if self.config.always_on_top:
                 self._reinforce_topmost()
-                if not self.topmost_timer.isActive():
+                if not self.topmost_timer.isActive() and not self.eco_mode:
                     self.topmost_timer.start()
             else:
                 self.topmost_timer.stop()
@@ -451,31 +445,24 @@ class MainWindow(QWidget):
 
         if obj == self.character:
             if event.type() == QEvent.Enter:
-                self.stats["is_hovering"] = True
-                self.stats["hover_start_time"] = now
+                self.stats.on_enter(now)
             elif event.type() == QEvent.Leave:
-                self.stats["is_hovering"] = False
-                self.stats["hover_leave_time"] = now
+                self.stats.on_leave(now)
             
-            
-            if self.faded and self.fade_hover_recovery_sec > 0 and self.stats["is_hovering"]:
-                if (now - self.stats["hover_start_time"]) >= self.fade_hover_recovery_sec:
+            ui = self.stats.snapshot
+            if self.faded and self.fade_hover_recovery_sec > 0 and ui.is_hovering:
+                if (now - ui.hover_start_time) >= self.fade_hover_recovery_sec:
                     self.cancel_idle_fade()
                     self.fade_hover_recovery_sec = 0.0
 
             if event.type() == QEvent.MouseButtonPress:
                 if event.button() == Qt.MouseButton.LeftButton:
-                    self.stats["is_pressing"] = True
-                    self.stats["press_start_time"] = now
-                    self.stats["last_click_times"].append(now)
-                    self.stats["last_click_times"] = self.stats["last_click_times"][-20:] 
-                    self.stats["total_clicks"] += 1
+                    self.stats.on_press(now)
                     if hasattr(self, "controller") and self.controller:
-                        self.controller.state["total_clicks"] = self.stats["total_clicks"]
-                        self.controller._save_state()
+                        self.controller.state.counter("total_clicks").set(self.stats.snapshot.total_clicks)
             elif event.type() == QEvent.MouseButtonRelease:
                 if event.button() == Qt.MouseButton.LeftButton:
-                    self.stats["is_pressing"] = False
+                    self.stats.on_release()
         w = obj if isinstance(obj, QWidget) else None
         on_self = (obj == self)
         on_character = (obj == self.character)
@@ -579,7 +566,7 @@ class MainWindow(QWidget):
             self.fade_to(1.0)
             
     def schedule_idle_fade(self):
-        if not self.check_idle_fade_allowed():
+        if self.eco_mode or not self.check_idle_fade_allowed():
             return
         if not self.idle_timer.isActive():
             self.idle_timer.start()
@@ -590,6 +577,17 @@ class MainWindow(QWidget):
         self.fade_anim.setEndValue(target)
         self.fade_anim.start()
         
+    def set_eco_mode(self, active: bool):
+        self.eco_mode = active
+        if active:
+            self.topmost_timer.stop()
+            self.idle_timer.stop()
+            return
+        if self.config.always_on_top and not self.topmost_timer.isActive():
+            self._reinforce_topmost()
+            self.topmost_timer.start()
+        self.schedule_idle_fade()
+
     def set_fullscreen_hidden(self, hidden: bool):
         self.fullscreen_hidden = hidden
         self._update_visibility()
@@ -709,6 +707,39 @@ class MainWindow(QWidget):
     @property
     def is_busy(self) -> bool:
         return self.is_processing or self.is_speaking or self.is_listening
+
+    def _update_busy_edge(self):
+        busy = self.is_busy
+        if busy != self._last_busy:
+            self._last_busy = busy
+            self.busy_changed.emit(busy)
+
+    @property
+    def is_processing(self) -> bool:
+        return self._is_processing
+
+    @is_processing.setter
+    def is_processing(self, value: bool):
+        self._is_processing = value
+        self._update_busy_edge()
+
+    @property
+    def is_listening(self) -> bool:
+        return self._is_listening
+
+    @is_listening.setter
+    def is_listening(self, value: bool):
+        self._is_listening = value
+        self._update_busy_edge()
+
+    @property
+    def is_speaking(self) -> bool:
+        return self._is_speaking
+
+    @is_speaking.setter
+    def is_speaking(self, value: bool):
+        self._is_speaking = value
+        self._update_busy_edge()
         
     def showEvent(self, event):
         super().showEvent(event)
@@ -329,21 +329,19 @@ class MainWindow(QWidget):
     def load_thinking_texts(self):
         json_path = self.config.pack_manager.get_path("logic", "thinking")
         self._thinking_texts = []
-        if json_path and json_path.exists():
+        if json_path and self.config.pack_manager.exists(json_path):
             try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    self._thinking_texts = [item["text"] for item in data]
+                data = self.config.pack_manager.read_json(json_path)
+                self._thinking_texts = [item["text"] for item in data]
             except Exception as e:
                 print(f"[UI] Error loading thinking texts: {e}")
     def load_listening_texts(self):
         json_path = self.config.pack_manager.get_path("logic", "listening")
         self._listening_texts = []
-        if json_path and json_path.exists():
+        if json_path and self.config.pack_manager.exists(json_path):
             try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    self._listening_texts = [item["text"] for item in data]
+                data = self.config.pack_manager.read_json(json_path)
+                self._listening_texts = [item["text"] for item in data]
             except Exception as e:
                 print(f"[UI] Error loading listening texts: {e}")
     def _on_text_submitted(self, text: str):
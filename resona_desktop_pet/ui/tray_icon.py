@@ -5,6 +5,14 @@ from PySide6.QtGui import QIcon, QPixmap, QAction
 from PySide6.QtWidgets import QSystemTrayIcon, QMenu, QApplication
 from ..config import ConfigManager
 
+TTS_STATUS_TEXT = {
+    "idle": "TTS: stopped",
+    "starting": "TTS: starting...",
+    "warming": "TTS: warming up (text only)",
+    "ready": "TTS: ready",
+    "failed": "TTS: unavailable (text only)",
+}
+
 class TrayIcon(QSystemTrayIcon):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -19,8 +27,9 @@ class TrayIcon(QSystemTrayIcon):
         icon_name = self.config.get("General", "tray_icon_path", fallback="icon.ico")
         icon_path = self.project_root / icon_name
         if not icon_path.exists():
-            pack_icon = self.config.pack_manager.packs_dir / self.config.pack_manager.active_pack_id / "icon.ico"
-            if pack_icon.exists(): icon_path = pack_icon
+            pm = self.config.pack_manager
+            pack_icon = pm.pack_root / "icon.ico"
+            if pm.exists(pack_icon): icon_path = pm.materialize(pack_icon)
         
         if icon_path.exists():
             self.setIcon(QIcon(str(icon_path)))
@@ -28,7 +37,17 @@ class TrayIcon(QSystemTrayIcon):
             pixmap = QPixmap(32, 32)
             pixmap.fill(Qt.GlobalColor.transparent)
             self.setIcon(QIcon(pixmap))
-        self.setToolTip(f"Resona Desktop Pet - {self.config.character_name}")
+        self._tts_status = ""
+        self._update_tooltip()
+
+    def _update_tooltip(self):
+        tip = f"Resona Desktop Pet - {self.config.character_name}"
+        if self._tts_status: tip += f"\n{self._tts_status}"
+        self.setToolTip(tip)
+
+    def set_tts_status(self, state: str):
+        self._tts_status = TTS_STATUS_TEXT.get(state, f"TTS: {state}")
+        self._update_tooltip()
 
     def _setup_menu(self):
         menu = QMenu()
@@ -0,0 +1,287 @@
+"""BehaviorMonitor 规则匹配基准测试（无界面，可在 Linux 上运行）。
+
+生成合成 triggers.json（规则数、嵌套深度、关键词数量可调），用合成传感器轨迹驱动
+BehaviorMonitor._process_rule_matching，统计每秒 tick 数、p50/p99 单次 tick 延迟与内存，
+结果保存为 JSON，可用 --compare 与另一次提交的结果对比。
+每个 tick 的时间戳取自合成时钟（按 --interval 递增），聚合窗口、SEQUENCE/CUMULATIVE 与 UI 条件
+都以它为准，因此窗口会按模拟时间就绪和过期，不受测量本身耗时的影响。
+
+    python tools/bench_behavior.py --rules 10,100,1000,10000,50000 --depth 8 --keywords 1000
+    python tools/bench_behavior.py --quick --compare tools/bench_results/behavior_abc1234.json
+"""
+import sys
+import gc
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from resona_desktop_pet.behavior_monitor import BehaviorMonitor, WindowInfo
+from resona_desktop_pet.config.snapshot import ConfigSnapshot
+
+PROCESS_NAMES = [f"app{i}.exe" for i in range(200)] + ["code.exe", "chrome.exe", "msedge.exe", "steam.exe", "explorer.exe"]
+WORDS = [f"kw{i}" for i in range(5000)] + ["traceback", "error", "github", "雨", "晴", "bilibili"]
+LOGICS = ["AND", "OR", "CUMULATIVE", "SEQUENCE"]
+KEYWORD_SIZES = [1, 3, 10, 50, 200]
+RULE_COOLDOWN = 300
+
+
+class BenchPackManager:
+    def __init__(self, trigger_path: Path):
+        self.trigger_path = trigger_path
+        self.loaded_plugins = {}
+        self.plugin_trigger_map = {}
+
+    def get_path(self, *_):
+        return self.trigger_path
+
+    def read_json(self, path: Path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def exists(self, path: Path) -> bool:
+        return Path(path).exists()
+
+    def compiled(self):
+        return None
+
+
+class BenchConfig:
+    """只提供 BehaviorMonitor 用到的配置项。全局冷却为 0 且不限制每轮命中数，
+    使每个 tick 都评估全部未冷却的规则（最坏情况）。"""
+
+    def __init__(self, trigger_path: Path, interval: float, rules: int):
+        self.config_path = str(trigger_path.parent / "config.cfg")
+        self.pack_manager = BenchPackManager(trigger_path)
+        self.snapshot = ConfigSnapshot(
+            plugins_enabled=False, behavior_enabled=True, behavior_interval=interval, debug_trigger=False,
+            trigger_cooldown=0.0, pending_queue_size=max(4, rules), sensor_deadline=0.5, use_ui_automation=False,
+            monitor_clipboard=True, monitor_music=False, eco_mode_enabled=False, eco_on_battery=False,
+            eco_cpu_threshold=0.0, eco_interval_factor=1.0, eco_unload_stt=False)
+
+    def subscribe(self, callback, keys=None):
+        pass
+
+
+class BenchController:
+    """没有待执行队列，命中即视为已执行，由它计入冷却与次数。"""
+
+    def __init__(self):
+        self.monitor = None
+        self.now = 0.0
+
+    def dispatch(self, fire):
+        self.monitor.mark_dispatched(fire, self.now)
+
+
+def _keywords(rng: random.Random, max_keywords: int):
+    size = min(max_keywords, rng.choice(KEYWORD_SIZES + [max_keywords]))
+    return rng.sample(WORDS, min(size, len(WORDS)))
+
+
+def _leaf(rng: random.Random, max_keywords: int) -> dict:
+    kind = rng.randrange(14)
+    if kind == 0: return {"type": "cpu_temp", "gt": rng.randint(70, 100)}
+    if kind == 1: return {"type": "gpu_usage", "gt": rng.randint(50, 100)}
+    if kind == 2: return {"type": "cpu_usage_avg", "gt": rng.randint(40, 95), "sec": rng.choice([30, 60, 300])}
+    if kind == 3: return {"type": "gpu_temp_rising", "rate": rng.uniform(0.5, 5), "sec": rng.choice([60, 120])}
+    if kind == 4: return {"type": "process_active", "pnames": rng.sample(PROCESS_NAMES, rng.randint(1, 5))}
+    if kind == 5: return {"type": "process_background", "pnames": rng.sample(PROCESS_NAMES, rng.randint(1, 5)), "only_new": rng.random() < 0.5}
+    if kind == 6: return {"type": "title_match", "keywords": _keywords(rng, max_keywords)}
+    if kind == 7: return {"type": "url_match", "keywords": _keywords(rng, max_keywords)}
+    if kind == 8: return {"type": "clip_match", "keywords": _keywords(rng, max_keywords)}
+    if kind == 9: return {"type": "weather_match", "keywords": _keywords(rng, max_keywords)}
+    if kind == 10: return {"type": "idle_duration", "sec": rng.choice([60, 300, 1800])}
+    if kind == 11: return {"type": "hover_duration", "sec": rng.randint(1, 10)}
+    if kind == 12: return {"type": "click_count", "count": rng.randint(2, 8), "duration": 5}
+    start = rng.randint(0, 23)
+    return {"type": "time_range", "range": f"{start:02d}:00-{(start + rng.randint(1, 6)) % 24:02d}:00"}
+
+
+def _node(rng: random.Random, depth: int, max_keywords: int) -> dict:
+    conds = [_leaf(rng, max_keywords) for _ in range(rng.randint(1, 3))]
+    if depth > 1:
+        conds.insert(rng.randrange(len(conds) + 1), _node(rng, depth - 1, max_keywords))
+    node = {"logic": rng.choice(LOGICS), "conditions": conds}
+    if node["logic"] == "SEQUENCE": node["within_sec"] = rng.choice([60, 300])
+    if node["logic"] == "CUMULATIVE": node["window_sec"] = rng.choice([0, 600, 3600])
+    return node
+
+
+def generate_triggers(count: int, max_depth: int, max_keywords: int, seed: int) -> list:
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        rule = _node(rng, rng.randint(1, max_depth), max_keywords)
+        rule.update({"id": f"bench_{i}", "enabled": True, "probability": 1.0, "cooldown": RULE_COOLDOWN,
+                     "priority": rng.randint(-5, 5), "one_shot_per_pid": rng.random() < 0.2,
+                     "actions": [{"type": "speak", "text": "bench", "emotion": "<E:smile>"}]})
+        rules.append(rule)
+    return rules
+
+
+class SensorTrace:
+    """合成传感器轨迹：温度/占用随机游走，前台窗口与剪贴板按一定概率切换，进程偶尔启动或退出。"""
+
+    def __init__(self, seed: int, process_count: int = 300):
+        self.rng = random.Random(seed)
+        self.hw = {"cpu_temp": 50.0, "gpu_temp": 45.0, "cpu_usage": 20.0, "gpu_usage": 10.0}
+        self.processes = {1000 + i: (self.rng.choice(PROCESS_NAMES), 0.0) for i in range(process_count)}
+        self.next_pid = 1000 + process_count
+        self.win = None
+        self.clip = ""
+        self.idle = 0.0
+        self.weather = {"condition": "晴"}
+
+    def step(self, now: float):
+        rng = self.rng
+        for key, hi in (("cpu_temp", 100), ("gpu_temp", 95), ("cpu_usage", 100), ("gpu_usage", 100)):
+            self.hw[key] = min(hi, max(0.0, self.hw[key] + rng.uniform(-3, 3)))
+        if rng.random() < 0.02:
+            self.processes.pop(rng.choice(list(self.processes)), None)
+            self.processes[self.next_pid] = (rng.choice(PROCESS_NAMES), now)
+            self.next_pid += 1
+        if self.win is None or rng.random() < 0.1:
+            pid = rng.choice(list(self.processes))
+            name = self.processes[pid][0]
+            self.win = WindowInfo(0, pid, " ".join(rng.sample(WORDS, 4)), name, (0, 0, 1920, 1040),
+                                  f"https://{rng.choice(WORDS)}.example" if name in ("chrome.exe", "msedge.exe") else None)
+        clip_changed = ""
+        if rng.random() < 0.05:
+            self.clip = " ".join(rng.sample(WORDS, 20))
+            clip_changed = self.clip
+        self.idle = 0.0 if rng.random() < 0.3 else self.idle + 1.0
+        if rng.random() < 0.01: self.weather = {"condition": rng.choice(["晴", "雨", "多云"])}
+        return dict(self.processes), self.win, self.idle, dict(self.hw), self.clip, clip_changed
+
+
+def _percentile(sorted_vals, q):
+    if not sorted_vals: return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(round(q * (len(sorted_vals) - 1))))]
+
+
+def _rss_mb():
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    except ImportError:
+        return None
+
+
+def run_case(rules: int, depth: int, max_keywords: int, ticks: int, seed: int, interval: float, workdir: Path) -> dict:
+    trigger_path = workdir / f"triggers_{rules}_{depth}_{max_keywords}.json"
+    trigger_path.write_text(json.dumps(generate_triggers(rules, depth, max_keywords, seed), ensure_ascii=False), encoding="utf-8")
+    gc.collect()
+    tracemalloc.start()
+    controller = BenchController()
+    t0 = time.perf_counter()
+    monitor = BehaviorMonitor(BenchConfig(trigger_path, interval, rules), controller)
+    compile_sec = time.perf_counter() - t0
+    controller.monitor = monitor
+    monitor.trigger_matched.connect(controller.dispatch)
+    trace = SensorTrace(seed)
+    now = time.time()
+    for _ in range(min(ticks, 10)):  # 预热，同时测量稳态内存
+        now += interval
+        controller.now = now
+        procs, win, idle, hw, clip, clip_changed = trace.step(now)
+        monitor._merge_processes(procs)
+        monitor.sensor_aggregates.push(now, hw)
+        monitor._process_rule_matching(now, win, idle, hw, clip, trace.weather, False, clip_changed=clip_changed)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(ticks):
+        now += interval
+        controller.now = now
+        procs, win, idle, hw, clip, clip_changed = trace.step(now)
+        t = time.perf_counter_ns()
+        monitor._merge_processes(procs)
+        monitor.sensor_aggregates.push(now, hw)
+        monitor._process_rule_matching(now, win, idle, hw, clip, trace.weather, False, clip_changed=clip_changed)
+        latencies.append((time.perf_counter_ns() - t) / 1e6)
+    elapsed = time.perf_counter() - start
+    fired = sum(monitor.trigger_counts.values())
+    monitor.stop()
+    latencies.sort()
+    return {
+        "rules": rules, "depth": depth, "max_keywords": max_keywords, "ticks": ticks, "fired": fired,
+        "compile_sec": round(compile_sec, 4),
+        "ticks_per_sec": round(ticks / elapsed, 2) if elapsed > 0 else None,
+        "p50_ms": round(_percentile(latencies, 0.50), 4),
+        "p99_ms": round(_percentile(latencies, 0.99), 4),
+        "max_ms": round(latencies[-1], 4) if latencies else 0.0,
+        "tracemalloc_peak_mb": round(peak / (1024 * 1024), 2),
+        "max_rss_mb": _rss_mb(),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: dict, baseline_path: Path):
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    key = lambda r: (r["rules"], r["depth"], r["max_keywords"])
+    old = {key(r): r for r in baseline.get("results", [])}
+    print(f"\n对比基线 {baseline.get('commit')} -> {current['commit']}")
+    for r in current["results"]:
+        b = old.get(key(r))
+        if not b: continue
+        print(f"  rules={r['rules']:>6} depth={r['depth']} kw={r['max_keywords']:>4}  "
+              f"p50 {b['p50_ms']:.3f} -> {r['p50_ms']:.3f} ms  p99 {b['p99_ms']:.3f} -> {r['p99_ms']:.3f} ms  "
+              f"mem {b['tracemalloc_peak_mb']} -> {r['tracemalloc_peak_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BehaviorMonitor 规则匹配基准测试")
+    parser.add_argument("--rules", default="10,100,1000,10000,50000", help="逗号分隔的规则数量")
+    parser.add_argument("--depth", type=int, default=8, help="最大嵌套深度")
+    parser.add_argument("--keywords", type=int, default=1000, help="单个关键词列表的最大长度")
+    parser.add_argument("--ticks", type=int, default=200, help="每组测量的 tick 数")
+    parser.add_argument("--interval", type=float, default=1.0, help="模拟的监听间隔(秒)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--quick", action="store_true", help="只跑 10/100/1000 条规则，用于快速回归")
+    parser.add_argument("--out", type=Path, help="结果 JSON 路径，默认 tools/bench_results/behavior_<commit>.json")
+    parser.add_argument("--compare", type=Path, help="与之前保存的结果 JSON 对比")
+    args = parser.parse_args()
+
+    counts = [10, 100, 1000] if args.quick else [int(x) for x in args.rules.split(",") if x.strip()]
+    commit = _git_commit()
+    report = {"commit": commit, "timestamp": datetime.now().isoformat(timespec="seconds"),
+              "python": platform.python_version(), "platform": platform.platform(),
+              "params": {"depth": args.depth, "keywords": args.keywords, "ticks": args.ticks,
+                         "interval": args.interval, "seed": args.seed}, "results": []}
+    with tempfile.TemporaryDirectory(prefix="resona_bench_") as tmp:
+        run_case(10, args.depth, args.keywords, 5, args.seed, args.interval, Path(tmp))  # 预热导入与懒加载，不计入结果
+        for n in counts:
+            r = run_case(n, args.depth, args.keywords, args.ticks, args.seed, args.interval, Path(tmp))
+            report["results"].append(r)
+            print(f"rules={n:>6}  {r['ticks_per_sec']} ticks/s  p50={r['p50_ms']}ms  p99={r['p99_ms']}ms  "
+                  f"compile={r['compile_sec']}s  peak={r['tracemalloc_peak_mb']}MB")
+
+    out = args.out or PROJECT_ROOT / "tools" / "bench_results" / f"behavior_{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"结果已保存: {out}")
+    if args.compare: compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
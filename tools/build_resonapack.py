@@ -0,0 +1,63 @@
+"""把资源包目录打包为单文件 .resonapack（不压缩的 zip，中央目录即成员索引）。
+
+程序会像加载目录一样加载 packs/ 下的 .resonapack；同一 id 同时存在目录与单文件包时目录优先，
+因此可以一边修改目录一边保留已发布的包。state.json、__pycache__ 等运行期文件不会被打包。
+
+    python tools/build_resonapack.py packs/Example_Pack
+    python tools/build_resonapack.py packs/Example_Pack -o dist/Example_Pack.resonapack
+    python tools/build_resonapack.py --all
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from resona_desktop_pet.config.pack_bundle import BUNDLE_SUFFIX, MANIFEST_NAME, PackBundle, build_bundle
+
+
+def build_one(pack_dir: Path, out_path: Path = None) -> bool:
+    if not (pack_dir / MANIFEST_NAME).exists():
+        print(f"跳过 {pack_dir}: 缺少 {MANIFEST_NAME}")
+        return False
+    t0 = time.perf_counter()
+    try:
+        out = build_bundle(pack_dir, out_path)
+    except (OSError, ValueError) as e:
+        print(f"打包 {pack_dir} 失败: {e}")
+        return False
+    # 重新打开校验：中央目录可读、清单可解析
+    with PackBundle(out) as bundle:
+        bundle.read_json(MANIFEST_NAME)
+        count = len(bundle.names())
+    size_mb = out.stat().st_size / 1024 / 1024
+    print(f"{pack_dir.name} -> {out} ({count} 个文件, {size_mb:.1f}MB, {(time.perf_counter() - t0) * 1000:.0f}ms)")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="构建 .resonapack 单文件资源包")
+    parser.add_argument("packs", nargs="*", help="资源包目录")
+    parser.add_argument("-o", "--output", help="输出文件（仅打包单个目录时可用），默认与目录同级")
+    parser.add_argument("--all", action="store_true", help="打包 packs/ 下的全部资源包目录")
+    args = parser.parse_args()
+
+    dirs = [Path(p) for p in args.packs]
+    if args.all:
+        # <名称>_data 等运行期目录与没有 pack.json 的目录不是资源包，直接跳过
+        dirs += sorted(d for d in (PROJECT_ROOT / "packs").iterdir()
+                       if d.is_dir() and not d.name.endswith(BUNDLE_SUFFIX) and (d / MANIFEST_NAME).exists())
+    if not dirs and not args.all: parser.error("请指定资源包目录或使用 --all")
+    if not dirs:
+        print("packs/ 下没有可打包的资源包目录")
+        return
+    if args.output and len(dirs) != 1: parser.error("-o 只能与单个资源包目录一起使用")
+
+    ok = [build_one(d, Path(args.output) if args.output else None) for d in dirs]
+    sys.exit(0 if all(ok) else 1)
+
+
+if __name__ == "__main__":
+    main()
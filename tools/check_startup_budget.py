@@ -0,0 +1,109 @@
+"""启动耗时预算检查（无界面，可用于 CI）。
+
+在干净的子进程中只执行 main.py 顶层的 import 语句（不创建窗口），统计导入耗时并检查
+是否有重量级依赖被提前加载；超出预算或出现被禁止的模块时以非零状态码退出。
+若存在 logs/startup_trace.json（由 main.py 在首帧绘制后写入），一并检查首帧耗时。
+
+    python tools/check_startup_budget.py
+    python tools/check_startup_budget.py --budget 800 --paint-budget 3000 --top 15
+"""
+import re
+import sys
+import ast
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_IMPORT_BUDGET_MS = 1500
+DEFAULT_PAINT_BUDGET_MS = 5000
+
+# 这些模块必须在首帧之后、首次使用时才导入
+DEFERRED_MODULES = [
+    "openai", "anthropic", "google.generativeai", "aiohttp", "requests",
+    "sherpa_onnx", "soundfile", "pyaudio", "uiautomation", "pyperclip",
+    "PySide6.QtMultimedia",
+]
+
+PROBE = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+{imports}
+elapsed = (time.perf_counter() - t0) * 1000
+print("@@RESULT@@" + json.dumps({{"elapsed_ms": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def main_imports(main_path: Path) -> str:
+    """取出 main.py 模块级的 import 语句，保持原顺序。"""
+    tree = ast.parse(main_path.read_text(encoding="utf-8-sig"))
+    stmts = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in stmts)
+
+
+def run_probe(imports: str):
+    code = PROBE.format(root=str(PROJECT_ROOT), imports=imports)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=str(PROJECT_ROOT), capture_output=True, text=True, encoding="utf-8", errors="replace")
+    result = None
+    for line in proc.stdout.splitlines():
+        if line.startswith("@@RESULT@@"): result = json.loads(line[len("@@RESULT@@"):])
+    if result is None:
+        raise RuntimeError(f"导入失败 (exit {proc.returncode}):\n{proc.stderr[-2000:]}")
+    return result, parse_importtime(proc.stderr)
+
+
+def parse_importtime(stderr: str):
+    """解析 -X importtime 输出，返回 [(cumulative_us, module)]，只保留顶层模块。"""
+    rows = []
+    for line in stderr.splitlines():
+        m = re.match(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)", line)
+        if m and len(m.group(3)) <= 1:
+            rows.append((int(m.group(2)), m.group(4)))
+    rows.sort(reverse=True)
+    return rows
+
+
+def is_loaded(name: str, modules) -> bool:
+    return any(m == name or m.startswith(name + ".") for m in modules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时预算检查")
+    parser.add_argument("--budget", type=float, default=DEFAULT_IMPORT_BUDGET_MS, help="main.py 顶层导入耗时预算 (ms)")
+    parser.add_argument("--paint-budget", type=float, default=DEFAULT_PAINT_BUDGET_MS, help="首帧绘制耗时预算 (ms)")
+    parser.add_argument("--trace", default=str(PROJECT_ROOT / "logs" / "startup_trace.json"), help="main.py 写出的启动阶段记录")
+    parser.add_argument("--top", type=int, default=10, help="列出最慢的顶层模块数量")
+    args = parser.parse_args()
+
+    failures = []
+    result, rows = run_probe(main_imports(PROJECT_ROOT / "main.py"))
+    print(f"main.py 顶层导入: {result['elapsed_ms']:.1f}ms (预算 {args.budget:.0f}ms)")
+    for us, name in rows[:args.top]:
+        print(f"  {us / 1000:8.1f}ms  {name}")
+    if result["elapsed_ms"] > args.budget:
+        failures.append(f"导入耗时 {result['elapsed_ms']:.1f}ms 超出预算 {args.budget:.0f}ms")
+    for name in DEFERRED_MODULES:
+        if is_loaded(name, result["modules"]):
+            failures.append(f"{name} 应在首次使用时再导入，但启动阶段已被加载")
+
+    trace_path = Path(args.trace)
+    if trace_path.exists():
+        trace = json.loads(trace_path.read_text(encoding="utf-8"))
+        print(f"上次运行首帧耗时: {trace['total_ms']}ms (预算 {args.paint_budget:.0f}ms)")
+        for row in trace["phases"]:
+            print(f"  {row['delta_ms']:8.1f}ms  {row['phase']}")
+        if trace["total_ms"] > args.paint_budget:
+            failures.append(f"首帧耗时 {trace['total_ms']}ms 超出预算 {args.paint_budget:.0f}ms")
+
+    if failures:
+        print("\n未通过:")
+        for f in failures: print(f"  - {f}")
+        sys.exit(1)
+    print("\n通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import sys
 import json
+import socket
 import importlib.util
 import configparser
 from pathlib import Path
@@ -13,16 +14,21 @@ class SensorMocker(QMainWindow):
         self.setWindowTitle("Resona 全量传感器模拟器 (DEBUG MODE)")
         self.resize(500, 800)
         self.project_root = Path(__file__).parent.parent
-        self.mock_file = self.project_root / "TEMP" / "mock_data.json"
-        self.mock_file.parent.mkdir(exist_ok=True)
+        self.port_file = self.project_root / "TEMP" / "mock_channel.port"
+        self.sock = None
+        self.version = 0
+        self.last_payload = None
         
         self.plugin_controls = {}
         self.init_ui()
         self.load_plugins()
+        self.watch_widgets()
 
+        # 通道断开时每秒重连，连上后立即推送当前快照
         self.timer = QTimer()
-        self.timer.timeout.connect(self.save_mock_data)
-        self.timer.start(200) 
+        self.timer.timeout.connect(self.ensure_connected)
+        self.timer.start(1000)
+        self.ensure_connected()
 
     def load_plugins(self):
         config = configparser.ConfigParser(interpolation=None)
@@ -90,6 +96,7 @@ class SensorMocker(QMainWindow):
         
         self.idle_sec = QSpinBox(); self.idle_sec.setRange(0, 86400); self.idle_sec.setValue(0)
         self.fullscreen = QCheckBox("全屏模式运行中")
+        self.on_battery = QCheckBox("使用电池供电")
         self.clip = QLineEdit(); self.clip.setPlaceholderText("伪造剪贴板...")
         self.music_title = QLineEdit(); self.music_title.setPlaceholderText("歌名 - 歌手 (网易云模式)")
         
@@ -106,6 +113,7 @@ class SensorMocker(QMainWindow):
         f.addRow("CPU 温度:", self.cpu_temp); f.addRow("GPU 温度:", self.gpu_temp)
         f.addRow("CPU 占用:", self.cpu_usage); f.addRow("GPU 占用:", self.gpu_usage)
         f.addRow("闲置时间(s):", self.idle_sec); f.addRow(self.fullscreen)
+        f.addRow(self.on_battery)
         f.addRow("剪贴板内容:", self.clip)
         f.addRow("正在播放(音乐):", self.music_title)
         f.addRow("活跃进程名:", self.win_pname); f.addRow("窗口标题:", self.win_title); f.addRow("浏览器 URL:", self.win_url)
@@ -114,6 +122,27 @@ class SensorMocker(QMainWindow):
         scroll_layout.addLayout(f); layout.addWidget(scroll)
         self.status = QLabel("状态: 模拟数据已实时映射"); layout.addWidget(self.status)
 
+    def watch_widgets(self):
+        for w in self.findChildren(QDoubleSpinBox) + self.findChildren(QSpinBox):
+            w.valueChanged.connect(self.save_mock_data)
+        for w in self.findChildren(QLineEdit):
+            w.textChanged.connect(self.save_mock_data)
+        for w in self.findChildren(QCheckBox):
+            w.toggled.connect(self.save_mock_data)
+
+    def ensure_connected(self):
+        if self.sock: return
+        try:
+            port = int(self.port_file.read_text(encoding="utf-8"))
+            self.sock = socket.create_connection(("127.0.0.1", port), timeout=1.0)
+        except (OSError, ValueError):
+            self.sock = None
+            self.status.setText("状态: 等待主程序 (debugtrigger) 通道...")
+            return
+        self.status.setText("状态: 模拟数据已实时映射")
+        self.last_payload = None
+        self.save_mock_data()
+
     def save_mock_data(self):
         plugin_mock = {}
         for pid, (cb, le, sb) in self.plugin_controls.items():
@@ -123,6 +152,7 @@ class SensorMocker(QMainWindow):
             "cpu_temp": self.cpu_temp.value(), "gpu_temp": self.gpu_temp.value(),
             "cpu_usage": self.cpu_usage.value(), "gpu_usage": self.gpu_usage.value(),
             "idle_sec": self.idle_sec.value(), "is_fullscreen": self.fullscreen.isChecked(),
+            "on_battery": self.on_battery.isChecked(),
             "clip_text": self.clip.text(), "music_title": self.music_title.text(),
             "win_pname": self.win_pname.text().lower(),
             "win_title": self.win_title.text(), "win_url": self.win_url.text(),
@@ -130,8 +160,15 @@ class SensorMocker(QMainWindow):
             "date": self.mock_date.text(), "time": self.mock_time.text(),
             "plugins": plugin_mock
         }
-        with open(self.mock_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        if data == self.last_payload or not self.sock: return
+        self.version += 1
+        line = json.dumps({"version": self.version, "data": data}, ensure_ascii=False) + "\n"
+        try:
+            self.sock.sendall(line.encode("utf-8"))
+            self.last_payload = data
+        except OSError:
+            self.sock.close()
+            self.sock = None
 
 if __name__ == "__main__":
     app = QApplication(sys.argv); w = SensorMocker(); w.show(); sys.exit(app.exec())
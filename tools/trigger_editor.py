@@ -12,11 +12,24 @@ from PySide6.QtCore import Qt
 TRANSLATIONS = {
     "AND": {"label": "所有条件满足(AND)", "fields": []},
     "OR": {"label": "任一条件满足(OR)", "fields": []},
-    "CUMULATIVE": {"label": "累计满足(曾达成即可)", "fields": []},
+    "CUMULATIVE": {"label": "累计满足(时间窗内都达成过)", "fields": ["window_sec", "reset_on_fire"]},
+    "SEQUENCE": {"label": "顺序满足(时间窗内依次发生)", "fields": ["within_sec"]},
     "cpu_temp": {"label": "CPU温度(>)", "fields": ["gt"]},
     "gpu_temp": {"label": "GPU温度(>)", "fields": ["gt"]},
     "cpu_usage": {"label": "CPU占用(%)", "fields": ["gt"]},
     "gpu_usage": {"label": "GPU占用(%)", "fields": ["gt"]},
+    "cpu_temp_avg": {"label": "CPU温度窗口均值(>)", "fields": ["gt", "sec"]},
+    "cpu_temp_max": {"label": "CPU温度窗口峰值(>)", "fields": ["gt", "sec"]},
+    "cpu_temp_rising": {"label": "CPU温度持续上升", "fields": ["rate", "sec"]},
+    "gpu_temp_avg": {"label": "GPU温度窗口均值(>)", "fields": ["gt", "sec"]},
+    "gpu_temp_max": {"label": "GPU温度窗口峰值(>)", "fields": ["gt", "sec"]},
+    "gpu_temp_rising": {"label": "GPU温度持续上升", "fields": ["rate", "sec"]},
+    "cpu_usage_avg": {"label": "CPU占用窗口均值(>)", "fields": ["gt", "sec"]},
+    "cpu_usage_max": {"label": "CPU占用窗口峰值(>)", "fields": ["gt", "sec"]},
+    "cpu_usage_rising": {"label": "CPU占用持续上升", "fields": ["rate", "sec"]},
+    "gpu_usage_avg": {"label": "GPU占用窗口均值(>)", "fields": ["gt", "sec"]},
+    "gpu_usage_max": {"label": "GPU占用窗口峰值(>)", "fields": ["gt", "sec"]},
+    "gpu_usage_rising": {"label": "GPU占用持续上升", "fields": ["rate", "sec"]},
     "idle_duration": {"label": "闲置时长(s)", "fields": ["sec"]},
     "idle_recovery": {"label": "闲置结束(恢复)", "fields": ["sec"]},
     "process_active": {"label": "进程在前台", "fields": ["pnames"]},
@@ -43,6 +56,10 @@ TRANSLATIONS = {
     "keywords": "关键词列表",
     "pnames": "进程名列表",
     "gt": "大于数值",
+    "within_sec": "顺序时间窗(s)",
+    "window_sec": "累计时间窗(s, 0=不限)",
+    "reset_on_fire": "触发后清零累计",
+    "rate": "每分钟上升量(>)",
     "sec": "秒数",
     "count": "次数",
     "duration": "持续时间(s)",
@@ -72,7 +89,7 @@ EMOTION_TAGS = [
 ]
 
 ACT_TYPES = {k: v for k, v in TRANSLATIONS.items() if k in ["speak", "delay", "random_group", "move_to", "fade_out", "exit_app", "lock_interaction"]}
-COND_TYPES = {k: v for k, v in TRANSLATIONS.items() if isinstance(v, dict) and k not in ACT_TYPES and k not in ["AND", "OR", "CUMULATIVE"]}
+COND_TYPES = {k: v for k, v in TRANSLATIONS.items() if isinstance(v, dict) and k not in ACT_TYPES and k not in ["AND", "OR", "CUMULATIVE", "SEQUENCE"]}
 
 class TriggerEditor(QMainWindow):
     def __init__(self):
@@ -124,7 +141,7 @@ class TriggerEditor(QMainWindow):
         self.desc_edit = QLineEdit()
         self.desc_edit.textChanged.connect(lambda t: self._update_base_val("description", t))
         self.logic_box = QComboBox()
-        self.logic_box.addItems(["AND", "OR", "CUMULATIVE"])
+        self.logic_box.addItems(["AND", "OR", "CUMULATIVE", "SEQUENCE"])
         self.logic_box.currentTextChanged.connect(lambda t: self._update_base_val("logic", t))
         self.prob_spin = QDoubleSpinBox(); self.prob_spin.setRange(0.0, 1.0); self.prob_spin.setSingleStep(0.05)
         self.prob_spin.valueChanged.connect(lambda v: self._update_base_val("probability", v))
@@ -132,6 +149,12 @@ class TriggerEditor(QMainWindow):
         self.cd_spin.valueChanged.connect(lambda v: self._update_base_val("cooldown", v))
         self.max_spin = QSpinBox(); self.max_spin.setRange(0, 99999)
         self.max_spin.valueChanged.connect(lambda v: self._update_base_val("max_triggers", v))
+        self.prio_spin = QSpinBox(); self.prio_spin.setRange(-999, 999)
+        self.prio_spin.valueChanged.connect(lambda v: self._update_base_val("priority", v))
+        self.within_spin = QSpinBox(); self.within_spin.setRange(1, 86400)
+        self.within_spin.valueChanged.connect(lambda v: self._update_base_val("within_sec", v))
+        self.window_spin = QSpinBox(); self.window_spin.setRange(0, 604800)
+        self.window_spin.valueChanged.connect(lambda v: self._update_base_val("window_sec", v))
         self.enabled_cb = QCheckBox("启用此触发器")
         self.enabled_cb.toggled.connect(lambda b: self._update_base_val("enabled", b))
         f1.addRow("ID:", self.id_edit)
@@ -140,6 +163,9 @@ class TriggerEditor(QMainWindow):
         f1.addRow("触发概率:", self.prob_spin)
         f1.addRow("冷却间隔:", self.cd_spin)
         f1.addRow("每日上限:", self.max_spin)
+        f1.addRow("优先级(大者优先):", self.prio_spin)
+        f1.addRow("顺序时间窗(s):", self.within_spin)
+        f1.addRow("累计时间窗(s, 0=不限):", self.window_spin)
         f1.addRow(self.startup_cb)
         f1.addRow(self.enabled_cb)
         mid_panel.addWidget(base_gb)
@@ -312,6 +338,9 @@ class TriggerEditor(QMainWindow):
         self.prob_spin.setValue(data.get("probability", 1.0))
         self.cd_spin.setValue(data.get("cooldown", 5))
         self.max_spin.setValue(data.get("max_triggers", 9999))
+        self.prio_spin.setValue(data.get("priority", 0))
+        self.within_spin.setValue(int(data.get("within_sec", 300)))
+        self.window_spin.setValue(int(data.get("window_sec", 0)))
         self.startup_cb.setChecked(data.get("startup_only", False))
         self.enabled_cb.setChecked(data.get("enabled", True))
         self.cond_tree.clear()
@@ -338,6 +367,7 @@ class TriggerEditor(QMainWindow):
             "probability": 1.0,
             "cooldown": 60,
             "max_triggers": 9999,
+            "priority": 0,
             "one_shot_per_pid": False,
             "conditions": [],
             "actions": []
@@ -523,6 +553,8 @@ class TriggerEditor(QMainWindow):
             val = data.get(key)
             if key in ["only_new", "only_on_change"]:
                 if val is None: val = False
+            if key == "reset_on_fire" and val is None: val = True
+            if key == "window_sec" and val is None: val = 0
 
             label = TRANSLATIONS.get(key, key)
             if key == "emotion":
@@ -0,0 +1,66 @@
+"""资源包校验与预编译（无界面，可用于 CI）。
+
+对资源包做完整检查：触发器结构与参数类型、情绪与立绘的对应、音频引用是否存在、插件 INFO
+（静态分析，不执行插件代码）。同时把校验后的触发器、立绘文件索引与解析好的音频路径写入
+cache/compiled/<包名>.json，程序在这些来源文件未变化时直接使用，省去运行时的逐个探测。
+存在 error 级问题时以非零状态码退出。
+
+    python tools/validate_pack.py Example_Pack
+    python tools/validate_pack.py --all --strict
+    python tools/validate_pack.py example_pack_v1 --check-only
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from resona_desktop_pet.config.pack_manager import PackManager
+from resona_desktop_pet.config.pack_compiler import compile_pack, write_artifact
+
+
+def validate_one(pm: PackManager, pack: str, write: bool) -> tuple:
+    pm.set_active_pack(pack)
+    if not pm.exists(pm.pack_root / "pack.json") or not pm.pack_data:
+        print(f"{pack}: 找不到资源包或 pack.json 无法读取")
+        return 1, 0
+    t0 = time.perf_counter()
+    artifact, issues = compile_pack(pm)
+    elapsed = (time.perf_counter() - t0) * 1000
+    errors = sum(i.level == "error" for i in issues)
+    warnings = len(issues) - errors
+    print(f"{pm.active_pack_id}: {errors} 个错误, {warnings} 个警告, "
+          f"{len(artifact['triggers'])} 条有效规则 ({elapsed:.0f}ms)")
+    for issue in sorted(issues, key=lambda i: i.level != "error"):
+        print(f"  {issue}")
+    if write:
+        out = pm.compiled_path()
+        write_artifact(out, artifact)
+        print(f"  预编译结果 -> {out}")
+    return errors, warnings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="资源包校验与预编译")
+    parser.add_argument("packs", nargs="*", help="资源包 id、目录名或 .resonapack 文件名")
+    parser.add_argument("--all", action="store_true", help="处理 packs/ 下的全部资源包")
+    parser.add_argument("--check-only", action="store_true", help="只校验，不写预编译结果")
+    parser.add_argument("--strict", action="store_true", help="存在警告时也以非零状态码退出")
+    args = parser.parse_args()
+
+    pm = PackManager(PROJECT_ROOT)
+    packs = list(args.packs) + (pm.get_available_packs() if args.all else [])
+    if not packs: parser.error("请指定资源包或使用 --all")
+
+    total_errors = total_warnings = 0
+    for pack in packs:
+        errors, warnings = validate_one(pm, pack, not args.check_only)
+        total_errors += errors
+        total_warnings += warnings
+    sys.exit(1 if total_errors or (args.strict and total_warnings) else 0)
+
+
+if __name__ == "__main__":
+    main()